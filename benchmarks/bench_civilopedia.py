@@ -0,0 +1,145 @@
+"""Measure the memory and to_json time of a ruleset's civilopedia text.
+
+Compares `CivilopediaText` with the previous layout, an attrs class with a
+slot for each of its 13 fields, on lines shaped like the base game's.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from typing import Any
+
+from attrs import define
+
+from uncivmod.typing.base import CivilopediaText
+
+_keys = (
+    "text",
+    "link",
+    "icon",
+    "extraImage",
+    "imageSize",
+    "header",
+    "size",
+    "indent",
+    "padding",
+    "color",
+    "separator",
+    "starred",
+    "centered",
+)
+
+
+_fields = (
+    "text",
+    "link",
+    "icon",
+    "extra_image",
+    "image_size",
+    "header",
+    "size",
+    "indent",
+    "padding",
+    "colour",
+    "separator",
+    "starred",
+    "centered",
+)
+
+
+@define
+class _DenseCivilopediaText:
+    text: str | None = None
+    link: str | None = None
+    icon: str | None = None
+    extra_image: str | None = None
+    image_size: float | None = None
+    header: str | None = None
+    size: str | None = None
+    indent: int | None = None
+    padding: float | None = None
+    colour: str | None = None
+    separator: bool | None = None
+    starred: bool | None = None
+    centered: bool | None = None
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            x: y
+            for x, y in zip(
+                _keys,
+                (
+                    self.text,
+                    self.link,
+                    self.icon,
+                    self.extra_image,
+                    self.image_size,
+                    self.header,
+                    self.size,
+                    self.indent,
+                    self.padding,
+                    self.colour,
+                    self.separator,
+                    self.starred,
+                    self.centered,
+                ),
+            )
+            if y is not None
+        }
+
+
+def generate_lines(entities: int) -> list[dict[str, Any]]:
+    """Text, links, headers and separators, as in Buildings.json."""
+    lines: list[dict[str, Any]] = []
+    for i in range(entities):
+        lines.extend(
+            (
+                {"text": f"Entity {i}", "header": 3},
+                {"text": f"Entity {i} is useful. " * 3},
+                {"separator": True},
+                {"link": f"Tech/Tech {i % 80}", "text": f"Tech {i % 80}"},
+                {"text": f"{i}", "color": "#fa0", "indent": 1},
+            )
+        )
+    return lines
+
+
+def _measure(cls: type, lines: list[dict[str, Any]]) -> tuple[int, float]:
+    gc.collect()
+    tracemalloc.start()
+    texts = [
+        cls(**{y: x[z] for y, z in zip(_fields, _keys) if z in x})
+        for x in lines
+    ]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    seconds = min(
+        timeit.repeat(lambda: [x.to_json() for x in texts], number=1, repeat=5)
+    )
+    return size, seconds
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    # Strings are shared by both layouts, so only the objects are counted.
+    lines = generate_lines(args.entities)
+    print(f"{len(lines)} lines")
+    for name, cls in (
+        ("13 slots", _DenseCivilopediaText),
+        ("sparse", CivilopediaText),
+    ):
+        size, seconds = _measure(cls, lines)
+        print(
+            f"{name:10} {size / 2**20:8.2f} MiB"
+            f" {size / len(lines):6.1f} B/line"
+            f" to_json {seconds * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Measure the memory and load time of json files with and without a pool.
+
+Generates several rulesets whose units, promotions and buildings refer to
+each other by name and repeat the same uniques, as mods built on the base
+game do, and loads all of them the way the combine does.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from uncivmod.strings import StringPool
+
+_uniques = [
+    "[+15]% Strength <when attacking>",
+    "No defensive terrain bonus",
+    "Can move after attacking",
+    "[+1] Movement",
+    "[+1 Production] [in all cities]",
+    "Only available <after adopting [Tradition]>",
+]
+
+
+def generate_rulesets(root: Path, rulesets: int, units: int) -> list[Path]:
+    """Write units, promotions and buildings json files for each ruleset."""
+    unit_types = [f"Type {x}" for x in range(12)]
+    json_files: list[Path] = []
+    for ruleset in range(rulesets):
+        json_dir = root / f"Mod {ruleset}" / "jsons"
+        json_dir.mkdir(parents=True)
+        collections = {
+            "Units.json": [
+                {
+                    "name": f"Unit {x}",
+                    "unitType": unit_types[x % len(unit_types)],
+                    "upgradesTo": f"Unit {x + 1}",
+                    "requiredTech": f"Tech {x // 4}",
+                    "promotions": [f"Promotion {x % 20}"],
+                    "uniques": _uniques[x % 3 : x % 3 + 3],
+                }
+                for x in range(units)
+            ],
+            "UnitPromotions.json": [
+                {
+                    "name": f"Promotion {x}",
+                    "prerequisites": [f"Promotion {x - 1}"],
+                    "unitTypes": unit_types[x % 4 :],
+                    "uniques": _uniques[:2],
+                }
+                for x in range(units // 10)
+            ],
+            "Buildings.json": [
+                {
+                    "name": f"Building {x}",
+                    "requiredTech": f"Tech {x // 2}",
+                    "uniques": _uniques[3:],
+                    "civilopediaText": [{"text": f"Building {x} " * 30}],
+                }
+                for x in range(units // 2)
+            ],
+        }
+        for name, objects in collections.items():
+            (json_dir / name).write_text(json.dumps(objects, indent="\t"))
+            json_files.append(json_dir / name)
+    return json_files
+
+
+def _json_load(json_file: Path) -> Any:  # noqa: ANN401
+    with json_file.open(encoding="UTF-8") as f:
+        return json.load(f)
+
+
+def _measure(
+    load: Callable[[Path], Any], json_files: list[Path]
+) -> tuple[int, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = [load(x) for x in json_files]
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loaded
+    return size, seconds
+
+
+def _time(load: Callable[[Path], Any], json_files: list[Path]) -> float:
+    start = time.perf_counter()
+    for json_file in json_files:
+        load(json_file)
+    return time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rulesets", type=int, default=5)
+    parser.add_argument("--units", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_files = generate_rulesets(Path(tmp), args.rulesets, args.units)
+        print(f"{len(json_files)} files")
+        for name, make_load in (
+            ("json.load", lambda: _json_load),
+            ("pool", lambda: StringPool().load_json),
+        ):
+            # Memory under tracemalloc, time on its own as tracing slows it.
+            size, _ = _measure(make_load(), json_files)
+            seconds = min(_time(make_load(), json_files) for _ in range(5))
+            print(
+                f"{name:10} {size / 2**20:8.2f} MiB"
+                f" load {seconds * 1000:8.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Time loading a ruleset from JSON against loading its snapshot.
+
+Runs on a mod folder given on the command line, such as the cleaned
+``Output/Civ V - Gods & Kings``, or on a generated ruleset of similar size.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from uncivmod.typing.filehandler import load_mod
+
+
+def generate_ruleset(mod_dir: Path) -> None:
+    """Write techs, policies and beliefs about the size of the vanilla ones."""
+    json_dir = mod_dir / "jsons"
+    json_dir.mkdir(parents=True, exist_ok=True)
+    techs = [
+        {
+            "columnNumber": column,
+            "era": f"Era {column // 3}",
+            "techCost": 20 * (column + 1),
+            "buildingCost": 40 * (column + 1),
+            "wonderCost": 185 * (column + 1),
+            "techs": [
+                {
+                    "name": f"Tech {column}-{row}",
+                    "row": row,
+                    "prerequisites": [f"Tech {column - 1}-{row}"],
+                    "quote": "'Quote' - Someone " * 4,
+                    "uniques": [f"[+{row}]% Production"],
+                    "civilopediaText": [{"text": "Text " * 10}],
+                }
+                for row in range(6)
+            ],
+        }
+        for column in range(20)
+    ]
+    policies = [
+        {
+            "name": f"Branch {branch}",
+            "era": f"Era {branch // 2}",
+            "priorities": {"Neutral": 0, "Cultural": 10},
+            "uniques": ["[+1 Culture] [in all cities]"],
+            "policies": [
+                *(
+                    {
+                        "name": f"Policy {branch}-{member}",
+                        "row": member // 2 + 1,
+                        "column": member % 3 + 1,
+                        "uniques": [f"[+{member}]% Growth"],
+                    }
+                    for member in range(5)
+                ),
+                {"name": f"Branch {branch} Complete"},
+            ],
+        }
+        for branch in range(10)
+    ]
+    beliefs = [
+        {
+            "name": f"Belief {i}",
+            "type": ("Pantheon", "Follower", "Founder", "Enhancer")[i % 4],
+            "uniques": [f"[+{i} Faith] [in all cities]"],
+        }
+        for i in range(80)
+    ]
+    for name, json_object in (
+        ("Techs", techs),
+        ("Policies", policies),
+        ("Beliefs", beliefs),
+    ):
+        (json_dir / f"{name}.json").write_text(
+            json.dumps(json_object, indent="\t"), encoding="UTF-8"
+        )
+
+
+def measure(mod_dir: Path, snapshot_file: Path, repeat: int) -> None:
+    parse: list[float] = []
+    snapshot: list[float] = []
+    for _ in range(repeat):
+        snapshot_file.unlink(missing_ok=True)
+        start = time.perf_counter()
+        load_mod(mod_dir)
+        parse.append(time.perf_counter() - start)
+
+        load_mod(mod_dir, snapshot_file)
+        start = time.perf_counter()
+        load_mod(mod_dir, snapshot_file)
+        snapshot.append(time.perf_counter() - start)
+
+    parse_median = statistics.median(parse)
+    snapshot_median = statistics.median(snapshot)
+    print(f"parse json    {parse_median * 1000:8.2f} ms")
+    print(f"load snapshot {snapshot_median * 1000:8.2f} ms")
+    print(f"speedup       {parse_median / snapshot_median:8.2f}x")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("mod_dir", nargs="?", type=Path)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp:
+        mod_dir = args.mod_dir
+        if mod_dir is None:
+            mod_dir = Path(temp) / "ruleset"
+            generate_ruleset(mod_dir)
+        measure(mod_dir, Path(temp) / "snapshot.pickle", args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Time the upgrade cost matrix of a large generated unit roster."""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from uncivmod.typing.base import Era, Speed, UncivMod, Unit
+from uncivmod.typing.costs import upgrade_costs
+
+
+def generate_mod(lines: int, length: int) -> UncivMod:
+    """Upgrade lines of units, with the eras and speeds of the base game."""
+    units = {
+        f"Unit {line}-{step}": Unit(
+            f"Unit {line}-{step}",
+            "Melee",
+            cost=40 + 25 * step + line % 7,
+            upgrades_to=f"Unit {line}-{step + 1}" if step + 1 < length else "",
+        )
+        for line in range(lines)
+        for step in range(length)
+    }
+    eras = ("Ancient", "Classical", "Medieval", "Renaissance", "Industrial")
+    return UncivMod(
+        units=units,
+        eras={f"{x} era": Era(f"{x} era") for x in (*eras, "Modern")},
+        speeds={
+            name: Speed(name, [], modifier=modifier)
+            for name, modifier in (
+                ("Quick", 0.67),
+                ("Standard", 1),
+                ("Epic", 1.5),
+                ("Marathon", 3),
+            )
+        },
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=250)
+    parser.add_argument("--length", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    mod = generate_mod(args.lines, args.length)
+    times: list[float] = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        costs = upgrade_costs(mod)
+        times.append(time.perf_counter() - start)
+    print(
+        f"{len(mod.units)} units, {len(costs.sources)} upgrades, "
+        f"{costs.gold.size} costs"
+    )
+    print(f"upgrade costs {statistics.median(times) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
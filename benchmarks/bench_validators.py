@@ -0,0 +1,109 @@
+"""Measure how many validated models are constructed per second.
+
+Compares the compiled validators in use with the exception driven chain they
+replaced, where ``_ge0`` tried ``_pos`` and fell back to ``_zero``.
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import TYPE_CHECKING, Any
+
+from attrs import define, field
+
+from uncivmod.typing._validator import _ge0
+from uncivmod.typing.base import Era, Promotion, RGBColour
+
+if TYPE_CHECKING:
+    from attr import Attribute
+
+
+def _pos(self: Any, attribute: Attribute[int], value: int) -> None:  # noqa: ANN401, ARG001
+    if value <= 0:
+        msg = f"{attribute.name} must be positive."
+        raise ValueError(msg)
+
+
+def _zero(self: Any, attribute: Attribute[int], value: int) -> None:  # noqa: ANN401, ARG001
+    if value != 0:
+        msg = f"{attribute.name} must be zero."
+        raise ValueError(msg)
+
+
+def _chained_ge0(self: Any, attribute: Attribute[int], value: int) -> None:  # noqa: ANN401
+    for validator in (_pos, _zero):
+        try:
+            validator(self, attribute, value)
+        except ValueError:
+            pass
+        else:
+            return
+    msg = f"{attribute.name} must not be negative"
+    raise ValueError(msg)
+
+
+def _chained_0_255(self: Any, attribute: Attribute[int], value: int) -> None:  # noqa: ANN401
+    _chained_ge0(self, attribute, value)
+    if value > 255:  # noqa: PLR2004
+        msg = f"{attribute.name} is not between 0 and 255"
+        raise ValueError(msg)
+
+
+@define
+class _ChainedColour:
+    r: int = field(kw_only=True, validator=_chained_0_255)
+    g: int = field(kw_only=True, validator=_chained_0_255)
+    b: int = field(kw_only=True, validator=_chained_0_255)
+
+
+@define
+class _ChainedPromotion:
+    name: str
+    row: int = field(default=0, validator=_chained_ge0)
+    column: int = field(default=0, validator=_chained_ge0)
+
+
+@define
+class _CompiledPromotion:
+    name: str
+    row: int = field(default=0, validator=_ge0)
+    column: int = field(default=0, validator=_ge0)
+
+
+def _rate(statement: Any, number: int) -> float:  # noqa: ANN401
+    return number / min(timeit.repeat(statement, number=number, repeat=5))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    cases = {
+        "RGBColour (0 is the slow path)": (
+            lambda: RGBColour(r=0, g=0, b=0),
+            lambda: _ChainedColour(r=0, g=0, b=0),
+        ),
+        "RGBColour": (
+            lambda: RGBColour(r=200, g=100, b=50),
+            lambda: _ChainedColour(r=200, g=100, b=50),
+        ),
+        "Promotion": (
+            lambda: _CompiledPromotion("Shock I", row=0, column=0),
+            lambda: _ChainedPromotion("Shock I", row=0, column=0),
+        ),
+    }
+    print(f"{'model':32} {'compiled/s':>12} {'chained/s':>12}")
+    for name, (compiled, chained) in cases.items():
+        compiled_rate = _rate(compiled, args.number)
+        chained_rate = _rate(chained, args.number)
+        print(f"{name:32} {compiled_rate:12.0f} {chained_rate:12.0f}")
+    print(f"{'Era':32} {_rate(lambda: Era('Ancient era'), args.number):12.0f}")
+    print(
+        f"{'Promotion (base)':32} "
+        f"{_rate(lambda: Promotion('Shock I', row=0), args.number):12.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
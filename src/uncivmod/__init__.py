@@ -2,3 +2,31 @@
 
 For more information about unciv modding, please visit https://yairm210.github.io/Unciv/Modders/Mods/.
 """
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+__all__ = [
+    "combine",
+    "pipeline",
+    "strings",
+    "typing",
+    "unique",
+    "update_uniques",
+    "watch",
+]
+
+
+def __getattr__(name: str) -> ModuleType:
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def __dir__() -> list[str]:
+    return [*globals(), *__all__]
@@ -1,23 +1,68 @@
 from __future__ import annotations
 
 import copy
+import filecmp
+import hashlib
 import json
 import logging
+import pickle
 import re
 import shutil
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
-from typing import Any, Iterable
+from typing import TYPE_CHECKING, Any, Iterable, Literal
 
-from PIL import Image
+from attrs import Factory, evolve, field, fields, frozen, validators
+
+from uncivmod.strings import strings
+from uncivmod.unique import (
+    OrderedUniques,
+    UniqueMatcher,
+    clear_caches,
+    parse_unique,
+)
+from uncivmod.update_uniques import load_index
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from typing import Callable, Collection, Mapping
+
+    from PIL import Image
+
+    from uncivmod.pipeline import Pipeline
+    from uncivmod.strings import StringPool
+    from uncivmod.typing.base import Promotion
+    from uncivmod.typing.validation import Violation
 
 # _vanilla = ("Civ V - Gods & Kings", "Civ V - Vanilla")
 type JSONDict = dict[str, Any]
 type TechDict = dict[str, int]
+type Aggregate = tuple[tuple[str, str], JSONDict]
+type UnknownUniques = Literal["ask", "keep", "drop"]
 
 _ignore_files = ("ModOptions.json",)
-uniques_all = []
-uniques_avoid = []
+_aggregated_files = ("Buildings", "Nations", "TileImprovements", "Units")
+_partial_version = 2
+_upside_down: JSONDict = {
+    "name": "Upside-Down",
+    "leaderName": "Rotatceps",
+    "adjective": ["Upside-Down"],
+    "style": "Upside Down",
+    "startIntroPart1": "History in best the among generals and soldiers its, other the to world the of end one from battle into triumphantly marched have armies its.nation great a as endured has Down-Upside - enemies often and - competitors by surrounded although. Letters and arts, culture of center world the been Down-Upside has long. Rotatceps, you to triumph and life long.",
+    "startIntroPart2": "Time of test the stand will that civilization a build you can? World the of center again once Down-Upside make you will? All to order and peace bringing, again rises empire your that it to see you will? Down-Upside of glory the reclaim more once to you to turn people your, Rotatceps mighty O?",
+    "declaringWar": "Time payback it's, now. It know you, badly very yourself behaved you've.",
+    "attacked": "It swear I! Dearly regret soon will you! Fool!",
+    "defeated": "Triumph your in merciful be will you hope I. Yours is...day the.",
+    "introduction": "Bravery military for renowned are who, you with relationship just and fair a for hope we.",
+    "neutralHello": "Peace you wish I.",
+    "hateHello": "Want you do what?",
+    "tradeRequest": "Me with deal this make to - existing for reason a have do you that appears it.",
+    "outerColor": [255, 255, 255],
+    "innerColor": [0, 0, 0],
+    "uniqueName": "The World Turned Upside-Down",
+    "uniqueText": "All the special advantages that other nations have, combined into one, with none of the special disadvantages. Are you ready to turn the world upside down?",
+}
 
 
 def prettify_json(path: Path, output: Path | None) -> None:
@@ -59,150 +104,467 @@ def format_json(json_file: Path, output_dir: Path, mod_name: str) -> None:
     prettify_json(json_file, output_file)
 
 
-def uniques_paramless(unique_file: Path) -> list[str]:
+def uniques_paramless(unique_file: Path) -> frozenset[str]:
     with unique_file.open(encoding="UTF-8") as f:
         uniques = f.read().splitlines()
 
-    logging.debug([re.sub(r"\[.*?\]", r"[]", x) for x in uniques])
-    return [re.sub(r"\[.*?\]", r"[]", x) for x in uniques]
+    templates = frozenset(parse_unique(x).template for x in uniques)
+    logging.debug(templates)
+    return templates
 
 
-def clean_mods(input_dir: Path, output_dir: Path, parent_dir: Path) -> None:
-    for mod_dir in input_dir.iterdir():
-        if not mod_dir.is_dir():
-            continue
+def load_templates(unique_dir: Path) -> tuple[str, ...]:
+    index_file = unique_dir / "uniques.json"
+    if index_file.is_file():
+        templates = load_index(index_file)
+        if templates is not None:
+            return tuple(templates)
+
+    with (unique_dir / "uniques.txt").open(encoding="UTF-8") as f:
+        return tuple(f.read().splitlines())
+
 
+def known_names(
+    output_dir: Path, cache: SourceCache | None = None
+) -> dict[str, frozenset[str]]:
+    if cache is None:
+        cache = SourceCache()
+
+    names: defaultdict[str, set[str]] = defaultdict(set)
+    for mod_dir in sorted(output_dir.iterdir()):
         json_dir = mod_dir / "jsons"
+        if not json_dir.is_dir():
+            continue
+
+        for string, placeholders in (
+            ("Buildings", ("buildingName",)),
+            ("Units", ("unit",)),
+            ("UnitPromotions", ("promotion",)),
+            ("TileResources", ("resource", "stockpiledResource")),
+            ("TileImprovements", ("improvementName",)),
+            ("Terrains", ("terrainName",)),
+            ("Eras", ("era",)),
+        ):
+            if not (json_dir / f"{string}.json").is_file():
+                continue
+            for json_object in cache.load_json(json_dir / f"{string}.json"):
+                json_object: JSONDict
+                entity_names = {json_object["name"]}
+                if "replaces" in json_object:
+                    entity_names.add(
+                        json_object["replaces"][::-1].lower().title()
+                    )
+                if string == "TileImprovements":
+                    entity_names.add(
+                        json_object["name"][::-1].lower().capitalize()
+                    )
+                for placeholder in placeholders:
+                    names[placeholder] |= entity_names
+
+        if (json_dir / "Techs.json").is_file():
+            for column in cache.load_json(json_dir / "Techs.json"):
+                names["tech"].update(x["name"] for x in column["techs"])
+
+        if (json_dir / "Policies.json").is_file():
+            for branch in cache.load_json(json_dir / "Policies.json"):
+                names["policy"].add(branch["name"])
+                names["policy"].update(
+                    x["name"] for x in branch.get("policies", [])
+                )
 
-        for json_file in (json_dir).iterdir():
-            format_json(json_file, output_dir, mod_dir.name)
+    return {key: frozenset(item) for key, item in names.items()}
 
-        shutil.copytree(
-            mod_dir / "Images",
-            output_dir / mod_dir.name / "Images",
-            dirs_exist_ok=True,
-        )
 
-        shutil.copytree(
-            mod_dir / "Images",
-            parent_dir / "Combined" / "Images",
-            dirs_exist_ok=True,
-        )
+@frozen
+class CombineContext:
+    """Everything a combine run depends on, passed explicitly.
+
+    The unique matcher is built on first use and left out when pickling, so a
+    context is cheap to send to worker processes and several combines with
+    different contexts can run side by side.
+    """
 
-        shutil.copyfile(
-            mod_dir / "credits.md", output_dir / mod_dir.name / "credits.md"
+    templates: tuple[str, ...] = ()
+    known: Mapping[str, Collection[str]] = Factory(dict)
+    avoid: frozenset[str] = frozenset()
+    tech: TechDict = Factory(dict)
+    unknown_uniques: UnknownUniques = field(
+        default="ask", validator=validators.in_(("ask", "keep", "drop"))
+    )
+    nation: JSONDict = Factory(lambda: copy.deepcopy(_upside_down))
+    unique_dir: Path | None = None
+    input_dir: Path | None = None
+    output_dir: Path | None = None
+    combined_dir: Path | None = None
+    default_dir: Path | None = None
+    cache_dir: Path | None = None
+    game_dir: Path | None = None
+    mods: frozenset[str] | None = field(
+        default=None, converter=lambda x: None if x is None else frozenset(x)
+    )
+    max_tech_column: int | None = None
+    _matcher: UniqueMatcher | None = field(
+        default=None, init=False, eq=False, repr=False
+    )
+
+    @classmethod
+    def from_dir(cls, parent_dir: Path, **kwargs: Any) -> CombineContext:
+        """Context for the folder layout of a checkout, catalog included."""
+        return cls(
+            **{
+                "avoid": uniques_paramless(
+                    parent_dir / "uniques" / "unwanted.txt"
+                ),
+                "templates": load_templates(parent_dir / "uniques"),
+                "unique_dir": parent_dir / "uniques",
+                "input_dir": parent_dir / "Input",
+                "output_dir": parent_dir / "Output",
+                "combined_dir": parent_dir / "Combined",
+                "default_dir": parent_dir / "Default",
+                "cache_dir": parent_dir / "Cache",
+            }
+            | kwargs
         )
 
+    @property
+    def matcher(self) -> UniqueMatcher:
+        if self._matcher is None:
+            object.__setattr__(
+                self, "_matcher", UniqueMatcher(self.templates, self.known)
+            )
+        return self._matcher
+
+    @property
+    def unique_to(self) -> str:
+        return self.nation["name"]
+
+    def includes_mod(self, mod_name: str) -> bool:
+        return self.mods is None or mod_name in self.mods
+
+    def includes(self, entity: JSONDict) -> bool:
+        """Whether an entity is available by the last allowed tech column."""
+        if self.max_tech_column is None or "requiredTech" not in entity:
+            return True
+        return self.tech[entity["requiredTech"]] <= self.max_tech_column
+
+    def require_dirs(self, *names: str) -> list[Path]:
+        """Return the named directories, raising if any of them is unset."""
+        dirs: list[Path | None] = [getattr(self, x) for x in names]
+        missing = [x for x, y in zip(names, dirs) if y is None]
+        if missing:
+            msg = f"combine context has no {', '.join(missing)}"
+            raise ValueError(msg)
+        return dirs  # type: ignore[return-value]
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            x.name: getattr(self, x.name)
+            for x in fields(type(self))
+            if x.name != "_matcher"
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for key, item in state.items():
+            object.__setattr__(self, key, item)
+        object.__setattr__(self, "_matcher", None)
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class SourceCache:
+    """Parsed JSON and decoded images shared by the targets of a run.
+
+    Files are checked by size and modification time, and only their latest
+    version is kept. Images are keyed by their path relative to the target
+    folder, so targets whose folders hold copies of the same images decode
+    each image only once. Cached objects must not be modified. Their strings
+    are shared through ``pool``, the shared `strings` pool by default.
+    """
+
+    def __init__(self, pool: StringPool | None = None) -> None:
+        self.pool = strings if pool is None else pool
+        self._json: dict[Path, tuple[tuple[int, int], Any]] = {}
+        self._images: dict[
+            tuple[Path, int], tuple[tuple[int, int], Image.Image]
+        ] = {}
+        self._saved: dict[Path, tuple[Any, ...]] = {}
+        self._stale = 0
+
+    def load_json(self, json_file: Path) -> Any:
+        stamp = _stamp(json_file)
+        cached = self._json.get(json_file)
+        if cached is None or cached[0] != stamp:
+            self._stale += cached is not None
+            cached = stamp, self.pool.load_json(json_file)
+            self._json[json_file] = cached
+        return cached[1]
+
+    def transpose(
+        self, image_file: Path, root: Path, method: int
+    ) -> Image.Image:
+        """Decode an image under ``root`` and transpose it, once per file."""
+        from PIL import Image
+
+        key = image_file.relative_to(root), method
+        stamp = _stamp(image_file)
+        cached = self._images.get(key)
+        if cached is None or cached[0] != stamp:
+            with Image.open(image_file) as image:
+                cached = stamp, image.transpose(method)
+            self._images[key] = cached
+        return cached[1]
+
+    def save_transposed(
+        self, image_file: Path, root: Path, method: int, output_file: Path
+    ) -> None:
+        """Save a transposed image unless ``output_file`` is already it.
+
+        An output is current while it is unchanged since this cache saved it
+        from the same version of the same image, so a rebuild only encodes
+        the images whose source changed.
+        """
+        source = image_file, method, _stamp(image_file)
+        saved = self._saved.get(output_file)
+        if (
+            saved is not None
+            and saved[:3] == source
+            and output_file.is_file()
+            and _stamp(output_file) == saved[3]
+        ):
+            return
+        self.transpose(image_file, root, method).save(output_file)
+        self._saved[output_file] = *source, _stamp(output_file)
+
+    def compact(self, threshold: int = 0) -> None:
+        """Forget removed json files and pool the remaining ones afresh.
+
+        This drops the strings of old file versions from the pool, and the
+        parsed uniques of old files, which keeps a long-lived cache from
+        growing. As it pools every file again, it only runs once more than
+        ``threshold`` files were removed or replaced since the last time.
+        """
+        json_cache = {x: y for x, y in self._json.items() if x.is_file()}
+        self._stale += len(self._json) - len(json_cache)
+        self._json = json_cache
+        if self._stale <= threshold:
+            return
+        self._stale = 0
+        self.pool.clear()
+        for _, json_object in self._json.values():
+            self.pool.intern_json(json_object)
+        clear_caches()
+
+
+def clean_mod(mod_dir: Path, output_dir: Path) -> None:
+    json_dir = mod_dir / "jsons"
+
+    for json_file in sorted(json_dir.iterdir()):
+        format_json(json_file, output_dir, mod_dir.name)
+
+    shutil.copytree(
+        mod_dir / "Images",
+        output_dir / mod_dir.name / "Images",
+        dirs_exist_ok=True,
+    )
+
+    shutil.copyfile(
+        mod_dir / "credits.md", output_dir / mod_dir.name / "credits.md"
+    )
+
+
+def copy_images(context: CombineContext) -> None:
+    """Replace the combined images with those of the cleaned mods it has."""
+    output_dir, combined_dir = context.require_dirs(
+        "output_dir", "combined_dir"
+    )
+    shutil.rmtree(combined_dir / "Images", ignore_errors=True)
+    for mod_dir in sorted(output_dir.iterdir()):
+        if (mod_dir / "Images").is_dir() and context.includes_mod(
+            mod_dir.name
+        ):
+            shutil.copytree(
+                mod_dir / "Images",
+                combined_dir / "Images",
+                dirs_exist_ok=True,
+            )
+
+
+def clean_mods(context: CombineContext) -> None:
+    input_dir, output_dir = context.require_dirs("input_dir", "output_dir")
+    for mod_dir in sorted(input_dir.iterdir()):
+        if mod_dir.is_dir():
+            clean_mod(mod_dir, output_dir)
+
+    copy_images(context)
+
 
 class Combined:
-    def __init__(self) -> None:
-        self.nations: JSONDict = {
-            "name": "Upside-Down",
-            "leaderName": "Rotatceps",
-            "adjective": ["Upside-Down"],
-            "style": "Upside Down",
-            "startIntroPart1": "History in best the among generals and soldiers its, other the to world the of end one from battle into triumphantly marched have armies its.nation great a as endured has Down-Upside - enemies often and - competitors by surrounded although. Letters and arts, culture of center world the been Down-Upside has long. Rotatceps, you to triumph and life long.",
-            "startIntroPart2": "Time of test the stand will that civilization a build you can? World the of center again once Down-Upside make you will? All to order and peace bringing, again rises empire your that it to see you will? Down-Upside of glory the reclaim more once to you to turn people your, Rotatceps mighty O?",
-            "declaringWar": "Time payback it's, now. It know you, badly very yourself behaved you've.",
-            "attacked": "It swear I! Dearly regret soon will you! Fool!",
-            "defeated": "Triumph your in merciful be will you hope I. Yours is...day the.",
-            "introduction": "Bravery military for renowned are who, you with relationship just and fair a for hope we.",
-            "neutralHello": "Peace you wish I.",
-            "hateHello": "Want you do what?",
-            "tradeRequest": "Me with deal this make to - existing for reason a have do you that appears it.",
-            "outerColor": [255, 255, 255],
-            "innerColor": [0, 0, 0],
-            "uniqueName": "The World Turned Upside-Down",
-            "uniqueText": "All the special advantages that other nations have, combined into one, with none of the special disadvantages. Are you ready to turn the world upside down?",
-            "uniques": [],
-            "cities": [],
-            "spyNames": [],
-        }
+    def __init__(
+        self,
+        context: CombineContext | None = None,
+        cache: SourceCache | None = None,
+    ) -> None:
+        self.context = CombineContext() if context is None else context
+        self.cache = SourceCache() if cache is None else cache
+        self._nation_uniques: OrderedUniques | None = None
+        self._cities: dict[str, None] = {}
+        self._spy_names: dict[str, None] = {}
         self.buildings: dict[str, JSONDict] = {}
+        self._building_groups: defaultdict[str, list[Aggregate]] = (
+            defaultdict(list)
+        )
         self._base_buildings: dict[str, JSONDict] = {}
         self.improvements: dict[str, JSONDict] = {}
+        self._improvement_groups: defaultdict[str, list[Aggregate]] = (
+            defaultdict(list)
+        )
         self.units: dict[str, JSONDict] = {}
+        self._unit_groups: defaultdict[str, list[Aggregate]] = defaultdict(
+            list
+        )
         self._base_units: dict[str, JSONDict] = {}
-        self.tech: TechDict = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {x: y for x, y in vars(self).items() if x != "cache"}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.cache = SourceCache()
+        vars(self).update(state)
+
+    def use_cache(self, cache: SourceCache) -> None:
+        """Switch to ``cache``, pooling the strings held through its pool."""
+        vars(self).update(cache.pool.intern_json(self.__getstate__()))
+        self.cache = cache
 
     def set_tech(self, tech: list[JSONDict]) -> None:
-        self.tech = clean_tech(tech)
+        self.context = evolve(self.context, tech=clean_tech(tech))
 
     def add_nation(self, nation: JSONDict) -> None:
         if "cityStateType" in nation:
             return
 
-        self.nations = update_uniques(self.nations, nation)
+        if "uniques" in nation:
+            self._update_nation_uniques(
+                check_uniques(nation["uniques"], self.context)
+            )
 
         if "cities" in nation:
             city_reverse: str = nation["cities"][0][::-1].lower().capitalize()
-            if city_reverse not in self.nations["cities"]:
-                self.nations["cities"].append(city_reverse)
+            self._cities.setdefault(city_reverse)
 
         if "spyNames" in nation:
             spy_reverse: str = nation["spyNames"][0][::-1].lower().capitalize()
-            if spy_reverse not in self.nations["spyNames"]:
-                self.nations["spyNames"].append(spy_reverse)
+            self._spy_names.setdefault(spy_reverse)
+
+    def _update_nation_uniques(self, uniques: list[str]) -> None:
+        # None is the identity of merge, but even the first uniques must
+        # lose the unwanted ones.
+        if self._nation_uniques is None:
+            self._nation_uniques = OrderedUniques()
+        self._nation_uniques.update(uniques, self.context.avoid)
 
     def add_building(self, building: JSONDict) -> None:
         if "replaces" not in building:
             self._base_buildings[building["name"]] = building
             return
 
-        base_building: str = building["replaces"]
-        if base_building not in self.buildings:
-            self.buildings[base_building] = building | {
-                "name": base_building[::-1].lower().title(),
-                "uniqueTo": "Upside-Down",
-            }
+        if not self.context.includes(building):
+            return
 
-        else:
-            self.buildings[base_building] = update_building(
-                self.buildings[base_building], building, self.tech
+        base_building: str = building["replaces"]
+        name = base_building[::-1].lower().title()
+        self._building_groups[base_building].append(
+            aggregate(
+                building,
+                prepare_uniques(
+                    building, self.context, [(name, building["name"])]
+                )
+                | {"name": name, "uniqueTo": self.context.unique_to},
             )
+        )
 
     def add_improvement(self, improvement: JSONDict) -> None:
+        if not self.context.includes(improvement):
+            return
+
         if "uniqueTo" not in improvement:
             return
 
         name: str = improvement["name"]
-        if name not in self.improvements:
-            self.improvements[name] = improvement | {
-                "name": name[::-1].lower().capitalize(),
-                "uniqueTo": "Upside-Down",
-            }
-
-        else:
-            self.improvements[name] = update_improvement(
-                self.improvements[name], improvement, self.tech
+        name_reverse = name[::-1].lower().capitalize()
+        self._improvement_groups[name].append(
+            aggregate(
+                improvement,
+                prepare_uniques(
+                    improvement, self.context, [(name_reverse, name)]
+                )
+                | {"name": name_reverse, "uniqueTo": self.context.unique_to},
             )
+        )
 
     def add_unit(self, unit: JSONDict) -> None:
         if "replaces" not in unit:
             self._base_units[unit["name"]] = unit
             return
 
+        if not self.context.includes(unit):
+            return
+
         base_unit: str = unit["replaces"]
-        if base_unit not in self.units:
-            self.units[base_unit] = unit | {
-                "name": base_unit[::-1].lower().title(),
-                "uniqueTo": "Upside-Down",
-                "unitType": [unit["unitType"]],
-            }
-            if "upgradesTo" in unit:
-                self.units[base_unit]["unitType"] = [
-                    (unit["unitType"], unit["upgradesTo"])
-                ]
-                del self.units[base_unit]["upgradesTo"]
-            else:
-                self.units[base_unit]["unitType"] = [(unit["unitType"], "")]
+        name = base_unit[::-1].lower().title()
+        self._unit_groups[base_unit].append(
+            aggregate(
+                unit,
+                prepare_uniques(
+                    group_unit_type(unit), self.context, [(name, unit["name"])]
+                )
+                | {"name": name, "uniqueTo": self.context.unique_to},
+            )
+        )
 
-        else:
-            self.units[base_unit] = update_unit(
-                self.units[base_unit], unit, self.tech
+    def reduce(self, executor: Executor | None = None) -> None:
+        """Merge the added entities sharing a base.
+
+        Merges of all groups run as rounds of a tree reduction, each round
+        mapped over ``executor`` when given.
+        """
+        for groups, reduced, merge in (
+            (self._building_groups, self.buildings, merge_building),
+            (self._improvement_groups, self.improvements, merge_improvement),
+            (self._unit_groups, self.units, merge_unit),
+        ):
+            merge_aggregate = partial(
+                merge_aggregates, partial(merge, context=self.context)
             )
+            for key, item in reduce_groups(
+                groups, merge_aggregate, executor
+            ).items():
+                groups[key] = [item]
+                reduced[key] = item[1]
+
+    def merge(self, other: Combined) -> None:
+        """Merge in the entities added to another, e.g. per-mod, Combined."""
+        for groups, other_groups in (
+            (self._building_groups, other._building_groups),
+            (self._improvement_groups, other._improvement_groups),
+            (self._unit_groups, other._unit_groups),
+        ):
+            for key, group in other_groups.items():
+                groups[key].extend(group)
+        self._base_buildings |= other._base_buildings
+        self._base_units |= other._base_units
+
+        if other._nation_uniques is not None:
+            self._update_nation_uniques(other._nation_uniques.to_list())
+        self._cities |= other._cities
+        self._spy_names |= other._spy_names
 
     def to_building_json(self, mod_dir: Path) -> list[JSONDict]:
+        from PIL import Image
+
         building_json: list[JSONDict] = []
         for key, item in self.buildings.items():
             if key not in self._base_buildings:
@@ -210,25 +572,34 @@ class Combined:
                 raise Exception(msg)
 
             building_json.append(
-                update_building(item, self._base_buildings[key], self.tech)
+                update_building(
+                    item, self._base_buildings[key], self.context
+                )
             )
 
-            Image.open(
-                mod_dir / "Images" / "BuildingIcons" / f"{key}.png"
-            ).transpose(Image.ROTATE_180).save(
-                mod_dir / "Images" / "BuildingIcons" / f"{item["name"]}.png"
+            self.cache.save_transposed(
+                mod_dir / "Images" / "BuildingIcons" / f"{key}.png",
+                mod_dir,
+                Image.ROTATE_180,
+                mod_dir / "Images" / "BuildingIcons" / f"{item["name"]}.png",
             )
         return building_json
 
     def to_improvement_json(self, mod_dir: Path) -> list[JSONDict]:
+        from PIL import Image
+
         improvement_json: list[JSONDict] = []
         for key, item in self.improvements.items():
             improvement_json.append(item)
 
-            Image.open(
-                mod_dir / "Images" / "ImprovementIcons" / f"{key}.png"
-            ).transpose(Image.ROTATE_180).save(
-                mod_dir / "Images" / "ImprovementIcons" / f"{item["name"]}.png"
+            self.cache.save_transposed(
+                mod_dir / "Images" / "ImprovementIcons" / f"{key}.png",
+                mod_dir,
+                Image.ROTATE_180,
+                mod_dir
+                / "Images"
+                / "ImprovementIcons"
+                / f"{item["name"]}.png",
             )
 
             image_file = (
@@ -240,21 +611,37 @@ class Combined:
                 / f"{key}.png"
             )
             if image_file.is_file():
-                Image.open(image_file).transpose(Image.FLIP_TOP_BOTTOM).save(
+                self.cache.save_transposed(
+                    image_file,
+                    mod_dir,
+                    Image.FLIP_TOP_BOTTOM,
                     mod_dir
                     / "Images"
                     / "TileSets"
                     / "FantasyHex"
                     / "Tiles"
-                    / f"{item["name"]}.png"
+                    / f"{item["name"]}.png",
                 )
 
         return improvement_json
 
-    def to_nation_json(self, mod_dir: Path | None = None):
-        return [self.nations]
+    def to_nation_json(self, mod_dir: Path | None = None) -> list[JSONDict]:
+        return [
+            self.context.nation
+            | {
+                "uniques": (
+                    []
+                    if self._nation_uniques is None
+                    else self._nation_uniques.to_list()
+                ),
+                "cities": list(self._cities),
+                "spyNames": list(self._spy_names),
+            }
+        ]
 
     def to_unit_json(self, mod_dir: Path) -> list[JSONDict]:
+        from PIL import Image
+
         unit_json: list[JSONDict] = []
         for key, item in self.units.items():
             if key not in self._base_units:
@@ -262,7 +649,9 @@ class Combined:
                 raise Exception(msg)
 
             base_unit = self._base_units[key]
-            unit_group: JSONDict = update_unit(item, base_unit, self.tech)
+            unit_group: JSONDict = update_unit(
+                item, base_unit, self.context
+            )
             if "attackSound" in base_unit:
                 unit_group |= {"attackSound": base_unit["attackSound"]}
 
@@ -275,6 +664,7 @@ class Combined:
             uniques, all_name = add_transform(uniques, unit_group, base_unit)
             unit_json.extend(
                 separate_sub_unit(
+                    self.cache,
                     mod_dir,
                     key,
                     unit_group,
@@ -286,10 +676,11 @@ class Combined:
             )
 
             for name in all_name:
-                Image.open(
-                    mod_dir / "Images" / "UnitIcons" / f"{key}.png"
-                ).transpose(Image.ROTATE_180).save(
-                    mod_dir / "Images" / "UnitIcons" / f"{name}.png"
+                self.cache.save_transposed(
+                    mod_dir / "Images" / "UnitIcons" / f"{key}.png",
+                    mod_dir,
+                    Image.ROTATE_180,
+                    mod_dir / "Images" / "UnitIcons" / f"{name}.png",
                 )
 
                 image_dir = (
@@ -301,15 +692,16 @@ class Combined:
                     / f"{key}.png"
                 )
                 if image_dir.is_file():
-                    Image.open(image_dir).transpose(
-                        Image.FLIP_TOP_BOTTOM
-                    ).save(
+                    self.cache.save_transposed(
+                        image_dir,
+                        mod_dir,
+                        Image.FLIP_TOP_BOTTOM,
                         mod_dir
                         / "Images"
                         / "TileSets"
                         / "FantasyHex"
                         / "Units"
-                        / f"{name}.png"
+                        / f"{name}.png",
                     )
 
         for key, item in self._base_units.items():
@@ -325,21 +717,48 @@ class Combined:
                 / f"{key}.png"
             )
             if image_dir.is_file():
-                Image.open(image_dir).transpose(Image.FLIP_TOP_BOTTOM).save(
+                self.cache.save_transposed(
+                    image_dir,
+                    mod_dir,
+                    Image.FLIP_TOP_BOTTOM,
                     mod_dir
                     / "Images"
                     / "TileSets"
                     / "FantasyHex"
                     / "Units"
-                    / f"{item["name"]}-Upside Down.png"
+                    / f"{item["name"]}-Upside Down.png",
                 )
 
         return unit_json
 
-    def to_json(
-        self, mod_dir: Path, output_dir: Path, default_dic: Path | None = None
-    ) -> None:
+    def promotion_violations(self) -> list[Violation]:
+        """Starting promotions that some type of a merged unit can not have.
+
+        Promotions come from every included mod.
+        """
+        from uncivmod.typing.filehandler import LazyUncivMod
+        from uncivmod.typing.promotions import PromotionIndex
+
+        (output_dir,) = self.context.require_dirs("output_dir")
+        promotions: dict[str, Promotion] = {}
+        for mod_dir in sorted(output_dir.iterdir()):
+            if mod_dir.is_dir() and self.context.includes_mod(mod_dir.name):
+                promotions |= LazyUncivMod(
+                    mod_dir, self.cache.pool, validate=False
+                ).promotions
+        return PromotionIndex(promotions).merged_violations(
+            {
+                key: update_unit(item, self._base_units[key], self.context)
+                for key, item in self.units.items()
+                if key in self._base_units
+            }
+        )
+
+    def to_json(self) -> None:
+        (mod_dir,) = self.context.require_dirs("combined_dir")
+        self.reduce()
         json_dir = mod_dir / "jsons"
+        json_dir.mkdir(parents=True, exist_ok=True)
         for json_file in json_dir.iterdir():
             if json_file.name != "ModOptions.json":
                 json_file.unlink()
@@ -354,11 +773,83 @@ class Combined:
                 (mod_dir / "jsons" / f"{string}.json").write_text(
                     json.dumps(json_object, indent="\t"), encoding="UTF-8"
                 )
-        combine_json(mod_dir, output_dir, default_dic)
+        combine_json(self.context, self.cache)
+
+
+def aggregate(entity: JSONDict, canonical: JSONDict) -> Aggregate:
+    """Pair a canonical entity with a sort key derived from its source."""
+    return (entity["name"], json.dumps(entity, sort_keys=True)), canonical
+
+
+def merge_aggregates(
+    merge: Callable[[JSONDict, JSONDict], JSONDict],
+    first: Aggregate,
+    second: Aggregate,
+) -> Aggregate:
+    """Merge two aggregates, the one with the smaller sort key leading.
+
+    Every merge rule is associative and commutative (max gains, min costs,
+    sorted unions, oldest tech, unwanted uniques kept only if all have them).
+    Fields without a rule come from the leading entity, so a group reduces to
+    the same entity whatever the order or grouping of merges.
+    """
+    if second[0] < first[0]:
+        first, second = second, first
+    return first[0], merge(first[1], second[1])
+
+
+def reduce_groups(
+    groups: dict[str, list[Aggregate]],
+    merge: Callable[[Aggregate, Aggregate], Aggregate],
+    executor: Executor | None = None,
+) -> dict[str, Aggregate]:
+    """Tree-reduce every group, mapping each round of merges over executor."""
+    remaining = {key: list(group) for key, group in groups.items() if group}
+    while any(len(x) > 1 for x in remaining.values()):
+        keys = [k for k, x in remaining.items() for _ in range(len(x) // 2)]
+        firsts = [y for x in remaining.values() for y in x[: len(x) - 1 : 2]]
+        seconds = [y for x in remaining.values() for y in x[1::2]]
+        if executor is None:
+            merged = map(merge, firsts, seconds)
+        else:
+            merged = executor.map(
+                merge, firsts, seconds, chunksize=max(1, len(keys) // 64)
+            )
+
+        reduced: dict[str, list[Aggregate]] = {key: [] for key in remaining}
+        for key, item in zip(keys, merged):
+            reduced[key].append(item)
+        for key, group in remaining.items():
+            if len(group) % 2:
+                reduced[key].append(group[-1])
+        remaining = reduced
+
+    return {key: group[0] for key, group in remaining.items()}
+
+
+def group_unit_type(unit: JSONDict) -> JSONDict:
+    """Fold ``upgradesTo`` into a list of (unitType, upgradesTo) pairs."""
+    return_json = copy.copy(unit)
+    return_json["unitType"] = [
+        (return_json["unitType"], return_json.pop("upgradesTo", ""))
+    ]
+    return return_json
 
 
 def update_building(
-    original: JSONDict, replace: JSONDict, tech: TechDict
+    original: JSONDict, replace: JSONDict, context: CombineContext
+) -> JSONDict:
+    return merge_building(
+        original,
+        prepare_uniques(
+            replace, context, [(original["name"], replace["name"])]
+        ),
+        context,
+    )
+
+
+def merge_building(
+    original: JSONDict, replace: JSONDict, context: CombineContext
 ) -> JSONDict:
     return_json = copy.deepcopy(original)
     gains_attr = [
@@ -385,18 +876,28 @@ def update_building(
         return_json = update_cost(cost, return_json, replace)
     for multi_gains in multi_gains_attr:
         return_json = update_multi_gain(multi_gains, return_json, replace)
-    return_json = update_uniques(
-        return_json, replace, [(return_json["name"], replace["name"])]
-    )
+    return_json = merge_uniques(return_json, replace, context.avoid)
     return_json = update_oldest_tech(
-        "requiredTech", return_json, replace, tech
+        "requiredTech", return_json, replace, context.tech
     )
 
     return return_json
 
 
 def update_improvement(
-    original: JSONDict, replace: JSONDict, tech: TechDict
+    original: JSONDict, replace: JSONDict, context: CombineContext
+) -> JSONDict:
+    return merge_improvement(
+        original,
+        prepare_uniques(
+            replace, context, [(original["name"], replace["name"])]
+        ),
+        context,
+    )
+
+
+def merge_improvement(
+    original: JSONDict, replace: JSONDict, context: CombineContext
 ) -> JSONDict:
     return_json = copy.deepcopy(original)
     gains_attr = [
@@ -412,19 +913,31 @@ def update_improvement(
     for gain in gains_attr:
         return_json = update_gain(gain, return_json, replace)
     return_json = update_cost("turnsToBuild", return_json, replace)
-    return_json = update_uniques(
-        return_json, replace, [(replace["name"], original["name"])]
-    )
+    return_json = merge_uniques(return_json, replace, context.avoid)
     return_json = update_table("terrainsCanBeBuiltOn", return_json, replace)
     return_json = update_oldest_tech(
-        "requiredTech", return_json, replace, tech
+        "requiredTech", return_json, replace, context.tech
     )
 
     return return_json
 
 
 def update_unit(
-    original: JSONDict, replace: JSONDict, tech: TechDict
+    original: JSONDict, replace: JSONDict, context: CombineContext
+) -> JSONDict:
+    return merge_unit(
+        original,
+        prepare_uniques(
+            group_unit_type(replace),
+            context,
+            [(original["name"], replace["name"])],
+        ),
+        context,
+    )
+
+
+def merge_unit(
+    original: JSONDict, replace: JSONDict, context: CombineContext
 ) -> JSONDict:
     return_json = copy.deepcopy(original)
     gains_attr = [
@@ -442,19 +955,13 @@ def update_unit(
     for cost in costs_attr:
         return_json = update_cost(cost, return_json, replace)
     return_json = update_table("promotions", return_json, replace)
-    if "upgradesTo" in replace:
-        unit_type = (replace["unitType"], replace["upgradesTo"])
-    else:
-        unit_type = (replace["unitType"], "")
-    return_json["unitType"] = list({*return_json["unitType"], unit_type})
-    return_json = update_uniques(
-        return_json, replace, [(replace["name"], return_json["name"])]
-    )
+    return_json = update_table("unitType", return_json, replace)
+    return_json = merge_uniques(return_json, replace, context.avoid)
     return_json = update_oldest_tech(
-        "requiredTech", return_json, replace, tech
+        "requiredTech", return_json, replace, context.tech
     )
     return_json = update_newest_tech(
-        "obsoleteTech", return_json, replace, tech
+        "obsoleteTech", return_json, replace, context.tech
     )
 
     if "requiredResource" in return_json and "requiredResource" not in replace:
@@ -480,7 +987,7 @@ def update_cost(key: str, original: JSONDict, replace: JSONDict) -> JSONDict:
     return_json = copy.deepcopy(original)
 
     if key in replace and key in return_json:
-        return_json[key] = max(return_json[key], replace[key])
+        return_json[key] = min(return_json[key], replace[key])
     elif key in replace and replace[key] < 0:
         return_json[key] = replace[key]
     elif key in return_json and return_json[key] >= 0:
@@ -495,8 +1002,7 @@ def update_multi_gain(
     return_json = copy.deepcopy(original)
 
     if key in replace and key in return_json:
-        gains: set[str] = {*return_json[key], *replace[key]}
-        for gain in gains:
+        for gain in sorted_union(return_json[key], replace[key]):
             return_json[key] = update_gain(
                 gain, return_json[key], replace[key]
             )
@@ -510,46 +1016,63 @@ def update_table(key: str, original: JSONDict, replace: JSONDict) -> JSONDict:
     return_json = copy.deepcopy(original)
 
     if key in replace and key in return_json:
-        return_json[key] = list({*return_json[key], *replace[key]})
+        return_json[key] = sorted_union(return_json[key], replace[key])
     elif key in replace:
         return_json[key] = replace[key]
 
     return return_json
 
 
-def update_uniques(
-    original: JSONDict,
-    replace: JSONDict,
+def sorted_union[T](original: Iterable[T], replace: Iterable[T]) -> list[T]:
+    """Union of both, sorted so that it does not depend on merge order."""
+    return sorted({*original, *replace})
+
+
+def prepare_uniques(
+    entity: JSONDict,
+    context: CombineContext,
     name_replace: Iterable[tuple[str, str]] | None = None,
 ) -> JSONDict:
-    return_json = copy.deepcopy(original)
+    """Rename names in an entity's uniques and drop unwanted unknown ones."""
+    return_json = copy.copy(entity)
 
-    if "uniques" not in replace:
+    if "uniques" not in return_json:
         return return_json
 
-    new_uniques: list[str] = replace["uniques"]
-    if name_replace is not None and "uniques" in replace:
-        for i, unique in enumerate(new_uniques):
-            unique: str
-            unique_amend = unique
-            for new_name, old_name in name_replace:
-                unique_amend = unique_amend.replace(old_name, new_name)
-            new_uniques[i] = unique_amend
-
-    old_uniques: list[str] = []
-    if "uniques" in return_json:
-        old_uniques = copy.deepcopy(return_json["uniques"])
-    new_uniques = check_uniques(new_uniques)
-
-    combined_uniques = avoid_uniques(old_uniques, new_uniques)
+    new_uniques: list[str] = return_json["uniques"]
+    if name_replace is not None:
+        new_uniques = [rename_unique(x, name_replace) for x in new_uniques]
+
+    new_uniques = check_uniques(new_uniques, context)
+    if new_uniques:
+        return_json["uniques"] = new_uniques
+    else:
+        del return_json["uniques"]
+
+    return return_json
+
+
+def merge_uniques(
+    original: JSONDict, replace: JSONDict, avoid: Collection[str]
+) -> JSONDict:
+    return_json = copy.deepcopy(original)
+
+    combined_uniques = OrderedUniques(return_json.get("uniques", []))
+    combined_uniques.update(replace.get("uniques", []), avoid)
     if combined_uniques:
-        return_json["uniques"] = combined_uniques
+        return_json["uniques"] = sorted(combined_uniques.to_list())
     elif "uniques" in return_json:
         del return_json["uniques"]
 
     return return_json
 
 
+def rename_unique(unique: str, name_replace: Iterable[tuple[str, str]]) -> str:
+    for new_name, old_name in name_replace:
+        unique = unique.replace(old_name, new_name)
+    return unique
+
+
 def update_oldest_tech(
     key: str, original: JSONDict, replace: JSONDict, tech: TechDict
 ) -> JSONDict:
@@ -588,39 +1111,21 @@ def clean_tech(tech_tree: list[JSONDict]) -> TechDict:
     return tech_cleaned
 
 
-def avoid_uniques(old_uniques: list[str], new_uniques: list[str]) -> list[str]:
-    old_cleaned_uniques: list[str] = [
-        re.sub(r" *\<.*?\>", r"", re.sub(r"\[.*?\]", r"[]", x))
-        for x in old_uniques
-    ]
-    new_cleaned_uniques: list[str] = [
-        re.sub(r" *\<.*?\>", r"", re.sub(r"\[.*?\]", r"[]", x))
-        for x in new_uniques
-    ]
-
-    for unique in uniques_avoid:
-        if unique in old_cleaned_uniques and unique not in new_uniques:
-            old_uniques.pop(old_cleaned_uniques.index(unique))
-        elif unique in new_cleaned_uniques and unique not in old_uniques:
-            new_uniques.pop(new_cleaned_uniques.index(unique))
-
-    if old_uniques and new_uniques:
-        return list({*old_uniques, *new_uniques})
-    if old_uniques:
-        return old_uniques
-    if new_uniques:
-        return new_uniques
-    return []
-
-
-def check_uniques(uniques: list[str]) -> list[str]:
+def check_uniques(uniques: list[str], context: CombineContext) -> list[str]:
     desirables = []
 
     logging.debug(uniques)
     for x in uniques:
-        cleaned_x = re.sub(r" *\<.*?\>", r"", re.sub(r"\[.*?\]", r"[]", x))
-        logging.debug(cleaned_x)
-        if cleaned_x not in uniques_all:
+        template = context.matcher.match(x)
+        logging.debug(template)
+        if template is None and context.unknown_uniques != "ask":
+            kept = context.unknown_uniques == "keep"
+            logging.warning(
+                '%s unknown unique "%s"', "keeping" if kept else "dropping", x
+            )
+            if kept:
+                desirables.append(x)
+        elif template is None and context.unknown_uniques == "ask":
             while True:
                 keep = input(f'"{x}" is not in the uniques list, keep? "Y/n":')
                 if keep.lower() == "y":
@@ -629,7 +1134,7 @@ def check_uniques(uniques: list[str]) -> list[str]:
                 if keep.lower() == "n":
                     break
 
-        else:
+        elif template is not None:
             desirables.append(x)
 
     return desirables
@@ -664,6 +1169,7 @@ def add_transform(
 
 
 def separate_sub_unit(
+    cache: SourceCache,
     mod_dir: Path,
     key: str,
     unit_group: JSONDict,
@@ -672,6 +1178,8 @@ def separate_sub_unit(
     uniques: list[str],
     u_init_len: int,
 ) -> list[JSONDict]:
+    from PIL import Image
+
     return_json = []
     for i, (unit_type, upgrade) in enumerate(unit_group["unitType"]):
         unit_type: str
@@ -690,9 +1198,12 @@ def separate_sub_unit(
             if name != base_unit["name"][::-1].lower().title():
                 del unit_individual["replaces"]
 
-        Image.open(mod_dir / "Images" / "UnitIcons" / f"{key}.png").transpose(
-            Image.ROTATE_180
-        ).save(mod_dir / "Images" / "UnitIcons" / f"{name}.png")
+        cache.save_transposed(
+            mod_dir / "Images" / "UnitIcons" / f"{key}.png",
+            mod_dir,
+            Image.ROTATE_180,
+            mod_dir / "Images" / "UnitIcons" / f"{name}.png",
+        )
 
         return_json.append(unit_individual)
 
@@ -700,35 +1211,40 @@ def separate_sub_unit(
 
 
 def combine_json(
-    combined_dir: Path, output_dir: Path, default_dic: Path | None = None
+    context: CombineContext, cache: SourceCache | None = None
 ) -> None:
+    combined_dir, output_dir = context.require_dirs(
+        "combined_dir", "output_dir"
+    )
+    if cache is None:
+        cache = SourceCache()
     json_dict: defaultdict[str, list[JSONDict]] = defaultdict(list)
     global_dict: JSONDict = {"name": "Global uniques", "uniques": []}
-    for mod_dir in output_dir.iterdir():
-        if not mod_dir.is_dir():
+    for mod_dir in sorted(output_dir.iterdir()):
+        if not mod_dir.is_dir() or not context.includes_mod(mod_dir.name):
             continue
 
         json_dir = mod_dir / "jsons"
         if not (json_dir).is_dir():
             continue
 
-        for json_file in json_dir.iterdir():
+        for json_file in sorted(json_dir.iterdir()):
             if json_file.suffix != ".json" or json_file.name in _ignore_files:
                 continue
 
-            with json_file.open(encoding="UTF-8") as f:
-                if json_file.stem == "GlobalUniques":
-                    global_dict["uniques"].extend(
-                        check_uniques(json.load(f)["uniques"])
+            if json_file.stem == "GlobalUniques":
+                global_dict["uniques"].extend(
+                    check_uniques(
+                        cache.load_json(json_file)["uniques"], context
                     )
-                    continue
-                json_dict[json_file.name].extend(json.load(f))
+                )
+                continue
+            json_dict[json_file.name].extend(cache.load_json(json_file))
 
     for key, item in json_dict.items():
         json_file = combined_dir / "jsons" / key
         if json_file.exists():
-            with json_file.open(encoding="UTF-8") as f:
-                json_dict[json_file.name].extend(json.load(f))
+            json_dict[json_file.name].extend(cache.pool.load_json(json_file))
 
         json_file.write_text(
             json.dumps(item, indent="\t", ensure_ascii=False), encoding="UTF-8"
@@ -740,64 +1256,351 @@ def combine_json(
             encoding="UTF-8",
         )
 
-    if default_dic is not None:
-        shutil.copytree(default_dic, combined_dir, dirs_exist_ok=True)
-
-
-def main() -> None:
-    global uniques_all, uniques_avoid
-    parent_dir = Path(__file__).parent
-    upside_down = Combined()
-
-    logging.basicConfig(filename=parent_dir / "debug.log", level=logging.DEBUG)
-    input_dir = parent_dir / "Input"
-    output_dir = parent_dir / "Output"
-    uniques_all = uniques_paramless(parent_dir / "uniques" / "uniques.txt")
-    uniques_avoid = uniques_paramless(parent_dir / "uniques" / "unwanted.txt")
-    shutil.rmtree(parent_dir / "Combined" / "Images")
-
-    game_dir = Path(
-        "C:/Users/USER/Documents/Generic folder/unciv-windows64/mods"
+    if context.default_dir is not None:
+        shutil.copytree(context.default_dir, combined_dir, dirs_exist_ok=True)
+
+
+def mod_partial(
+    json_dir: Path, context: CombineContext, cache: SourceCache | None = None
+) -> Combined:
+    partial = Combined(context, cache)
+    for string, func in (
+        ("Buildings", partial.add_building),
+        ("Nations", partial.add_nation),
+        ("TileImprovements", partial.add_improvement),
+        ("Units", partial.add_unit),
+    ):
+        if (json_dir / f"{string}.json").is_file():
+            for json_object in partial.cache.load_json(
+                json_dir / f"{string}.json"
+            ):
+                json_object: JSONDict
+                func(json_object)
+
+    partial.reduce()
+    return partial
+
+
+def partial_key(json_dir: Path, context: CombineContext) -> str:
+    """Hash everything a mod's partial aggregate depends on."""
+    digest = hashlib.sha256(
+        json.dumps(
+            [
+                _partial_version,
+                context.tech,
+                context.templates,
+                {key: sorted(item) for key, item in context.known.items()},
+                sorted(context.avoid),
+                context.unknown_uniques,
+                context.unique_to,
+                context.max_tech_column,
+            ],
+            sort_keys=True,
+        ).encode()
     )
-
-    clean_mods(input_dir, output_dir, parent_dir)
-    with (output_dir / "Civ V - Gods & Kings" / "jsons" / "Techs.json").open(
-        encoding="UTF-8"
-    ) as f:
-        upside_down.set_tech(json.load(f))
-
-    for mod_dir in output_dir.iterdir():
-        if not mod_dir.is_dir():
+    for string in _aggregated_files:
+        json_file = json_dir / f"{string}.json"
+        digest.update(string.encode())
+        if json_file.is_file():
+            digest.update(json_file.read_bytes())
+    return digest.hexdigest()
+
+
+def cached_partial(
+    json_dir: Path,
+    context: CombineContext,
+    cache_dir: Path,
+    cache: SourceCache | None = None,
+) -> tuple[Combined, Path]:
+    cache_file = cache_dir / f"{partial_key(json_dir, context)}.pickle"
+    if cache_file.is_file():
+        try:
+            with cache_file.open("rb") as f:
+                partial = pickle.load(f)  # noqa: S301
+        except Exception:  # noqa: BLE001
+            logging.debug(
+                "discarding cached partial %s", cache_file, exc_info=True
+            )
+        else:
+            partial.use_cache(SourceCache() if cache is None else cache)
+            return partial, cache_file
+
+    partial = mod_partial(json_dir, context, cache)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with cache_file.open("wb") as f:
+        pickle.dump(partial, f)
+    return partial, cache_file
+
+
+def aggregate_mods(combined: Combined, prune: bool = True) -> set[Path]:
+    """Merge the partial aggregate of every included mod into ``combined``.
+
+    With a context ``cache_dir`` each partial is stored under the hash of its
+    inputs, so only changed mods are aggregated again. Returns the partials
+    used, removing any others unless ``prune`` is false.
+    """
+    (output_dir,) = combined.context.require_dirs("output_dir")
+    cache_dir = combined.context.cache_dir
+    used_files: set[Path] = set()
+    for mod_dir in sorted(output_dir.iterdir()):
+        if not mod_dir.is_dir() or not combined.context.includes_mod(
+            mod_dir.name
+        ):
             continue
 
         json_dir = mod_dir / "jsons"
         if not json_dir.is_dir():
             continue
 
-        for string, func in (
-            ("Buildings", upside_down.add_building),
-            ("Nations", upside_down.add_nation),
-            ("TileImprovements", upside_down.add_improvement),
-            ("Units", upside_down.add_unit),
-        ):
-            if (json_dir / f"{string}.json").is_file():
-                with (json_dir / f"{string}.json").open(encoding="UTF-8") as f:
-                    for json_object in json.load(f):
-                        json_object: JSONDict
-                        func(json_object)
-
-    upside_down.to_json(
-        parent_dir / "Combined", output_dir, parent_dir / "Default"
-    )
+        if cache_dir is None:
+            combined.merge(
+                mod_partial(json_dir, combined.context, combined.cache)
+            )
+            continue
+        partial, cache_file = cached_partial(
+            json_dir, combined.context, cache_dir, combined.cache
+        )
+        combined.merge(partial)
+        used_files.add(cache_file)
+
+    if prune and cache_dir is not None:
+        prune_partials(cache_dir, used_files)
+    combined.reduce()
+    return used_files
+
+
+def prune_partials(cache_dir: Path, used_files: Collection[Path]) -> None:
+    if cache_dir.is_dir():
+        for cache_file in cache_dir.glob("*.pickle"):
+            if cache_file not in used_files:
+                cache_file.unlink()
+
+
+def combine_targets(
+    contexts: Iterable[CombineContext], cache: SourceCache | None = None
+) -> list[Combined]:
+    """Combine every target into its own folder from one shared parse.
+
+    Partials no target used are removed from the cache folders afterwards.
+    With a cache folder, the starting promotions that the merged units of a
+    target can not have are written into ``violations``.
+    """
+    from uncivmod.typing.validation import write_violations
+
+    if cache is None:
+        cache = SourceCache()
+
+    targets: list[Combined] = []
+    used_files: defaultdict[Path, set[Path]] = defaultdict(set)
+    for context in contexts:
+        combined = Combined(context, cache)
+        used = aggregate_mods(combined, prune=False)
+        if context.cache_dir is not None:
+            used_files[context.cache_dir] |= used
+        combined.to_json()
+        if context.cache_dir is not None:
+            (combined_dir,) = context.require_dirs("combined_dir")
+            write_violations(
+                combined_dir.name,
+                combined.promotion_violations(),
+                context.cache_dir
+                / "violations"
+                / f"{combined_dir.name} promotions.json",
+            )
+        targets.append(combined)
+
+    for cache_dir, used in used_files.items():
+        prune_partials(cache_dir, used)
+    return targets
+
+
+def load_targets(
+    target_file: Path, context: CombineContext
+) -> list[CombineContext]:
+    """Read the targets to combine, each overriding the base context.
+
+    Every target names its ``folder`` next to the base combined folder and may
+    override ``nation`` fields, limit ``mods`` and set a ``max_tech_column``.
+    Without a target file only the base context is combined.
+    """
+    if not target_file.is_file():
+        return [context]
+
+    (combined_dir,) = context.require_dirs("combined_dir")
+    with target_file.open(encoding="UTF-8") as f:
+        targets: list[JSONDict] = json.load(f)
+
+    return [
+        evolve(
+            context,
+            combined_dir=combined_dir.parent / x["folder"],
+            nation=context.nation | x.get("nation", {}),
+            mods=x.get("mods"),
+            max_tech_column=x.get("maxTechColumn"),
+        )
+        for x in targets
+    ]
+
 
-    shutil.rmtree(game_dir / "Combined")
+def sync_tree(source: Path, destination: Path) -> tuple[int, int]:
+    """Copy the files that differ and remove the files that are gone.
+
+    Returns the number of files copied and removed.
+    """
+    source_files = {
+        x.relative_to(source)
+        for x in source.rglob("*")
+        if x.is_file() and ".git" not in x.relative_to(source).parts
+    }
+    copied = 0
+    for name in sorted(source_files):
+        destination_file = destination / name
+        if destination_file.is_file() and filecmp.cmp(
+            source / name, destination_file, shallow=False
+        ):
+            continue
+        destination_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source / name, destination_file)
+        copied += 1
+
+    removed = 0
+    if destination.is_dir():
+        for destination_file in destination.rglob("*"):
+            name = destination_file.relative_to(destination)
+            if (
+                destination_file.is_file()
+                and ".git" not in name.parts
+                and name not in source_files
+            ):
+                destination_file.unlink()
+                removed += 1
+    return copied, removed
+
+
+def deploy(target_dir: Path, game_dir: Path) -> None:
+    shutil.rmtree(game_dir / target_dir.name, ignore_errors=True)
     shutil.copytree(
-        parent_dir / "Combined",
-        game_dir / "Combined",
+        target_dir,
+        game_dir / target_dir.name,
         dirs_exist_ok=True,
         ignore=shutil.ignore_patterns("*.git"),
     )
 
 
+def combine_pipeline(
+    context: CombineContext, target_file: Path | None = None
+) -> Pipeline:
+    """Stages cleaning every mod, then combining and deploying each target.
+
+    Mods are cleaned concurrently, and the tech and known names of the
+    targets are only loaded once every mod has been cleaned. With a cache
+    folder, each cleaned mod is also validated into ``violations``.
+    """
+    from uncivmod.pipeline import Pipeline, Stage
+
+    input_dir, output_dir, combined_dir = context.require_dirs(
+        "input_dir", "output_dir", "combined_dir"
+    )
+    targets = (
+        [context]
+        if target_file is None
+        else load_targets(target_file, context)
+    )
+    target_dirs = [x.require_dirs("combined_dir")[0] for x in targets]
+    techs_file = output_dir / "Civ V - Gods & Kings" / "jsons" / "Techs.json"
+
+    def prepare_targets() -> None:
+        with techs_file.open(encoding="UTF-8") as f:
+            tech = clean_tech(json.load(f))
+        known = known_names(output_dir)
+        targets[:] = [evolve(x, known=known, tech=tech) for x in targets]
+
+    pipeline = Pipeline(
+        Stage(
+            f"clean {x.name}",
+            partial(clean_mod, x, output_dir),
+            inputs=(x,),
+            outputs=(output_dir / x.name,),
+        )
+        for x in sorted(input_dir.iterdir())
+        if x.is_dir()
+    )
+    if context.cache_dir is not None:
+        from uncivmod.typing.validation import report_violations
+
+        for x in sorted(input_dir.iterdir()):
+            if not x.is_dir():
+                continue
+            report_file = context.cache_dir / "violations" / f"{x.name}.json"
+            pipeline.add(
+                Stage(
+                    f"validate {x.name}",
+                    partial(
+                        report_violations, output_dir / x.name, report_file
+                    ),
+                    inputs=(output_dir / x.name / "jsons",),
+                    outputs=(report_file,),
+                )
+            )
+    pipeline.add(Stage("targets", prepare_targets, inputs=(output_dir,)))
+    for target, target_dir in zip(targets, target_dirs):
+        pipeline.add(
+            Stage(
+                f"images {target_dir.name}",
+                partial(copy_images, target),
+                inputs=(output_dir,),
+                outputs=(target_dir / "Images",),
+            )
+        )
+    pipeline.add(
+        Stage(
+            "combine",
+            lambda: combine_targets(targets),
+            inputs=(
+                output_dir,
+                *(x / "Images" for x in target_dirs),
+                *((target_file,) if target_file is not None else ()),
+                *(
+                    x
+                    for x in (context.unique_dir, context.default_dir)
+                    if x is not None
+                ),
+            ),
+            outputs=tuple(target_dirs),
+            after=("targets",),
+        )
+    )
+    if context.game_dir is not None:
+        for target_dir in target_dirs:
+            pipeline.add(
+                Stage(
+                    f"deploy {target_dir.name}",
+                    partial(deploy, target_dir, context.game_dir),
+                    inputs=(target_dir,),
+                    outputs=(context.game_dir / target_dir.name,),
+                )
+            )
+    return pipeline
+
+
+def default_context() -> CombineContext:
+    return CombineContext.from_dir(
+        Path(__file__).parent,
+        game_dir=Path(
+            "C:/Users/USER/Documents/Generic folder/unciv-windows64/mods"
+        ),
+    )
+
+
+def main() -> None:
+    parent_dir = Path(__file__).parent
+    context = default_context()
+
+    logging.basicConfig(filename=parent_dir / "debug.log", level=logging.DEBUG)
+    pipeline = combine_pipeline(context, parent_dir / "Targets.json")
+    timings = pipeline.run(parent_dir / "Cache" / "stages.json")
+    print(pipeline.report(timings))
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,219 @@
+"""Run named stages concurrently in dependency order.
+
+A stage declares the paths it reads and writes. It runs after every stage
+whose outputs overlap its inputs, and after the stages it names explicitly.
+Stages are skipped while their inputs fingerprint the same as after their last
+run and their outputs still exist.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from typing import TYPE_CHECKING
+
+from attrs import frozen
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from pathlib import Path
+    from typing import Callable, Iterable
+
+
+@frozen
+class Stage:
+    """A named step of a pipeline with its declared inputs and outputs."""
+
+    name: str
+    run: Callable[[], object]
+    inputs: tuple[Path, ...] = ()
+    outputs: tuple[Path, ...] = ()
+    after: tuple[str, ...] = ()
+
+
+@frozen
+class StageTiming:
+    """When a stage started and finished, relative to the pipeline start."""
+
+    name: str
+    start: float
+    end: float
+    skipped: bool = False
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def fingerprint(paths: Iterable[Path]) -> str:
+    """Hash the names, sizes and modification times of files under paths."""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(str(path).encode())
+        if not path.exists():
+            digest.update(b"\0missing")
+            continue
+
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            if file.is_file():
+                stat = file.stat()
+                digest.update(
+                    f"\0{file.relative_to(path)}\0{stat.st_size}"
+                    f"\0{stat.st_mtime_ns}".encode()
+                )
+    return digest.hexdigest()
+
+
+def _overlaps(first: Path, second: Path) -> bool:
+    return first.is_relative_to(second) or second.is_relative_to(first)
+
+
+class Pipeline:
+    """Stages run by a thread pool as soon as their dependencies finish."""
+
+    def __init__(self, stages: Iterable[Stage] = ()) -> None:
+        self.stages: dict[str, Stage] = {}
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage: Stage) -> None:
+        if stage.name in self.stages:
+            msg = f'duplicate stage "{stage.name}"'
+            raise ValueError(msg)
+        self.stages[stage.name] = stage
+
+    def dependencies(self) -> dict[str, set[str]]:
+        """Map each stage to the stages it has to wait for."""
+        dependencies: dict[str, set[str]] = {}
+        for name, stage in self.stages.items():
+            unknown = set(stage.after) - self.stages.keys()
+            if unknown:
+                msg = f'stage "{name}" runs after unknown {sorted(unknown)}'
+                raise ValueError(msg)
+            dependencies[name] = set(stage.after) | {
+                other.name
+                for other in self.stages.values()
+                if other.name != name
+                and any(
+                    _overlaps(x, y)
+                    for x in stage.inputs
+                    for y in other.outputs
+                )
+            }
+        return dependencies
+
+    def order(self) -> list[str]:
+        """Stages in a dependency respecting order, raising on cycles."""
+        dependencies = self.dependencies()
+        order: list[str] = []
+        done: set[str] = set()
+        while len(order) < len(dependencies):
+            ready = [
+                x
+                for x, y in dependencies.items()
+                if x not in done and y <= done
+            ]
+            if not ready:
+                msg = f"stages {sorted(dependencies.keys() - done)} form a cycle"  # noqa: E501
+                raise ValueError(msg)
+            order.extend(ready)
+            done.update(ready)
+        return order
+
+    def run(
+        self, state_file: Path | None = None, max_workers: int | None = None
+    ) -> list[StageTiming]:
+        """Run every stage, skipping unchanged ones if ``state_file`` is given."""  # noqa: E501
+        from concurrent.futures import (
+            FIRST_COMPLETED,
+            ThreadPoolExecutor,
+            wait,
+        )
+
+        dependencies = self.dependencies()
+        self.order()
+        state: dict[str, str] = {}
+        if state_file is not None and state_file.is_file():
+            state = json.loads(state_file.read_text(encoding="UTF-8"))
+
+        start = time.perf_counter()
+        timings: dict[str, StageTiming] = {}
+        running: dict[Future[StageTiming], str] = {}
+
+        def execute(stage: Stage) -> StageTiming:
+            stage_start = time.perf_counter() - start
+            skip = (
+                state_file is not None
+                and bool(stage.outputs)
+                and all(x.exists() for x in stage.outputs)
+                and state.get(stage.name) == fingerprint(stage.inputs)
+            )
+            if not skip:
+                stage.run()
+                state[stage.name] = fingerprint(stage.inputs)
+            return StageTiming(
+                stage.name, stage_start, time.perf_counter() - start, skip
+            )
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            try:
+                while len(timings) < len(self.stages):
+                    for name, stage in self.stages.items():
+                        if (
+                            name not in timings
+                            and name not in running.values()
+                            and dependencies[name] <= timings.keys()
+                        ):
+                            running[executor.submit(execute, stage)] = name
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        timings[running.pop(future)] = future.result()
+            finally:
+                for future in running:
+                    future.cancel()
+                if state_file is not None:
+                    state_file.parent.mkdir(parents=True, exist_ok=True)
+                    state_file.write_text(
+                        json.dumps(state, indent="\t", sort_keys=True),
+                        encoding="UTF-8",
+                    )
+
+        return [timings[x] for x in self.order()]
+
+    def critical_path(self, timings: Iterable[StageTiming]) -> list[str]:
+        """The chain of dependent stages that took the longest in total."""
+        dependencies = self.dependencies()
+        durations = {x.name: x.duration for x in timings}
+        total: dict[str, float] = {}
+        previous: dict[str, str | None] = {}
+        for name in self.order():
+            before = max(dependencies[name], key=total.get, default=None)
+            previous[name] = before
+            total[name] = durations[name] + (
+                0 if before is None else total[before]
+            )
+
+        path: list[str] = []
+        name = max(total, key=total.get, default=None)
+        while name is not None:
+            path.append(name)
+            name = previous[name]
+        return path[::-1]
+
+    def report(self, timings: list[StageTiming]) -> str:
+        """Format the stage timings together with the critical path."""
+        width = max((len(x.name) for x in timings), default=0)
+        lines = [
+            f"{x.name:<{width}}  {x.start:8.3f}s  {x.duration:8.3f}s"
+            + ("  skipped" if x.skipped else "")
+            for x in timings
+        ]
+        path = self.critical_path(timings)
+        durations = {x.name: x.duration for x in timings}
+        wall = max((x.end for x in timings), default=0)
+        lines.append(
+            f"critical path: {' -> '.join(path)} "
+            f"({sum(durations[x] for x in path):.3f}s of {wall:.3f}s)"
+        )
+        return "\n".join(lines)
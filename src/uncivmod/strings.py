@@ -0,0 +1,98 @@
+"""A pool of the strings repeated across the json files of rulesets.
+
+Names, unit types and uniques appear thousands of times, and `json.load`
+makes a new string for each. Loading through a pool keeps one copy of each,
+which saves memory, and makes equal strings the same object, so comparing
+them stops at the identity check.
+
+Unlike `sys.intern`, whose strings live as long as the process, a pool can
+be cleared, e.g. between the rebuilds of the watch mode.
+"""
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+class StringPool:
+    """Canonical copies of strings up to ``max_length`` characters.
+
+    Longer strings, such as civilopedia paragraphs, rarely repeat, so they
+    are left alone.
+    """
+
+    def __init__(self, max_length: int = 200) -> None:
+        self.max_length = max_length
+        self._strings: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __contains__(self, string: str) -> bool:
+        return string in self._strings
+
+    def intern(self, string: str) -> str:
+        """The pooled copy of a string, pooling it if it is new."""
+        if len(string) > self.max_length:
+            return string
+        return self._strings.setdefault(string, string)
+
+    def object_pairs_hook(
+        self, pairs: list[tuple[str, Any]]
+    ) -> dict[str, Any]:
+        """Build a json object with pooled keys and string values."""
+        pooled = self._strings.setdefault
+        max_length = self.max_length
+        json_object: dict[str, Any] = {}
+        for key, value in pairs:
+            if type(value) is str:
+                if len(value) <= max_length:
+                    value = pooled(value, value)  # noqa: PLW2901
+            elif type(value) is list:
+                for i, item in enumerate(value):
+                    if type(item) is str and len(item) <= max_length:
+                        value[i] = pooled(item, item)
+            json_object[pooled(key, key)] = value
+        return json_object
+
+    def intern_json(self, json_object: Any) -> Any:  # noqa: ANN401
+        """Pool the strings of dicts, lists and tuples, in place if mutable.
+
+        Useful for json that did not come through `load_json`, such as an
+        unpickled partial.
+        """
+        if isinstance(json_object, str):
+            return self.intern(json_object)
+        if isinstance(json_object, dict):
+            items = [
+                (self.intern_json(x), self.intern_json(y))
+                for x, y in json_object.items()
+            ]
+            json_object.clear()
+            json_object.update(items)
+        elif isinstance(json_object, list):
+            json_object[:] = [self.intern_json(x) for x in json_object]
+        elif isinstance(json_object, tuple):
+            return tuple(self.intern_json(x) for x in json_object)
+        return json_object
+
+    def load_json(self, json_file: Path) -> Any:  # noqa: ANN401
+        """Load a json file with its short strings pooled."""
+        with json_file.open(encoding="UTF-8") as f:
+            json_object = json.load(
+                f, object_pairs_hook=self.object_pairs_hook
+            )
+        if isinstance(json_object, list):
+            for i, item in enumerate(json_object):
+                if isinstance(item, str):
+                    json_object[i] = self.intern(item)
+        return json_object
+
+    def clear(self) -> None:
+        self._strings.clear()
+
+
+strings = StringPool()
@@ -1 +1,22 @@
-"""Typing for unciv modding."""
+"""Typing for unciv modding.
+
+The models of `uncivmod.typing.base` are importable from here, but are only
+built on first access.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Any
+
+_submodules = ("base", "filehandler")
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    if name in _submodules:
+        return importlib.import_module(f"{__name__}.{name}")
+    if not name.startswith("_"):
+        base = importlib.import_module(f"{__name__}.base")
+        if hasattr(base, name):
+            return getattr(base, name)
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
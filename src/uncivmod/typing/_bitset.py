@@ -0,0 +1,15 @@
+"""Sets of small ints stored as the bits of an int."""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Iterator
+
+
+def iter_bits(bitset: int) -> Iterator[int]:
+    """The members of a bitset, in increasing order."""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
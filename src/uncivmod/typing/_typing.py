@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from enum import StrEnum
+from typing import Any
 
 
 class _StrEnum(StrEnum):
@@ -11,3 +12,38 @@ class _StrEnum(StrEnum):
         name: str, start: int, count: int, last_values: list[str],  # noqa: ARG004
     ) -> str:
         return name
+
+
+class _SparseField:
+    """Field of a class storing only its set fields, see `CivilopediaText`.
+
+    Instances keep a bitmap ``_mask`` of the fields that are not None, and
+    their values in field order in the tuple ``_values``.
+    """
+
+    __slots__ = ("bit", "below")
+
+    def __init__(self, position: int) -> None:
+        self.bit = 1 << position
+        self.below = self.bit - 1
+
+    def __get__(self, instance: Any, owner: type | None = None) -> Any:  # noqa: ANN401
+        if instance is None:
+            return self
+        if instance._mask & self.bit:
+            return instance._values[(instance._mask & self.below).bit_count()]
+        return None
+
+    def __set__(self, instance: Any, value: Any) -> None:  # noqa: ANN401
+        mask = instance._mask
+        values = list(instance._values)
+        index = (mask & self.below).bit_count()
+        if mask & self.bit:
+            del values[index]
+        if value is not None:
+            values.insert(index, value)
+            mask |= self.bit
+        else:
+            mask &= ~self.bit
+        instance._mask = mask
+        instance._values = tuple(values)
@@ -1,8 +1,11 @@
 """validators."""
 from __future__ import annotations
 
+import math
 from typing import TYPE_CHECKING, Protocol, cast
 
+from attrs import evolve, frozen
+
 if TYPE_CHECKING:
     from typing import Any, Callable
 
@@ -29,36 +32,111 @@ class Comparable[T](Protocol):
         ...
 
 
-def _pos( # Comparable[T]
-    self: Any,  # noqa: ARG001, ANN401
-    attribute: Attribute[int] | Attribute[float],
-    value: float,
-) -> None:
-    if value <= 0:
-        msg = f"{attribute.name} must be positive."
-        raise ValueError(msg)
+@frozen
+class _Interval:
+    """The values a comparison validator accepts."""
+
+    low: float = -math.inf
+    high: float = math.inf
+    low_closed: bool = False
+    high_closed: bool = False
+
+    def condition(self) -> str:
+        """Python expression that is true when ``value`` is inside."""
+        if self.low == self.high:
+            return f"value == {self.low!r}"
+        if self.low == -math.inf and self.high == math.inf:
+            return "True"
+        low = f"{self.low!r} {'<=' if self.low_closed else '<'} "
+        high = f" {'<=' if self.high_closed else '<'} {self.high!r}"
+        return "".join(
+            (
+                "" if self.low == -math.inf else low,
+                "value",
+                "" if self.high == math.inf else high,
+            )
+        )
+
+
+def _union(intervals: list[_Interval]) -> _Interval | None:
+    """Merge intervals into one, or None if there is a gap between them."""
+    ordered = sorted(intervals, key=lambda x: (x.low, not x.low_closed))
+    merged = ordered[0]
+    for interval in ordered[1:]:
+        if merged.high < interval.low or (
+            merged.high == interval.low
+            and not (merged.high_closed or interval.low_closed)
+        ):
+            return None
+        if interval.high > merged.high:
+            merged = _Interval(
+                merged.low,
+                interval.high,
+                merged.low_closed,
+                interval.high_closed,
+            )
+        elif interval.high == merged.high and interval.high_closed:
+            merged = evolve(merged, high_closed=True)
+    return merged
+
+
+def _fail(attribute: Attribute[Any], message: str) -> None:
+    raise ValueError(message.format(name=attribute.name))
+
+
+def _compile[T](
+    interval: _Interval,
+    message: str,
+    *,
+    optional: bool = False,
+) -> _ValidatorType[T]:
+    """Build a validator that is a single comparison.
+
+    ``message`` is formatted with the attribute ``name`` on failure. Compiled
+    validators remember their interval and message, so combinators of them
+    compile into one comparison again.
+    """
+    condition = interval.condition()
+    if optional:
+        condition = f"value is None or {condition}"
+    source = (
+        "def _validator(self, attribute, value):\n"
+        f"    if not ({condition}):\n"
+        "        _fail(attribute, message)\n"
+    )
+    namespace: dict[str, Any] = {"_fail": _fail, "message": message}
+    exec(source, namespace)  # noqa: S102
+    validator = namespace["_validator"]
+    validator.interval = None if optional else interval
+    validator.message = message
+    return validator
+
+
+def _interval_of(validator: Callable[..., Any]) -> _Interval | None:
+    return getattr(validator, "interval", None)
+
+
+def _message_of(validator: Callable[..., Any]) -> str:
+    return getattr(validator, "message", "")
 
 
-def _neg(
-    self: Any,  # noqa: ARG001, ANN401
-    attribute: Attribute[int] | Attribute[float],
-    value: float,
-) -> None:
-    if value >= 0:
-        msg = f"{attribute.name} must be negative."
-        raise ValueError(msg)
+_pos = _compile(_Interval(low=0), "{name} must be positive.")
+_neg = _compile(_Interval(high=0), "{name} must be negative.")
+_zero = _compile(_Interval(0, 0, True, True), "{name} must be zero.")
 
 
-def _zero[T](self: Any, attribute: Attribute[T], value: T) -> None:  # noqa: ANN401, ARG001
-    if value != 0:
-        msg = f"{attribute.name} must be zero."
-        raise ValueError(msg)
+def _between[T](low: float, high: float) -> _ValidatorType[T]:
+    """Accept values from ``low`` to ``high`` inclusive."""
+    return _compile(
+        _Interval(low, high, True, True),
+        f"{{name}} is not between {low} and {high}",
+    )
 
 
 def _eq[T](other: T) -> _ValidatorType[T]:
     def _validator(self: Any, attribute: Attribute[T], value: T) -> None:  # noqa: ANN401, ARG001
         if value != other:
-            msg = f"{attribute.name} must be equal to {value}."
+            msg = f"{attribute.name} must be equal to {other}."
             raise ValueError(msg)
 
     return _validator
@@ -66,8 +144,8 @@ def _eq[T](other: T) -> _ValidatorType[T]:
 
 def _neq[T](other: T) -> _ValidatorType[T]:
     def _validator(self: Any, attribute: Attribute[T], value: T) -> None:  # noqa: ANN401, ARG001
-        if value != other:
-            msg = f"{attribute.name} must not equal to {value}."
+        if value == other:
+            msg = f"{attribute.name} must not equal to {other}."
             raise ValueError(msg)
 
     return _validator
@@ -77,16 +155,24 @@ def _validate_or[T](
     *args: Callable[[Any, Attribute[T], T], Any],
     msg: str | None = None,
 ) -> _ValidatorType[T]:
+    intervals = [_interval_of(x) for x in args]
+    if args and None not in intervals:
+        interval = _union(cast(list[_Interval], intervals))
+        if interval is not None:
+            message = (msg or "").replace("{", "{{").replace("}", "}}")
+            message += "".join(f"{_message_of(x)}\n" for x in args)
+            return _compile(interval, message)
+
     def _validator(self: Any, attribute: Attribute[T], value: T) -> None:  # noqa: ANN401
         error_msg = "" if msg is None else msg
 
         for validator in args:
             try:
                 validator(self, attribute, value)
-                break
             except ValueError as e:
-                if msg is not None:
-                    error_msg += f"{e}\n"
+                error_msg += f"{e}\n"
+            else:
+                return
 
         raise ValueError(error_msg)
 
@@ -98,20 +184,29 @@ def _validate_or_var[T](
     msg_before: str | None = None,
     msg_after: str | None = None,
 ) -> _ValidatorType[T]:
-    def _validator(self: Any, attribute: Attribute[T], value: T) -> None:  # noqa: ANN401
-        if not (msg_before or msg_after):
-            msg = "_validate_or_var expected at least 1 error message argument, got 0"  # noqa: E501
-            raise TypeError(msg)
+    if not (msg_before or msg_after):
+        msg = "_validate_or_var expected at least 1 error message argument, got 0"  # noqa: E501
+        raise TypeError(msg)
+
+    before = (msg_before or "").replace("{", "{{").replace("}", "}}")
+    after = (msg_after or "").replace("{", "{{").replace("}", "}}")
+    message = f"{before}{{name}}{after}"
+    intervals = [_interval_of(x) for x in args]
+    if args and None not in intervals:
+        interval = _union(cast(list[_Interval], intervals))
+        if interval is not None:
+            return _compile(interval, message)
 
+    def _validator(self: Any, attribute: Attribute[T], value: T) -> None:  # noqa: ANN401
         for validator in args:
             try:
                 validator(self, attribute, value)
-                break
             except ValueError:
                 pass
+            else:
+                return
 
-        error_msg = f"{'' if msg_before is None else msg_before}{attribute.name}{'' if msg_after is None else msg_after}"  # noqa: E501
-        raise ValueError(error_msg)
+        _fail(attribute, message)
 
     return _validator
 
@@ -119,6 +214,11 @@ def _validate_or_var[T](
 def _validate_none[T](
     validator: Callable[[Any, Attribute[T], T], Any],
 ) -> _ValidatorType[T]:
+    interval = _interval_of(validator)
+    if interval is not None:
+        message = _message_of(validator) + " or {name} must be None"
+        return _compile(interval, message, optional=True)
+
     def _validator(
         self: Any,  # noqa: ANN401
         attribute: Attribute[T] | Attribute[None],
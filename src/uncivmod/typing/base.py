@@ -6,12 +6,12 @@ from typing import Any, cast
 
 from attrs import Factory, define, field, validators
 
-from uncivmod.typing._typing import _StrEnum
+from uncivmod.typing._typing import _SparseField, _StrEnum
 from uncivmod.typing._validator import (
+    _between,
     _ge0,
     _pos,
     _validate_none,
-    _validate_or_var,
 )
 
 
@@ -95,92 +95,151 @@ class PolicyFinisher:
         return return_dict
 
 
-@define
 class CivilopediaText:
-    """Supplementary extra text listed in Civilopedia."""
-
-    text: str | None
-    link: str | None
-    icon: str | None
-    extra_image: str | None
-    image_size: float | None
-    header: str | None
-    size: str | None
-    indent: int | None
-    padding: float | None
-    colour: str | None
-    separator: bool | None
-    starred: bool | None
-    centered: bool | None
+    """Supplementary extra text listed in Civilopedia.
+
+    Lines rarely set more than a field or two, so only the set fields are
+    stored, with a bitmap of which ones they are.
+    """
+
+    __slots__ = ("_mask", "_values")
+    _fields = (
+        "text",
+        "link",
+        "icon",
+        "extra_image",
+        "image_size",
+        "header",
+        "size",
+        "indent",
+        "padding",
+        "colour",
+        "separator",
+        "starred",
+        "centered",
+    )
+    _json_keys = (
+        "text",
+        "link",
+        "icon",
+        "extraImage",
+        "imageSize",
+        "header",
+        "size",
+        "indent",
+        "padding",
+        "color",
+        "separator",
+        "starred",
+        "centered",
+    )
+    _masks: dict[int, tuple[str, ...]] = {}  # noqa: RUF012
+
+    text = _SparseField(0)
+    link = _SparseField(1)
+    icon = _SparseField(2)
+    extra_image = _SparseField(3)
+    image_size = _SparseField(4)
+    header = _SparseField(5)
+    size = _SparseField(6)
+    indent = _SparseField(7)
+    padding = _SparseField(8)
+    colour = _SparseField(9)
+    separator = _SparseField(10)
+    starred = _SparseField(11)
+    centered = _SparseField(12)
+
+    def __init__(  # noqa: PLR0913
+        self,
+        text: str | None = None,
+        link: str | None = None,
+        icon: str | None = None,
+        extra_image: str | None = None,
+        image_size: float | None = None,
+        header: str | None = None,
+        size: str | None = None,
+        indent: int | None = None,
+        padding: float | None = None,
+        colour: str | None = None,
+        separator: bool | None = None,
+        starred: bool | None = None,
+        centered: bool | None = None,
+    ) -> None:
+        self._set(
+            (
+                text,
+                link,
+                icon,
+                extra_image,
+                image_size,
+                header,
+                size,
+                indent,
+                padding,
+                colour,
+                separator,
+                starred,
+                centered,
+            )
+        )
+
+    def _set(self, values: tuple[Any, ...]) -> None:
+        mask = 0
+        for i, value in enumerate(values):
+            if value is not None:
+                mask |= 1 << i
+        self._mask = mask
+        self._values = tuple(x for x in values if x is not None)
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> CivilopediaText:
+        """Build from json format."""
+        instance = cls.__new__(cls)
+        instance._set(tuple(map(data.get, cls._json_keys)))
+        return instance
+
+    @classmethod
+    def _keys(cls, mask: int) -> tuple[str, ...]:
+        keys = cls._masks.get(mask)
+        if keys is None:
+            keys = cls._masks[mask] = tuple(
+                x for i, x in enumerate(cls._json_keys) if mask >> i & 1
+            )
+        return keys
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CivilopediaText):
+            return NotImplemented
+        return self._mask == other._mask and self._values == other._values
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{x}={getattr(self, x)!r}"
+            for i, x in enumerate(self._fields)
+            if self._mask >> i & 1
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self) -> tuple[int, tuple[Any, ...]]:
+        return self._mask, self._values
+
+    def __setstate__(self, state: tuple[int, tuple[Any, ...]]) -> None:
+        self._mask, self._values = state
 
     def to_json(self) -> dict[str, Any]:
         """Convert to json format."""
-        return_dict: dict[str, Any] = {}
-        for key, value in zip(
-            (
-                "text",
-                "link",
-                "icon",
-                "extraImage",
-                "imageSize",
-                "header",
-                "size",
-                "indent",
-                "padding",
-                "color",
-                "separator",
-                "starred",
-                "centered",
-            ),
-            (
-                self.text,
-                self.link,
-                self.icon,
-                self.extra_image,
-                self.image_size,
-                self.header,
-                self.size,
-                self.indent,
-                self.padding,
-                self.colour,
-                self.separator,
-                self.starred,
-                self.centered,
-            ),
-        ):
-            if value is not None:
-                return_dict[key] = value
-        return return_dict
+        return dict(zip(self._keys(self._mask), self._values))
 
 
 @define
 class RGBColour:  # yes British spelling
     """RGB Colour used generally."""
 
-    r: int = field(
-        kw_only=True,
-        validator=_validate_or_var(
-            _ge0,
-            validators.le(255),
-            msg_after=" is not between 0 and 255",
-        ),
-    )
-    g: int = field(
-        kw_only=True,
-        validator=_validate_or_var(
-            _ge0,
-            validators.le(255),
-            msg_after=" is not between 0 and 255",
-        ),
-    )
-    b: int = field(
-        kw_only=True,
-        validator=_validate_or_var(
-            _ge0,
-            validators.le(255),
-            msg_after=" is not between 0 and 255",
-        ),
-    )
+    r: int = field(kw_only=True, validator=_between(0, 255))
+    g: int = field(kw_only=True, validator=_between(0, 255))
+    b: int = field(kw_only=True, validator=_between(0, 255))
 
     def to_json(self) -> list[int]:
         """Convert to json format."""
@@ -214,15 +273,16 @@ class Stats:
     faith: float = 0
 
     def __bool__(self) -> bool:  # noqa: D105
-        return (
-            self.production
-            == self.food
-            == self.gold
-            == self.science
-            == self.culture
-            == self.happiness
-            == self.faith
-            == 0
+        return any(
+            (
+                self.production,
+                self.food,
+                self.gold,
+                self.science,
+                self.culture,
+                self.happiness,
+                self.faith,
+            )
         )
 
     def to_json(self) -> dict[str, float]:
@@ -1538,4 +1598,6 @@ class UncivMod:
     speeds: dict[str, Speed] = Factory(dict)
     techs: TechTree = Factory(TechTree)
     terrains: dict[str, Terrain] = Factory(dict)
+    unit_types: dict[str, UnitType] = Factory(dict)
+    units: dict[str, Unit] = Factory(dict)
     victory_type: dict[str, VictoryType] = Factory(dict)
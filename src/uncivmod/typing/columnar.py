@@ -0,0 +1,171 @@
+"""Collections of models stored column by column.
+
+Scalar fields are kept in a NumPy structured array, so filters and aggregates
+run over a whole ruleset at once, while list, dict and model fields are kept
+per row. Optional numbers are stored as floats, with NaN for None.
+"""
+from __future__ import annotations
+
+import types
+from typing import TYPE_CHECKING, Any, Union, get_args, get_origin
+
+import attrs
+
+from uncivmod.typing.filehandler import _fields, _structure
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    msg = "columnar collections need numpy, install uncivmod[numpy]"
+    raise ImportError(msg) from e
+
+if TYPE_CHECKING:
+    from typing import Callable, Iterable, Sequence
+
+    from numpy.typing import NDArray
+
+_dtypes: dict[Any, str] = {bool: "?", int: "i8", float: "f8", str: "O"}
+
+
+def _column_dtype(hint: Any) -> str | None:  # noqa: ANN401
+    """NumPy type of a scalar field, or None if it is stored per row."""
+    if get_origin(hint) in (Union, types.UnionType):
+        options = [x for x in get_args(hint) if x is not type(None)]
+        if len(options) == 1 and options[0] in (int, float):
+            return "f8"
+        return None
+    if isinstance(hint, type) and issubclass(hint, str):
+        return "O"
+    return _dtypes.get(hint)
+
+
+class Columns[T]:
+    """A collection of models of one class with an index by name."""
+
+    def __init__(
+        self,
+        model: type[T],
+        data: NDArray[np.void],
+        rows: list[dict[str, Any]],
+    ) -> None:
+        self.model = model
+        self.data = data
+        self.rows = rows
+        self.index: dict[str, int] = {
+            str(x): i for i, x in enumerate(data["name"])
+        }
+
+    @classmethod
+    def _layout(
+        cls, model: type[T]
+    ) -> tuple[np.dtype[np.void], list[str], list[str]]:
+        fields = _fields(model)
+        columns = [(x[0], _column_dtype(x[2])) for x in fields]
+        dtype = np.dtype([(x, y) for x, y in columns if y is not None])
+        return (
+            dtype,
+            [x for x, y in columns if y is not None],
+            [x for x, y in columns if y is None],
+        )
+
+    @classmethod
+    def from_models(cls, model: type[T], items: Iterable[T]) -> Columns[T]:
+        """Store models, e.g. the values of an `UncivMod` collection."""
+        dtype, scalars, others = cls._layout(model)
+        items = list(items)
+        data = np.empty(len(items), dtype)
+        for name in scalars:
+            data[name] = [
+                np.nan if (x := getattr(y, name)) is None else x
+                for y in items
+            ]
+        rows = [{x: getattr(y, x) for x in others} for y in items]
+        return cls(model, data, rows)
+
+    @classmethod
+    def from_json(
+        cls, model: type[T], objects: Sequence[dict[str, Any]]
+    ) -> Columns[T]:
+        """Store camelCase JSON objects without building a model for each."""
+        dtype, _, _ = cls._layout(model)
+        data = np.empty(len(objects), dtype)
+        rows: list[dict[str, Any]] = [{} for _ in objects]
+        for field, (name, json_key, field_type, _, _) in zip(
+            attrs.fields(model), _fields(model)
+        ):
+            if field.default is attrs.NOTHING:
+                default = None
+            elif isinstance(field.default, attrs.Factory):
+                default = field.default.factory
+            else:
+                default = field.default
+
+            values = [
+                _structure(field_type, x[json_key])
+                if json_key in x
+                else default() if callable(default) else default
+                for x in objects
+            ]
+            if name in dtype.names:
+                data[name] = [np.nan if x is None else x for x in values]
+            else:
+                for row, value in zip(rows, values):
+                    row[name] = value
+        return cls(model, data, rows)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, name: str) -> NDArray[Any]:
+        """The column of a scalar field."""
+        return self.data[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def _value(self, name: str, value: Any) -> Any:  # noqa: ANN401
+        if self.data.dtype[name].kind == "f" and np.isnan(value):
+            return None
+        return value.item() if isinstance(value, np.generic) else value
+
+    def row(self, key: int | str) -> T:
+        """Rebuild the model at a position, or with a name."""
+        i = self.index[key] if isinstance(key, str) else key
+        record = self.data[i]
+        scalars = {
+            x: self._value(x, record[x]) for x in self.data.dtype.names
+        }
+        return self.model(**scalars, **self.rows[i])
+
+    def to_models(self) -> list[T]:
+        return [self.row(i) for i in range(len(self))]
+
+    def to_dict(self) -> dict[str, T]:
+        """Rebuild the models keyed by name, as in `UncivMod`."""
+        return {str(x): self.row(i) for i, x in enumerate(self.data["name"])}
+
+    def filter(self, mask: NDArray[np.bool_]) -> Columns[T]:
+        """Keep the rows where ``mask`` is true."""
+        return type(self)(
+            self.model,
+            self.data[mask],
+            [x for x, y in zip(self.rows, mask) if y],
+        )
+
+    def aggregate(
+        self,
+        by: str,
+        field: str,
+        ufunc: Callable[..., Any] = np.add,
+    ) -> dict[Any, Any]:
+        """Reduce a column per distinct value of another with a ufunc."""
+        if not len(self):
+            return {}
+        keys, inverse = np.unique(self.data[by], return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        starts = np.flatnonzero(np.diff(inverse[order], prepend=-1))
+        reduced = ufunc.reduceat(self.data[field][order], starts)
+        return {
+            self._value(by, x): self._value(field, y)
+            for x, y in zip(keys, reduced)
+        }
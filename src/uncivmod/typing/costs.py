@@ -0,0 +1,285 @@
+"""Costs of a ruleset evaluated for every speed, difficulty and era at once.
+
+The formulas follow Unciv, see `UnitUpgradeCost` for the upgrade gold cost.
+Speed modifiers that are not set fall back to the speed's ``modifier``.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from attrs import field, frozen
+
+from uncivmod.typing.filehandler import load_mod
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    msg = "cost tables need numpy, install uncivmod[numpy]"
+    raise ImportError(msg) from e
+
+if TYPE_CHECKING:
+    from typing import Mapping
+
+    from numpy.typing import NDArray
+
+    from uncivmod.typing.base import (
+        Building,
+        Speed,
+        UncivMod,
+        Unit,
+        UnitUpgradeCost,
+    )
+
+
+def speed_modifier(speed: Speed, name: str) -> float:
+    """A cost modifier of a speed, e.g. ``gold_cost_modifier``."""
+    value = getattr(speed, name)
+    return speed.modifier if value is None else value
+
+
+def upgrade_pairs(units: Mapping[str, Unit]) -> list[tuple[str, str]]:
+    """Every unit with each unit it upgrades into along its chain.
+
+    A chain stops at a unit that is missing or that was already visited.
+    """
+    pairs: list[tuple[str, str]] = []
+    for name, unit in units.items():
+        seen = {name}
+        target = unit.upgrades_to
+        while target in units and target not in seen:
+            pairs.append((name, target))
+            seen.add(target)
+            target = units[target].upgrades_to
+    return pairs
+
+
+@frozen
+class UpgradeCosts:
+    """Gold to upgrade ``sources[i]`` into ``targets[i]``.
+
+    ``gold`` has the shape (speeds, eras, pairs), where the era axis is the
+    number of eras that have passed. Units without a cost read as NaN.
+    """
+
+    sources: tuple[str, ...]
+    targets: tuple[str, ...]
+    speeds: tuple[str, ...]
+    eras: tuple[str, ...]
+    gold: NDArray[np.float64] = field(eq=False)
+
+    def matrix(self, speed: str, era: str) -> tuple[list[str], NDArray[Any]]:
+        """Square from→to matrix of a speed and era, NaN where impossible."""
+        units = sorted({*self.sources, *self.targets})
+        index = {x: i for i, x in enumerate(units)}
+        matrix = np.full((len(units), len(units)), np.nan)
+        matrix[
+            [index[x] for x in self.sources],
+            [index[x] for x in self.targets],
+        ] = self.gold[self.speeds.index(speed), self.eras.index(era)]
+        return units, matrix
+
+    def write_csv(self, csv_file: Path) -> None:
+        """Write a row per upgrade with a column per speed and era."""
+        _write_csv(
+            csv_file,
+            ["from", "to"],
+            [f"{x} / {y}" for x in self.speeds for y in self.eras],
+            list(zip(self.sources, self.targets)),
+            self.gold.reshape(-1, len(self.sources)).T,
+        )
+
+
+def _write_csv(
+    csv_file: Path,
+    keys: list[str],
+    columns: list[str],
+    rows: list[tuple[str, ...]],
+    values: NDArray[np.float64],
+) -> None:
+    csv_file.parent.mkdir(parents=True, exist_ok=True)
+    with csv_file.open("w", encoding="UTF-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([*keys, *columns])
+        for row, row_values in zip(rows, values.tolist()):
+            writer.writerow(
+                [*row, *("" if math.isnan(x) else int(x) for x in row_values)]
+            )
+
+
+def upgrade_gold(
+    cost_difference: NDArray[np.float64],
+    passed_eras: NDArray[np.float64],
+    constants: UnitUpgradeCost,
+    gold_modifier: NDArray[np.float64] | float = 1,
+    modifier: float = 1,
+) -> NDArray[np.float64]:
+    """Evaluate the upgrade formula over broadcast arrays.
+
+    ``modifier`` is `C`, the aggregate of the gold cost of upgrading uniques,
+    and ``gold_modifier`` that of the game speed.
+    """
+    gold = np.maximum(
+        constants.base + constants.perproduction * cost_difference, 0
+    )
+    gold = gold * modifier * (1 + passed_eras * constants.era_multiplier)
+    gold = gold**constants.exponent * gold_modifier
+    return np.floor(gold / constants.round_to) * constants.round_to
+
+
+def upgrade_costs(mod: UncivMod, modifier: float = 1) -> UpgradeCosts:
+    """Upgrade gold of every upgrade chain for every speed and era."""
+    pairs = upgrade_pairs(mod.units)
+    speeds = list(mod.speeds.values())
+    production = np.array(
+        [speed_modifier(x, "production_cost_modifier") for x in speeds]
+        or [1.0]
+    )
+    gold_modifier = np.array(
+        [speed_modifier(x, "gold_cost_modifier") for x in speeds] or [1.0]
+    )
+    eras = tuple(mod.eras) or ("",)
+
+    index = {x: i for i, x in enumerate(mod.units)}
+    unit_cost = np.array(
+        [np.nan if x.cost < 0 else x.cost for x in mod.units.values()]
+    )[np.array([[index[x], index[y]] for x, y in pairs], dtype=int)]
+    unit_cost = unit_cost.reshape(-1, 2)
+    # Production costs are whole numbers once the speed is applied.
+    scaled = np.floor(unit_cost[np.newaxis] * production[:, None, None])
+    difference = scaled[..., 1] - scaled[..., 0]
+    gold = upgrade_gold(
+        difference[:, np.newaxis, :],
+        np.arange(len(eras), dtype=float)[np.newaxis, :, np.newaxis],
+        mod.mod_constants.unit_upgrade_cost,
+        gold_modifier[:, np.newaxis, np.newaxis],
+        modifier,
+    )
+    return UpgradeCosts(
+        tuple(x for x, _ in pairs),
+        tuple(x for _, x in pairs),
+        tuple(mod.speeds) or ("",),
+        eras,
+        gold,
+    )
+
+
+_cost_modifiers = {
+    "buildings": ("production_cost_modifier", "building_cost_modifier"),
+    "units": ("production_cost_modifier", "unit_cost_modifier"),
+    "techs": ("science_cost_modifier", "research_cost_modifier"),
+}
+
+
+@frozen
+class CostTable:
+    """Costs of a collection for every speed and difficulty.
+
+    ``costs`` has the shape (speeds, difficulties, entities), and entities
+    without a cost read as NaN.
+    """
+
+    names: tuple[str, ...]
+    speeds: tuple[str, ...]
+    difficulties: tuple[str, ...]
+    costs: NDArray[np.float64] = field(eq=False)
+
+    def write_csv(self, csv_file: Path) -> None:
+        """Write a row per entity with a column per speed and difficulty."""
+        _write_csv(
+            csv_file,
+            ["name"],
+            [f"{x} / {y}" for x in self.speeds for y in self.difficulties],
+            [(x,) for x in self.names],
+            self.costs.reshape(-1, len(self.names)).T,
+        )
+
+
+def base_costs(mod: UncivMod) -> dict[str, dict[str, float]]:
+    """Unmodified costs of buildings, units and techs.
+
+    Techs and buildings without a cost of their own take it from the column
+    of the tech tree they are in, or that their required tech is in.
+    """
+    columns = {y.name: x for x in mod.techs for y in x.techs}
+    techs = {
+        y.name: y.cost or x.tech_cost for x in mod.techs for y in x.techs
+    }
+
+    def building_cost(building: Building) -> float:
+        if building.cost is not None and building.cost >= 0:
+            return building.cost
+        column = columns.get(building.required_tech)
+        if column is None:
+            return math.nan
+        if building.is_wonder or building.is_national_wonder:
+            return column.wonder_cost
+        return column.building_cost
+
+    return {
+        "buildings": {
+            x: building_cost(y) for x, y in mod.buildings.items()
+        },
+        "units": {
+            x: math.nan if y.cost < 0 else y.cost
+            for x, y in mod.units.items()
+        },
+        "techs": techs,
+    }
+
+
+def cost_tables(mod: UncivMod) -> dict[str, CostTable]:
+    """Scale every cost by every combination of speed and difficulty."""
+    speeds = list(mod.speeds.values())
+    difficulties = list(mod.difficulties.values())
+    tables: dict[str, CostTable] = {}
+    for kind, costs in base_costs(mod).items():
+        speed_name, difficulty_name = _cost_modifiers[kind]
+        speed = np.array(
+            [speed_modifier(x, speed_name) for x in speeds] or [1.0]
+        )
+        difficulty = np.array(
+            [getattr(x, difficulty_name) for x in difficulties] or [1.0]
+        )
+        base = np.fromiter(costs.values(), float, len(costs))
+        tables[kind] = CostTable(
+            tuple(costs),
+            tuple(mod.speeds) or ("",),
+            tuple(mod.difficulties) or ("",),
+            # Unciv truncates costs to whole numbers.
+            np.floor(
+                base[np.newaxis, np.newaxis, :]
+                * speed[:, np.newaxis, np.newaxis]
+                * difficulty[np.newaxis, :, np.newaxis]
+            ),
+        )
+    return tables
+
+
+def write_cost_tables(mod: UncivMod, output_dir: Path) -> list[Path]:
+    """Write the cost table of each collection as ``<collection>.csv``."""
+    written: list[Path] = []
+    for kind, table in cost_tables(mod).items():
+        table.write_csv(output_dir / f"{kind}.csv")
+        written.append(output_dir / f"{kind}.csv")
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("mod_dir", type=Path)
+    parser.add_argument("output_dir", type=Path)
+    args = parser.parse_args(argv)
+
+    mod = load_mod(args.mod_dir)
+    for csv_file in write_cost_tables(mod, args.output_dir):
+        print(csv_file)
+    upgrade_costs(mod).write_csv(args.output_dir / "upgrades.csv")
+    print(args.output_dir / "upgrades.csv")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,64 @@ Can read/write json, or entire folders.
 """
 from __future__ import annotations
 
-from typing import cast
+import hashlib
+import logging
+import pickle
+import re
+import types
+from functools import lru_cache, partial
+from importlib import metadata
+from typing import TYPE_CHECKING, Any, Union, cast, get_args, get_origin
 
+import attrs
 from attr import Attribute
 from attrs import define, field
 
+from uncivmod.strings import strings
+from uncivmod.typing.base import (
+    CivilopediaText,
+    GlobalUniques,
+    ModConstants,
+    UncivMod,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from uncivmod.strings import StringPool
+
+_json_names = {
+    "excluded_diffculties": "excludedDifficulties",
+    "icon_rgb": "iconRGB",
+    "max_xp_from_barbarians": "maxXPFromBarbarians",
+    "rgb": "RGB",
+}
+_mod_files = {
+    "beliefs": "Beliefs.json",
+    "buildings": "Buildings.json",
+    "difficulties": "Difficulties.json",
+    "eras": "Eras.json",
+    "global_uniques": "GlobalUniques.json",
+    "improvements": "TileImprovements.json",
+    "mod_constants": "ModOptions.json",
+    "nations": "Nations.json",
+    "policies": "Policies.json",
+    "promotions": "UnitPromotions.json",
+    "quests": "Quests.json",
+    "religions": "Religions.json",
+    "resources": "TileResources.json",
+    "ruins": "Ruins.json",
+    "specialists": "Specialists.json",
+    "speeds": "Speeds.json",
+    "techs": "Techs.json",
+    "terrains": "Terrains.json",
+    "unit_types": "UnitTypes.json",
+    "units": "Units.json",
+    "victory_type": "VictoryTypes.json",
+}
+_underscore = re.compile(r"_([a-z0-9])")
+_snapshot_version = 2
+
 
 def _check(self, attribute: Attribute[int], value: int):
     print(type(attribute))
@@ -25,3 +78,264 @@ def trick_type_hinter() -> int:
 @define
 class LiteralDefault:
     x: int = field(factory=trick_type_hinter, validator=_check)
+
+
+def json_name(name: str) -> str:
+    """JSON key of an attribute, e.g. ``outerColor`` for ``outer_colour``."""
+    if name in _json_names:
+        return _json_names[name]
+    return _underscore.sub(lambda x: x[1].upper(), name).replace(
+        "olour", "olor"
+    )
+
+
+@lru_cache(maxsize=None)
+def _fields(cls: type) -> tuple[tuple[str, str, Any, bool, bool], ...]:
+    """Name, JSON key, type and whether it is required or None if missing."""
+    attrs.resolve_types(cls)
+    return tuple(
+        (
+            x.name,
+            json_name(x.name),
+            x.type,
+            x.default is attrs.NOTHING and not _is_optional(x.type),
+            x.default is attrs.NOTHING and _is_optional(x.type),
+        )
+        for x in attrs.fields(cls)
+    )
+
+
+def _is_optional(hint: Any) -> bool:  # noqa: ANN401
+    return get_origin(hint) in (Union, types.UnionType) and type(
+        None
+    ) in get_args(hint)
+
+
+def structure[T](
+    cls: type[T],
+    data: Any,  # noqa: ANN401
+    *,
+    validate: bool = True,
+) -> T:
+    """Build an attrs class, or a container of them, from camelCase JSON.
+
+    Lists of named objects become dicts keyed by name where a dict is
+    expected, and lists become the fields of an attrs class in order.
+    Without ``validate`` the validators of the fields are not run.
+    """
+    return cast(T, _structure(cls, data, validate))
+
+
+def _unvalidated[T](cls: type[T], /, **values: Any) -> T:  # noqa: ANN401
+    """Build an attrs class like ``cls(**values)`` but skip its validators.
+
+    Unlike `attrs.validators.disabled`, this does not touch global state,
+    so other threads keep validating.
+    """
+    obj = object.__new__(cls)
+    for attribute in attrs.fields(cls):
+        if attribute.name in values:
+            value = values[attribute.name]
+        elif isinstance(attribute.default, attrs.Factory):
+            factory = attribute.default.factory
+            value = (
+                factory(obj) if attribute.default.takes_self else factory()
+            )
+        elif attribute.default is attrs.NOTHING:
+            msg = f"{cls.__name__} missing argument {attribute.name!r}"
+            raise TypeError(msg)
+        else:
+            value = attribute.default
+        object.__setattr__(obj, attribute.name, value)
+    return obj
+
+
+def _structure(  # noqa: C901, PLR0911
+    hint: Any,  # noqa: ANN401
+    data: Any,  # noqa: ANN401
+    validate: bool = True,  # noqa: FBT001, FBT002
+) -> Any:  # noqa: ANN401
+    origin = get_origin(hint)
+    if origin in (Union, types.UnionType):
+        options = [x for x in get_args(hint) if x is not type(None)]
+        if data is None:
+            return None
+        for option in options:
+            if not attrs.has(option) or all(
+                x[1] in data for x in _fields(option) if x[3]
+            ):
+                return _structure(option, data, validate)
+        msg = f"{data!r} matches none of {hint}"
+        raise TypeError(msg)
+    if origin is list:
+        (item,) = get_args(hint)
+        return [_structure(item, x, validate) for x in data]
+    if origin is dict:
+        _, item = get_args(hint)
+        if isinstance(data, list):
+            return {x["name"]: _structure(item, x, validate) for x in data}
+        return {
+            key: _structure(item, x, validate) for key, x in data.items()
+        }
+    if hint is CivilopediaText:
+        return CivilopediaText.from_json(data)
+    if isinstance(hint, type) and attrs.has(hint):
+        fields = _fields(hint)
+        build = hint if validate else partial(_unvalidated, hint)
+        if isinstance(data, list):
+            return build(
+                **{
+                    name: _structure(field_type, x, validate)
+                    for (name, _, field_type, _, _), x in zip(fields, data)
+                }
+            )
+        return build(
+            **{
+                name: (
+                    _structure(field_type, data[json_key], validate)
+                    if json_key in data
+                    else None
+                )
+                for name, json_key, field_type, _, none_if_missing in fields
+                if json_key in data or none_if_missing
+            }
+        )
+    if isinstance(hint, type) and issubclass(hint, list):
+        (base,) = (x for x in hint.__orig_bases__ if get_origin(x) is list)
+        return hint(_structure(base, data, validate))
+    if isinstance(hint, type) and hint not in (int, float, bool, str, Any):
+        return hint(data)
+    return data
+
+
+class LazyUncivMod:
+    """View of a mod folder parsing each json file on first access.
+
+    Collections are named as in `UncivMod`. A parsed collection is reused
+    until its file changes on disk or it is invalidated, and a missing file
+    reads as an empty collection. Without ``validate`` models are built
+    without running their validators.
+    """
+
+    def __init__(
+        self,
+        mod_dir: Path,
+        pool: StringPool | None = None,
+        *,
+        validate: bool = True,
+    ) -> None:
+        self.mod_dir = mod_dir
+        self.pool = strings if pool is None else pool
+        self.validate = validate
+        self._collections: dict[str, tuple[tuple[int, int] | None, Any]] = {}
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401
+        if name.startswith("_") or name not in _mod_files:
+            msg = f"{type(self).__name__!r} object has no attribute {name!r}"
+            raise AttributeError(msg)
+        return self.load(name)
+
+    def __dir__(self) -> list[str]:
+        return [*super().__dir__(), *_mod_files]
+
+    def path(self, name: str) -> Path:
+        return self.mod_dir / "jsons" / _mod_files[name]
+
+    def load(self, name: str) -> Any:  # noqa: ANN401
+        """Parse a collection, or return it if its file is unchanged."""
+        json_file = self.path(name)
+        try:
+            stat = json_file.stat()
+            stamp: tuple[int, int] | None = stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            stamp = None
+
+        cached = self._collections.get(name)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        if stamp is None:
+            collection = attrs.fields_dict(UncivMod)[name].default.factory()
+        else:
+            collection = _parse_collection(
+                name, self.pool.load_json(json_file), self.validate
+            )
+        self._collections[name] = stamp, collection
+        return collection
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Forget one parsed collection, or all of them."""
+        if name is None:
+            self._collections.clear()
+        else:
+            self._collections.pop(name, None)
+
+    def to_mod(self) -> UncivMod:
+        """Parse every collection into an `UncivMod`."""
+        return UncivMod(**{x: self.load(x) for x in _mod_files})
+
+
+def _parse_collection(
+    name: str,
+    data: Any,  # noqa: ANN401
+    validate: bool = True,  # noqa: FBT001, FBT002
+) -> Any:  # noqa: ANN401
+    if name == "mod_constants":
+        return structure(
+            ModConstants, data.get("constants", {}), validate=validate
+        )
+    if name == "global_uniques" and isinstance(data, dict):
+        return [structure(GlobalUniques, data, validate=validate)]
+    (field_type,) = (x[2] for x in _fields(UncivMod) if x[0] == name)
+    return _structure(field_type, data, validate)
+
+
+def library_version() -> str:
+    try:
+        return metadata.version("uncivmod")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def source_hashes(mod_dir: Path) -> dict[str, str]:
+    """Hash the contents of every json file of a mod."""
+    return {
+        x.name: hashlib.sha256(x.read_bytes()).hexdigest()
+        for x in sorted((mod_dir / "jsons").glob("*.json"))
+    }
+
+
+def load_mod(mod_dir: Path, snapshot_file: Path | None = None) -> UncivMod:
+    """Parse a whole mod folder, reusing a snapshot of it while still valid.
+
+    The snapshot is a pickled stamp of the snapshot format, library version
+    and source hashes, followed by the pickled `UncivMod`, so an outdated
+    snapshot is rejected without unpickling the mod. A snapshot that fails
+    to unpickle in any way is reparsed and replaced.
+    """
+    if snapshot_file is None:
+        return LazyUncivMod(mod_dir).to_mod()
+
+    stamp = {
+        "version": _snapshot_version,
+        "library": library_version(),
+        "sources": source_hashes(mod_dir),
+    }
+    if snapshot_file.is_file():
+        try:
+            with snapshot_file.open("rb") as f:
+                if pickle.load(f) == stamp:  # noqa: S301
+                    return pickle.load(f)  # noqa: S301
+        except Exception:  # noqa: BLE001
+            logging.debug(
+                "discarding snapshot %s", snapshot_file, exc_info=True
+            )
+
+    mod = LazyUncivMod(mod_dir).to_mod()
+    snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+    partial_file = snapshot_file.with_name(f"{snapshot_file.name}.partial")
+    with partial_file.open("wb") as f:
+        pickle.dump(stamp, f)
+        pickle.dump(mod, f)
+    partial_file.replace(snapshot_file)
+    return mod
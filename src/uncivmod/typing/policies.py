@@ -0,0 +1,183 @@
+"""Policy branches laid out as grids with their dependencies as bitsets.
+
+Members are numbered within their branch, and a set of members is an int
+with a bit per member. A member is available once the branch is adopted and
+every member it requires has been adopted.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from uncivmod.typing._bitset import iter_bits
+from uncivmod.typing.base import PolicyFinisher, PolicyMember
+from uncivmod.typing.validation import Violation
+
+if TYPE_CHECKING:
+    from typing import Iterable, Mapping
+
+    from uncivmod.typing.base import Policy
+
+
+class PolicyGrid:
+    """One policy branch, with the members each member requires and unlocks.
+
+    ``requires[i]`` and ``required_by[i]`` are bitsets of the members that
+    member ``i`` requires and that require it.
+    """
+
+    def __init__(self, policy: Policy) -> None:
+        self.policy = policy
+        self.members = members = [
+            x for x in policy.policies.values() if isinstance(x, PolicyMember)
+        ]
+        self.finishers = [
+            x.name
+            for x in policy.policies.values()
+            if isinstance(x, PolicyFinisher)
+        ]
+        self.names = tuple(x.name for x in members)
+        self.index = {x: i for i, x in enumerate(self.names)}
+        self.grid: dict[tuple[int, int], list[str]] = {}
+        for member in members:
+            self.grid.setdefault((member.row, member.column), []).append(
+                member.name
+            )
+
+        self.requires = [
+            self.mask(y for y in x.requires if y in self.index)
+            for x in members
+        ]
+        self.required_by = [0] * len(members)
+        for i, bits in enumerate(self.requires):
+            for required in iter_bits(bits):
+                self.required_by[required] |= 1 << i
+        self.missing = {
+            x.name: [y for y in x.requires if y not in self.index]
+            for x in members
+            if any(y not in self.index for y in x.requires)
+        }
+        self.roots = self.mask(x.name for x in members if not x.requires)
+        self.reachable = self._reachable()
+
+    def _reachable(self) -> int:
+        reachable = 0
+        changed = True
+        while changed:
+            changed = False
+            for i, bits in enumerate(self.requires):
+                if (
+                    not reachable >> i & 1
+                    and self.names[i] not in self.missing
+                    and bits & ~reachable == 0
+                ):
+                    reachable |= 1 << i
+                    changed = True
+        return reachable
+
+    def mask(self, names: Iterable[str]) -> int:
+        """Bitset of members."""
+        bits = 0
+        for name in names:
+            bits |= 1 << self.index[name]
+        return bits
+
+    def names_of(self, bits: int) -> list[str]:
+        return [self.names[x] for x in iter_bits(bits)]
+
+    def available(self, adopted: int) -> int:
+        """Members not adopted yet whose requirements are all adopted."""
+        return sum(
+            1 << i
+            for i, bits in enumerate(self.requires)
+            if not adopted >> i & 1 and bits & ~adopted == 0
+        ) & self.reachable
+
+    def unlocks(self, name: str, adopted: int = 0) -> int:
+        """Members that adopting a member, or the branch, makes available.
+
+        Only the members requiring ``name`` are looked at, so the cost does
+        not grow with the size of the branch.
+        """
+        if name == self.policy.name:
+            return self.roots & self.reachable
+        i = self.index[name]
+        adopted |= 1 << i
+        return sum(
+            1 << x
+            for x in iter_bits(self.required_by[i])
+            if self.requires[x] & ~adopted == 0 and not adopted >> x & 1
+        ) & self.reachable
+
+    def violations(self) -> list[Violation]:
+        """Overlapping positions, unreachable members and finisher count."""
+        entity = f"policies/{self.policy.name}"
+        violations = [
+            Violation(
+                entity,
+                "policies",
+                names,
+                f"share row {row} and column {column}",
+            )
+            for (row, column), names in self.grid.items()
+            if len(names) > 1
+        ]
+        violations.extend(
+            Violation(
+                f"{entity}/{x}",
+                "requires",
+                y,
+                "requires a policy not in the branch",
+            )
+            for x, y in self.missing.items()
+        )
+        for i, member in enumerate(self.members):
+            if not self.reachable >> i & 1:
+                violations.append(
+                    Violation(
+                        f"{entity}/{member.name}",
+                        "requires",
+                        member.requires,
+                        "can never be adopted",
+                    )
+                )
+            violations.extend(
+                Violation(
+                    f"{entity}/{member.name}",
+                    "requires",
+                    self.names[x],
+                    "requires a policy that is not in an earlier row",
+                )
+                for x in iter_bits(self.requires[i])
+                if self.members[x].row >= member.row
+            )
+        if len(self.finishers) != 1:
+            violations.append(
+                Violation(
+                    entity,
+                    "policies",
+                    self.finishers,
+                    "has no finisher"
+                    if not self.finishers
+                    else "has more than one finisher",
+                )
+            )
+        return violations
+
+
+class PolicyIndex:
+    """Grids of every policy branch of a ruleset."""
+
+    def __init__(self, policies: Mapping[str, Policy]) -> None:
+        self.grids = {x: PolicyGrid(y) for x, y in policies.items()}
+        self.branches = {
+            y: x for x, grid in self.grids.items() for y in grid.names
+        }
+
+    def unlocks(self, name: str, adopted: Iterable[str] = ()) -> list[str]:
+        """Members that adopting a branch or member makes available."""
+        grid = self.grids.get(name) or self.grids[self.branches[name]]
+        bits = grid.mask(x for x in adopted if x in grid.index)
+        return grid.names_of(grid.unlocks(name, bits))
+
+    def violations(self) -> list[Violation]:
+        return [x for grid in self.grids.values() for x in grid.violations()]
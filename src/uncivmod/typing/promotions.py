@@ -0,0 +1,171 @@
+"""Index of promotions by the unit types that can earn them.
+
+A promotion can be earned once any one of its prerequisites has been, so
+for each unit type only promotions with a chain of prerequisites that the
+type can earn are reachable.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from uncivmod.typing.validation import Violation
+
+if TYPE_CHECKING:
+    from typing import Iterable, Mapping
+
+    from uncivmod.typing.base import Promotion, Unit
+
+
+class PromotionIndex:
+    """Promotions by unit type, with the prerequisite closure of each.
+
+    The closure of a promotion holds every promotion on some chain of
+    prerequisites leading to it.
+    """
+
+    def __init__(self, promotions: Mapping[str, Promotion]) -> None:
+        self.promotions = promotions
+        by_type: dict[str, set[str]] = {}
+        for name, promotion in promotions.items():
+            for unit_type in promotion.unit_types:
+                by_type.setdefault(unit_type, set()).add(name)
+        self.by_type = {x: frozenset(y) for x, y in by_type.items()}
+
+        self.closures: dict[str, frozenset[str]] = {}
+        for name in promotions:
+            closure: set[str] = set()
+            pending = [name]
+            while pending:
+                for x in promotions[pending.pop()].prerequisites:
+                    if x in promotions and x not in closure:
+                        closure.add(x)
+                        pending.append(x)
+            self.closures[name] = frozenset(closure)
+
+        self.reachable = {
+            x: self._reachable(y) for x, y in self.by_type.items()
+        }
+
+    def _reachable(self, available: frozenset[str]) -> frozenset[str]:
+        reachable: set[str] = set()
+        pending = set(available)
+        changed = True
+        while changed:
+            changed = False
+            for name in list(pending):
+                prerequisites = self.promotions[name].prerequisites
+                if not prerequisites or reachable.intersection(prerequisites):
+                    reachable.add(name)
+                    pending.remove(name)
+                    changed = True
+        return frozenset(reachable)
+
+    def available(self, unit_type: str) -> frozenset[str]:
+        """Promotions listing the unit type."""
+        return self.by_type.get(unit_type, frozenset())
+
+    def is_legal(self, unit_type: str, promotion: str) -> bool:
+        return promotion in self.by_type.get(unit_type, ())
+
+    def unit_violations(
+        self, units: Mapping[str, Unit], unit_types: Iterable[str] = ()
+    ) -> list[Violation]:
+        """Illegal starting promotions and unreachable promotions.
+
+        A starting promotion is illegal when it does not list the unit type.
+        A promotion is unreachable for a type it lists when none of its
+        prerequisites can be reached by that type. Given the known
+        ``unit_types``, promotions listing other types are reported too.
+        """
+        violations = [
+            Violation(
+                f"units/{name}",
+                "promotions",
+                promotion,
+                "is not a promotion"
+                if promotion not in self.promotions
+                else f"is not available to {unit.unit_type}",
+            )
+            for name, unit in units.items()
+            for promotion in unit.promotions
+            if not self.is_legal(unit.unit_type, promotion)
+        ]
+        known = set(unit_types)
+        for unit_type, available in self.by_type.items():
+            if known and unit_type not in known:
+                violations.extend(
+                    Violation(
+                        f"promotions/{x}",
+                        "unit_types",
+                        unit_type,
+                        "is not a unit type",
+                    )
+                    for x in sorted(available)
+                )
+            violations.extend(
+                Violation(
+                    f"promotions/{x}",
+                    "prerequisites",
+                    self.promotions[x].prerequisites,
+                    f"can never be reached by {unit_type}",
+                )
+                for x in sorted(available - self.reachable[unit_type])
+            )
+        return violations
+
+    def merged_violations(
+        self, units: Mapping[str, Mapping[str, Any]]
+    ) -> list[Violation]:
+        """Illegal starting promotions of units merged by the combine.
+
+        A merged unit is json whose ``unitType`` is a list of (unitType,
+        upgradesTo) pairs and whose ``promotions`` are those of all its
+        sources. It is split into a unit per pair, each starting with every
+        promotion, so a promotion must be legal for all of the types.
+        """
+        violations: list[Violation] = []
+        for name, unit in units.items():
+            unit_type = unit["unitType"]
+            unit_types = (
+                [unit_type]
+                if isinstance(unit_type, str)
+                else list(dict.fromkeys(x for x, _ in unit_type))
+            )
+            for promotion in unit.get("promotions", ()):
+                if promotion not in self.promotions:
+                    violations.append(
+                        Violation(
+                            f"units/{name}",
+                            "promotions",
+                            promotion,
+                            "is not a promotion",
+                        )
+                    )
+                    continue
+                violations.extend(
+                    Violation(
+                        f"units/{name}",
+                        "promotions",
+                        promotion,
+                        f"is not available to {x}",
+                    )
+                    for x in unit_types
+                    if not self.is_legal(x, promotion)
+                )
+        return violations
+
+    def summary(self, unit: Unit) -> dict[str, Any]:
+        """Summarise the starting and reachable promotions of a unit."""
+        leading: set[str] = set()
+        for promotion in unit.promotions:
+            leading |= self.closures.get(promotion, frozenset())
+        reachable = self.reachable.get(unit.unit_type, frozenset())
+        return {
+            "unitType": unit.unit_type,
+            "starting": list(unit.promotions),
+            "leadingTo": sorted(leading - set(unit.promotions)),
+            "reachable": sorted(reachable - set(unit.promotions)),
+        }
+
+    def summaries(self, units: Mapping[str, Unit]) -> dict[str, Any]:
+        return {x: self.summary(y) for x, y in units.items()}
@@ -0,0 +1,165 @@
+"""Stats as NumPy rows, so yields of whole rulesets are a few array operations.
+
+A `StatsVector` holds one row of the seven stats in the order of `Stats`, or
+a matrix with a row per entity. Stats missing from a json object can be read
+as NaN, which is how `merge_gains` tells them apart from zero.
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import attrs
+
+from uncivmod.typing.base import Stats
+
+try:
+    import numpy as np
+except ImportError as e:  # pragma: no cover
+    msg = "stats vectors need numpy, install uncivmod[numpy]"
+    raise ImportError(msg) from e
+
+if TYPE_CHECKING:
+    from typing import Iterable, Mapping
+
+    from numpy.typing import ArrayLike, NDArray
+
+    from uncivmod.typing.base import UncivMod
+
+stat_names: tuple[str, ...] = tuple(x.name for x in attrs.fields(Stats))
+
+
+class StatsVector:
+    """A row of stats, or a matrix with a row of stats per entity."""
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: ArrayLike) -> None:
+        self.values: NDArray[np.float64] = np.asarray(values, dtype=float)
+        if self.values.shape[-1:] != (len(stat_names),):
+            msg = f"expected {len(stat_names)} stats, got {self.values.shape}"
+            raise ValueError(msg)
+
+    @classmethod
+    def zeros(cls, rows: int | None = None) -> StatsVector:
+        shape = len(stat_names) if rows is None else (rows, len(stat_names))
+        return cls(np.zeros(shape))
+
+    @classmethod
+    def from_stats(cls, stats: Stats) -> StatsVector:
+        return cls([getattr(stats, x) for x in stat_names])
+
+    @classmethod
+    def from_models(cls, models: Iterable[Any]) -> StatsVector:
+        """Stack the stats of models such as buildings, terrains or `Stats`."""
+        return cls(
+            np.array(
+                [[getattr(y, x) for x in stat_names] for y in models],
+                dtype=float,
+            ).reshape(-1, len(stat_names))
+        )
+
+    @classmethod
+    def from_json(
+        cls,
+        objects: Iterable[Mapping[str, float]],
+        missing: float = 0,
+    ) -> StatsVector:
+        """Stack the stats of json objects, reading absent stats as ``missing``."""  # noqa: E501
+        return cls(
+            np.array(
+                [[y.get(x, missing) for x in stat_names] for y in objects],
+                dtype=float,
+            ).reshape(-1, len(stat_names))
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, name: str) -> NDArray[np.float64]:
+        """The values of one stat."""
+        return self.values[..., stat_names.index(name)]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StatsVector):
+            return NotImplemented
+        return bool(np.array_equal(self.values, other.values, equal_nan=True))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.values.tolist()!r})"
+
+    def __add__(self, other: StatsVector) -> StatsVector:
+        return StatsVector(self.values + other.values)
+
+    def __mul__(self, factor: ArrayLike) -> StatsVector:
+        """Scale by a number, or per stat with an array of ``stat_names``.
+
+        Arrays broadcast as in numpy, so a ``(rows, 1)`` array scales per
+        row, see `scale_rows`.
+        """
+        return StatsVector(self.values * np.asarray(factor, dtype=float))
+
+    __rmul__ = __mul__
+
+    def scale_rows(self, factors: ArrayLike) -> StatsVector:
+        """Scale each row of a matrix by its own factor."""
+        factors = np.asarray(factors, dtype=float)
+        if factors.shape != (len(self),):
+            msg = f"expected {len(self)} factors, got shape {factors.shape}"
+            raise ValueError(msg)
+        return StatsVector(self.values * factors[:, np.newaxis])
+
+    def maximum(self, other: StatsVector) -> StatsVector:
+        return StatsVector(np.maximum(self.values, other.values))
+
+    def with_percent_bonus(self, bonus: StatsVector) -> StatsVector:
+        """Apply percent bonuses, e.g. ``percentStatBonus``, to the stats."""
+        return StatsVector(self.values * (1 + bonus.values / 100))
+
+    def sum(self) -> StatsVector:
+        """Total the rows of a matrix into one row."""
+        return StatsVector(np.nansum(self.values, axis=0))
+
+    def rows(self) -> list[StatsVector]:
+        return [
+            StatsVector(x) for x in self.values.reshape(-1, len(stat_names))
+        ]
+
+    def to_stats(self) -> Stats:
+        """Convert a row, reading NaN as zero."""
+        return Stats(*np.nan_to_num(self.values).tolist())
+
+    def to_json(self) -> list[dict[str, float]] | dict[str, float]:
+        """Non-zero stats of a row, or of every row of a matrix."""
+        if self.values.ndim > 1:
+            return [_row_json(x) for x in self.values]
+        return _row_json(self.values)
+
+
+def _row_json(values: NDArray[np.float64]) -> dict[str, float]:
+    return {
+        x: int(y) if y.is_integer() else y
+        for x, y in zip(stat_names, values.tolist())
+        if y != 0 and not np.isnan(y)
+    }
+
+
+def ruleset_yields(mod: UncivMod) -> dict[str, StatsVector]:
+    """Stats matrices of the collections with yields, in collection order."""
+    return {
+        x: StatsVector.from_models(getattr(mod, x).values())
+        for x in ("buildings", "improvements", "resources", "terrains")
+    }
+
+
+def merge_gains(original: StatsVector, replace: StatsVector) -> StatsVector:
+    """`combine.update_gain` over every stat and row at once.
+
+    Both vectors mark absent stats with NaN, as read by
+    ``StatsVector.from_json(objects, missing=np.nan)``. A stat present in
+    both takes the larger value, and one present in only one is kept when it
+    is positive.
+    """
+    merged = np.fmax(original.values, replace.values)
+    only_one = np.isnan(original.values) ^ np.isnan(replace.values)
+    merged[only_one & (merged <= 0)] = np.nan
+    return StatsVector(merged)
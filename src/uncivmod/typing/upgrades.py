@@ -0,0 +1,255 @@
+"""Index of the upgrade graph of every unit in a ruleset.
+
+Units are numbered, ``edges[i]`` holds the units unit ``i`` upgrades into,
+and the transitive closure is kept as int bitsets, so asking which units
+eventually upgrade into a unit is a lookup once the index is built.
+"""
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING, Any
+
+from uncivmod.typing._bitset import iter_bits
+from uncivmod.typing.validation import Violation
+
+if TYPE_CHECKING:
+    from typing import Iterable, Mapping
+
+    from uncivmod.typing.base import UncivMod, Unit
+
+
+def _strongly_connected(edges: list[tuple[int, ...]]) -> list[list[int]]:
+    """Tarjan's components, each after every component it reaches."""
+    index = [-1] * len(edges)
+    low = [0] * len(edges)
+    on_stack = [False] * len(edges)
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+    for root in range(len(edges)):
+        if index[root] >= 0:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            if child < len(edges[node]):
+                work.append((node, child + 1))
+                target = edges[node][child]
+                if index[target] < 0:
+                    work.append((target, 0))
+                elif on_stack[target]:
+                    low[node] = min(low[node], index[target])
+                continue
+            if low[node] == index[node]:
+                component: list[int] = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return components
+
+
+class UpgradeGraph:
+    """Upgrades between units with their transitive closure.
+
+    ``upgrades`` maps each unit to the units it upgrades into. A unit of the
+    combined output can upgrade into several, one per (unitType, upgradesTo)
+    pair. Upgrades into units that do not exist are kept in ``missing``.
+    """
+
+    def __init__(
+        self,
+        upgrades: Mapping[str, Iterable[str]],
+        eras: Mapping[str, int] | None = None,
+    ) -> None:
+        self.names = tuple(upgrades)
+        self.index = {x: i for i, x in enumerate(self.names)}
+        self.eras = [0 if eras is None else eras.get(x, 0) for x in self.names]
+        self.missing: dict[str, tuple[str, ...]] = {}
+        self.edges: list[tuple[int, ...]] = []
+        for name, targets in upgrades.items():
+            targets = [x for x in targets if x]
+            self.edges.append(
+                tuple(self.index[x] for x in targets if x in self.index)
+            )
+            missing = tuple(x for x in targets if x not in self.index)
+            if missing:
+                self.missing[name] = missing
+
+        self.cycles: list[tuple[str, ...]] = []
+        self.descendant_bits = [0] * len(self.names)
+        for component in _strongly_connected(self.edges):
+            members = set(component)
+            bits = 0
+            for node in component:
+                for target in self.edges[node]:
+                    bits |= (1 << target) | self.descendant_bits[target]
+            if len(component) > 1 or bits >> component[0] & 1:
+                self.cycles.append(tuple(self.names[x] for x in component))
+                for node in members:
+                    bits |= 1 << node
+            for node in component:
+                self.descendant_bits[node] = bits
+
+        self.ancestor_bits = [0] * len(self.names)
+        for node, bits in enumerate(self.descendant_bits):
+            for target in iter_bits(bits):
+                self.ancestor_bits[target] |= 1 << node
+        self._descendants = [self._names(x) for x in self.descendant_bits]
+        self._ancestors = [self._names(x) for x in self.ancestor_bits]
+
+    @classmethod
+    def from_units(
+        cls, units: Mapping[str, Unit], eras: Mapping[str, int] | None = None
+    ) -> UpgradeGraph:
+        return cls({x: (y.upgrades_to,) for x, y in units.items()}, eras)
+
+    @classmethod
+    def from_json(
+        cls,
+        objects: Iterable[Mapping[str, Any]],
+        eras: Mapping[str, int] | None = None,
+    ) -> UpgradeGraph:
+        """Index json units, grouped by `combine.group_unit_type` or not."""
+        upgrades: dict[str, tuple[str, ...]] = {}
+        for unit in objects:
+            if isinstance(unit.get("unitType"), list):
+                upgrades[unit["name"]] = tuple(x[1] for x in unit["unitType"])
+            else:
+                upgrades[unit["name"]] = (unit.get("upgradesTo", ""),)
+        return cls(upgrades, eras)
+
+    def _names(self, bits: int) -> frozenset[str]:
+        return frozenset(self.names[x] for x in iter_bits(bits))
+
+    def descendants(self, name: str) -> frozenset[str]:
+        """Units that ``name`` eventually upgrades into."""
+        return self._descendants[self.index[name]]
+
+    def ancestors(self, name: str) -> frozenset[str]:
+        """Units that eventually upgrade into ``name``."""
+        return self._ancestors[self.index[name]]
+
+    def upgrades_into(self, source: str, target: str) -> bool:
+        return bool(
+            self.descendant_bits[self.index[source]] >> self.index[target] & 1
+        )
+
+    def order(self) -> list[str]:
+        """Units before their upgrades, by era and then name.
+
+        Units on a cycle have no such order and are left out.
+        """
+        cyclic = {self.index[x] for cycle in self.cycles for x in cycle}
+        incoming = [0] * len(self.names)
+        for node, targets in enumerate(self.edges):
+            if node not in cyclic:
+                for target in targets:
+                    incoming[target] += 1
+        ready = [
+            (self.eras[x], self.names[x], x)
+            for x in range(len(self.names))
+            if not incoming[x] and x not in cyclic
+        ]
+        heapq.heapify(ready)
+        order: list[str] = []
+        while ready:
+            _, name, node = heapq.heappop(ready)
+            order.append(name)
+            for target in self.edges[node]:
+                incoming[target] -= 1
+                if not incoming[target] and target not in cyclic:
+                    heapq.heappush(
+                        ready, (self.eras[target], self.names[target], target)
+                    )
+        return order
+
+
+def unit_eras(mod: UncivMod) -> dict[str, int]:
+    """Era number of each unit, from the column of its required tech."""
+    era_numbers = {x: i for i, x in enumerate(mod.eras)}
+    tech_eras = {
+        y.name: era_numbers.get(x.era, 0) for x in mod.techs for y in x.techs
+    }
+    return {x: tech_eras.get(y.required_tech, 0) for x, y in mod.units.items()}
+
+
+def upgrade_violations(
+    mod: UncivMod, graph: UpgradeGraph | None = None
+) -> list[Violation]:
+    """Cycles, upgrades into missing or obsolete units and lost bases.
+
+    An upgrade is into an obsolete unit when the target is made obsolete by
+    a tech in the same column as, or an earlier one than, the tech that
+    unlocks the unit upgrading. A unique unit loses its base when the unit
+    it replaces is missing, or when it upgrades into a unit its base can not
+    reach.
+    """
+    if graph is None:
+        graph = UpgradeGraph.from_units(mod.units, unit_eras(mod))
+    columns = {y.name: x.column_number for x in mod.techs for y in x.techs}
+    violations = [
+        Violation(
+            f"units/{cycle[0]}",
+            "upgrades_to",
+            mod.units[cycle[0]].upgrades_to,
+            f"upgrade cycle through {', '.join(sorted(cycle))}",
+        )
+        for cycle in graph.cycles
+    ]
+    violations.extend(
+        Violation(f"units/{x}", "upgrades_to", z, "upgrades to a missing unit")
+        for x, y in graph.missing.items()
+        for z in y
+    )
+    for name, unit in mod.units.items():
+        target = mod.units.get(unit.upgrades_to)
+        if (
+            target is not None
+            and target.obsolete_tech in columns
+            and columns[target.obsolete_tech]
+            <= columns.get(unit.required_tech, -1)
+        ):
+            violations.append(
+                Violation(
+                    f"units/{name}",
+                    "upgrades_to",
+                    unit.upgrades_to,
+                    f"upgrades to a unit obsolete with {target.obsolete_tech}",
+                )
+            )
+        if not unit.replaces:
+            continue
+        if unit.replaces not in mod.units:
+            violations.append(
+                Violation(
+                    f"units/{name}",
+                    "replaces",
+                    unit.replaces,
+                    "replaces a missing unit",
+                )
+            )
+        elif unit.upgrades_to in graph.index and not (
+            graph.upgrades_into(unit.replaces, unit.upgrades_to)
+            or unit.upgrades_to == unit.replaces
+        ):
+            violations.append(
+                Violation(
+                    f"units/{name}",
+                    "upgrades_to",
+                    unit.upgrades_to,
+                    f"not reachable from the replaced {unit.replaces}",
+                )
+            )
+    return violations
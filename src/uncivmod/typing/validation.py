@@ -0,0 +1,154 @@
+"""Check a whole ruleset at once and report every violation.
+
+Models validate their fields as they are built and stop at the first bad
+one. Here models are built without running their validators, then every
+validated field is checked, so one pass lists everything that needs fixing.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+import attrs
+from attrs import frozen
+
+from uncivmod.typing.filehandler import LazyUncivMod, _mod_files
+
+if TYPE_CHECKING:
+    from typing import Callable
+
+    from attr import Attribute
+
+
+@frozen
+class Violation:
+    """A field that failed its validator.
+
+    ``entity`` is the path to the model holding the field, such as
+    ``eras/Ancient era/icon_rgb``, and ``rule`` is the validator's message.
+    """
+
+    entity: str
+    field: str
+    value: Any
+    rule: str
+
+    def to_json(self) -> dict[str, Any]:
+        """Convert to json format."""
+        return {
+            "entity": self.entity,
+            "field": self.field,
+            "value": self.value,
+            "rule": self.rule,
+        }
+
+
+def _join(entity: str, name: object) -> str:
+    return f"{entity}/{name}" if entity else str(name)
+
+
+@lru_cache
+def _validated(cls: type) -> tuple[Attribute[Any], ...]:
+    return tuple(x for x in attrs.fields(cls) if x.validator is not None)
+
+
+def _walk(obj: Any, entity: str, violations: list[Violation]) -> None:  # noqa: ANN401
+    cls = type(obj)
+    if attrs.has(cls):
+        for attribute in _validated(cls):
+            value = getattr(obj, attribute.name)
+            validator = cast("Callable[..., Any]", attribute.validator)
+            try:
+                validator(obj, attribute, value)
+            except (TypeError, ValueError) as e:
+                violations.append(
+                    Violation(entity, attribute.name, value, str(e))
+                )
+        for attribute in attrs.fields(cls):
+            value = getattr(obj, attribute.name)
+            if isinstance(value, list | dict) or attrs.has(type(value)):
+                _walk(value, _join(entity, attribute.name), violations)
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            _walk(value, _join(entity, key), violations)
+    elif isinstance(obj, list):
+        for i, value in enumerate(obj):
+            name = getattr(value, "name", i)
+            _walk(value, _join(entity, name), violations)
+
+
+def validate(obj: Any, entity: str = "") -> list[Violation]:  # noqa: ANN401
+    """Check every validated field of a model, e.g. an `UncivMod`."""
+    violations: list[Violation] = []
+    _walk(obj, entity, violations)
+    return violations
+
+
+def validate_mod(mod_dir: Path) -> list[Violation]:
+    """Parse and check every json file of a mod folder.
+
+    A file that can not be parsed at all is reported as a violation of the
+    whole collection.
+    """
+    mod = LazyUncivMod(mod_dir, validate=False)
+    violations: list[Violation] = []
+    for name, file_name in _mod_files.items():
+        try:
+            collection = mod.load(name)
+        except (KeyError, TypeError, ValueError) as e:
+            violations.append(
+                Violation(file_name, "", None, f"can not be parsed: {e!r}")
+            )
+            continue
+        violations.extend(validate(collection, name))
+    return violations
+
+
+def write_violations(
+    name: str, violations: list[Violation], report_file: Path
+) -> None:
+    """Write violations as json, warning about them under ``name``."""
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    with report_file.open("w", encoding="UTF-8") as f:
+        json.dump(
+            [x.to_json() for x in violations], f, indent="\t", default=repr
+        )
+    if violations:
+        logging.warning(
+            "%s has %d violations, see %s",
+            name,
+            len(violations),
+            report_file,
+        )
+
+
+def report_violations(mod_dir: Path, report_file: Path) -> list[Violation]:
+    """Validate a mod folder and write the violations as json."""
+    violations = validate_mod(mod_dir)
+    write_violations(mod_dir.name, violations, report_file)
+    return violations
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("mod_dirs", nargs="+", type=Path)
+    args = parser.parse_args(argv)
+
+    found = False
+    for mod_dir in args.mod_dirs:
+        for violation in validate_mod(mod_dir):
+            found = True
+            print(
+                f"{mod_dir.name}: {violation.entity}: {violation.field}="
+                f"{violation.value!r}: {violation.rule}"
+            )
+    sys.exit(1 if found else 0)
+
+
+if __name__ == "__main__":
+    main()
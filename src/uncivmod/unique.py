@@ -0,0 +1,258 @@
+"""Parsed uniques in unciv.
+
+A unique such as ``[+1 Food] from [Farm] tiles <in [Friendly Land] tiles>``
+is split into its template (``[] from [] tiles``), its parameters and its
+conditionals, so that uniques can be compared by hash instead of by regex.
+"""
+from __future__ import annotations
+
+import re
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from attrs import Factory, define, field, frozen
+
+if TYPE_CHECKING:
+    from typing import Collection, Iterable, Mapping
+
+type UniqueKey = tuple[int, tuple[str, ...], frozenset[UniqueKey]]
+
+_token = re.compile(
+    r"\[(?P<param>[^\]]*)\]"
+    r"| *<(?P<conditional>(?:\[[^\]]*\]|[^<>\[])*)>",
+)
+_word = re.compile(r"\[\]|[^\s\[]+")
+_filter_part = re.compile(r"\{([^}]*)\}")
+_template_ids: dict[str, int] = {}
+
+_stat = r"(?:Production|Food|Gold|Science|Culture|Happiness|Faith)"
+_amount = r"[+-]?\d+"
+_param_patterns: dict[str, re.Pattern[str]] = {
+    key: re.compile(pattern)
+    for key, pattern in (
+        ("amount", _amount),
+        ("+amount", _amount),
+        ("relativeAmount", _amount),
+        ("positiveAmount", r"\+?0*[1-9]\d*"),
+        ("fraction", r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)"),
+        ("stat", _stat),
+        ("civWideStat", r"Gold|Science|Culture|Faith"),
+        (
+            "stats",
+            rf"{_amount}(?:\.\d+)? {_stat}(?:, {_amount}(?:\.\d+)? {_stat})*",
+        ),
+        ("beliefType", r"Pantheon|Follower|Founder|Enhancer"),
+        ("foundingOrEnhancing", r"founding|enhancing"),
+        ("costOrStrength", r"Cost|Strength"),
+    )
+}
+
+
+def template_id(template: str) -> int:
+    """Return the interned id of a parameterless template."""
+    template = sys.intern(template)
+    return _template_ids.setdefault(template, len(_template_ids))
+
+
+def clear_caches() -> None:
+    """Forget parsed uniques and template ids.
+
+    Ids are not kept across a clear, so call this only while no parsed
+    uniques or their keys are in use. `OrderedUniques` pickle by text.
+    """
+    parse_unique.cache_clear()
+    _template_ids.clear()
+
+
+@frozen
+class Unique:
+    """A unique split into template, parameters and conditionals."""
+
+    text: str
+    template: str
+    params: tuple[str, ...] = ()
+    conditionals: tuple[Unique, ...] = ()
+    template_id: int = field(eq=False)
+
+    @template_id.default
+    def _template_id_default(self) -> int:
+        return template_id(self.template)
+
+    @property
+    def key(self) -> UniqueKey:
+        """Key comparing equal for uniques differing only in conditional order."""  # noqa: E501
+        return (
+            self.template_id,
+            self.params,
+            frozenset(x.key for x in self.conditionals),
+        )
+
+
+@lru_cache(maxsize=2**16)
+def parse_unique(text: str) -> Unique:
+    """Parse a unique, caching the result for repeated strings."""
+    template: list[str] = []
+    params: list[str] = []
+    conditionals: list[Unique] = []
+
+    position = 0
+    for match in _token.finditer(text):
+        template.append(text[position : match.start()])
+        position = match.end()
+        if match["param"] is not None:
+            template.append("[]")
+            params.append(match["param"])
+        else:
+            conditionals.append(parse_unique(match["conditional"]))
+    template.append(text[position:])
+
+    return Unique(
+        text=text,
+        template=sys.intern("".join(template)),
+        params=tuple(params),
+        conditionals=tuple(conditionals),
+    )
+
+
+class OrderedUniques:
+    """Deduplicated uniques in insertion order.
+
+    Uniques compare by `Unique.key`, so re-ordered conditionals count as the
+    same unique, of which the smallest spelling is kept. Updating drops
+    unwanted uniques that only one side has.
+    """
+
+    def __init__(self, uniques: Iterable[str] = ()) -> None:
+        self._uniques: dict[UniqueKey, str] = {}
+        self._templates: dict[str, list[UniqueKey]] = {}
+        for unique in uniques:
+            self._add(parse_unique(unique))
+
+    def _add(self, unique: Unique) -> None:
+        if unique.key in self._uniques:
+            self._uniques[unique.key] = min(
+                self._uniques[unique.key], unique.text
+            )
+            return
+        self._uniques[unique.key] = unique.text
+        self._templates.setdefault(unique.template, []).append(unique.key)
+
+    def update(
+        self, uniques: Iterable[str], avoid: Collection[str] = ()
+    ) -> None:
+        """Add uniques, keeping templates in ``avoid`` only if both sides have them."""  # noqa: E501
+        new_uniques = [parse_unique(x) for x in uniques]
+        new_templates = {x.template for x in new_uniques}
+        old_templates = self._templates.keys() & avoid
+
+        for template in old_templates - new_templates:
+            for key in self._templates.pop(template):
+                del self._uniques[key]
+        for unique in new_uniques:
+            template = unique.template
+            if template not in avoid or template in old_templates:
+                self._add(unique)
+
+    def to_list(self) -> list[str]:
+        """Convert to a list of unique strings."""
+        return list(self._uniques.values())
+
+    def __getstate__(self) -> dict[str, list[str]]:
+        return {"uniques": self.to_list()}
+
+    def __setstate__(self, state: dict[str, list[str]]) -> None:
+        OrderedUniques.__init__(self, state["uniques"])
+
+    def __len__(self) -> int:
+        return len(self._uniques)
+
+
+@define
+class _TrieNode:
+    literals: dict[str, _TrieNode] = Factory(dict)
+    params: dict[str, _TrieNode] = Factory(dict)
+    template: str | None = None
+
+
+class UniqueMatcher:
+    """Match uniques to their templates with a token trie.
+
+    Templates are split into words and parameter slots, so matching a unique
+    walks the trie once while validating each parameter against the
+    placeholder of its slot. Numeric placeholders are checked by their form,
+    other placeholders against ``known`` names when a collection is given for
+    them and accepted as-is otherwise.
+    """
+
+    def __init__(
+        self,
+        templates: Iterable[str] = (),
+        known: Mapping[str, Collection[str]] | None = None,
+    ) -> None:
+        self._root = _TrieNode()
+        self.templates: list[str] = []
+        self.known: Mapping[str, Collection[str]] = (
+            {} if known is None else known
+        )
+        for template in templates:
+            self.add(template)
+
+    def add(self, template: str) -> None:
+        """Add a template with named placeholders such as ``[amount]``."""
+        parsed = parse_unique(template)
+        placeholders = iter(parsed.params)
+        node = self._root
+        for word in _word.findall(parsed.template):
+            if word == "[]":
+                node = node.params.setdefault(next(placeholders), _TrieNode())
+            else:
+                node = node.literals.setdefault(word, _TrieNode())
+        if node.template is None:
+            node.template = template
+            self.templates.append(template)
+
+    def match(self, unique: str) -> str | None:
+        """Return the template the unique matches, ignoring conditionals."""
+        parsed = parse_unique(unique)
+        params = iter(parsed.params)
+        nodes = [self._root]
+        for word in _word.findall(parsed.template):
+            if word == "[]":
+                value = next(params)
+                nodes = [
+                    child
+                    for node in nodes
+                    for placeholder, child in node.params.items()
+                    if self.valid_param(placeholder, value)
+                ]
+            else:
+                nodes = [x.literals[word] for x in nodes if word in x.literals]
+            if not nodes:
+                return None
+
+        for node in nodes:
+            if node.template is not None:
+                return node.template
+        return None
+
+    def __contains__(self, unique: str) -> bool:
+        return self.match(unique) is not None
+
+    def valid_param(self, placeholder: str, value: str) -> bool:
+        """Check a parameter value against a (``/``-separated) placeholder."""
+        for kind in placeholder.split("/"):
+            if kind.startswith("'"):
+                if value == kind.strip("'"):
+                    return True
+            elif kind in _param_patterns:
+                if _param_patterns[kind].fullmatch(value):
+                    return True
+            elif kind in self.known:
+                names = self.known[kind]
+                parts = _filter_part.findall(value) or (value,)
+                if all(x in names for x in parts):
+                    return True
+            else:
+                return True
+        return False
@@ -1,16 +1,234 @@
+"""Regenerate the uniques list from unciv's ``UniqueType.kt``.
+
+The Kotlin source is parsed locally, and only downloaded when asked to. Every
+unique type is written to a machine-readable index together with its targets,
+flags and deprecation, and the templates usable as uniques are written to
+``uniques.txt``. Nothing is rewritten while the source hash is unchanged.
+"""
 from __future__ import annotations
 
+import argparse
+import hashlib
+import json
+import logging
 import re
+from pathlib import Path
+from typing import Any
+
+_source_url = "https://raw.githubusercontent.com/yairm210/Unciv/master/core/src/com/unciv/models/ruleset/unique/UniqueType.kt"  # noqa: E501
+_index_version = 1
+_modifier_targets = frozenset(
+    (
+        "Conditional",
+        "TriggerCondition",
+        "UnitTriggerCondition",
+        "UnitActionModifier",
+        "MetaModifier",
+    ),
+)
+
+_enum_start = re.compile(r"enum class UniqueType\b")
+_entries_end = re.compile(r"^\s*;", re.MULTILINE)
+_entry = re.compile(r"^[ \t]*(?P<name>[A-Z]\w*)\(\s*\"", re.MULTILINE)
+_deprecated = re.compile(r"@Deprecated\(\s*\"(?P<since>(?:[^\"\\]|\\.)*)\"")
+_string = re.compile(r"\"((?:[^\"\\]|\\.)*)\"")
+_target = re.compile(r"UniqueTarget\.(\w+)")
+_flag = re.compile(r"UniqueFlag\.(\w+)")
+
+
+def _closing_paren(source: str, start: int) -> int:
+    depth = 0
+    in_string = False
+    position = start
+    while position < len(source):
+        char = source[position]
+        if in_string:
+            if char == "\\":
+                position += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return position
+        position += 1
+
+    msg = f"unbalanced parenthesis at {start}"
+    raise ValueError(msg)
+
+
+def parse_unique_types(source: str) -> list[dict[str, Any]]:
+    """Extract every unique type declared in ``UniqueType.kt``."""
+    enum_start = _enum_start.search(source)
+    if enum_start is None:
+        msg = "enum class UniqueType not found"
+        raise ValueError(msg)
+    parameters_end = _closing_paren(
+        source, source.index("(", enum_start.end())
+    )
+    body_start = source.index("{", parameters_end)
+    entries_end = _entries_end.search(source, body_start)
+    body_end = len(source) if entries_end is None else entries_end.start()
 
-import requests
+    unique_types: list[dict[str, Any]] = []
+    previous_end = body_start
+    position = body_start
+    while (match := _entry.search(source, position, body_end)) is not None:
+        arguments_end = _closing_paren(source, match.end("name"))
+        arguments = source[match.end("name") : arguments_end]
+        deprecated = _deprecated.search(source, previous_end, match.start())
 
+        unique_types.append(
+            {
+                "name": match["name"],
+                "text": _string.search(arguments)[1],
+                "targets": _target.findall(arguments),
+                "flags": _flag.findall(arguments),
+                "deprecated": deprecated and deprecated["since"],
+            },
+        )
+        previous_end = position = arguments_end + 1
 
-def main():
-    unique_files = requests.get(
-        "https://github.com/yairm210/Unciv/blob/master/core/src/com/unciv/models/ruleset/unique/UniqueType.kt",
-        timeout=10,
+    return unique_types
+
+
+def unique_templates(unique_types: list[dict[str, Any]]) -> list[str]:
+    """Templates that can be used as uniques rather than only as modifiers."""
+    return list(
+        dict.fromkeys(
+            x["text"]
+            for x in unique_types
+            if not _modifier_targets.issuperset(x["targets"])
+        ),
     )
-    uniques = re.search(r"", unique_files.text)
+
+
+def load_index(index_file: Path) -> list[str] | None:
+    """Load the unique templates from a precomputed index.
+
+    Returns ``None``, after logging why, if the index can not be read or was
+    written by another version, so callers can fall back to ``uniques.txt``.
+    """
+    try:
+        with index_file.open(encoding="UTF-8") as f:
+            index: dict[str, Any] = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(
+            "ignoring unreadable unique index %s: %s", index_file, e
+        )
+        return None
+
+    if index.get("version") != _index_version or "templates" not in index:
+        logging.warning(
+            "ignoring unique index %s of version %s, expected %s",
+            index_file,
+            index.get("version"),
+            _index_version,
+        )
+        return None
+    return index["templates"]
+
+
+def fetch_source(source_file: Path) -> None:
+    """Download the latest ``UniqueType.kt`` from the unciv repository."""
+    import urllib.request
+
+    with urllib.request.urlopen(_source_url, timeout=10) as response:  # noqa: S310
+        source_file.parent.mkdir(parents=True, exist_ok=True)
+        source_file.write_bytes(response.read())
+
+
+def update(
+    source_file: Path, unique_file: Path, index_file: Path
+) -> tuple[list[str], list[str]] | None:
+    """Regenerate the uniques list and index from ``UniqueType.kt``.
+
+    Returns the added and removed templates, or ``None`` if the index was
+    already generated from the same source.
+    """
+    source = source_file.read_bytes()
+    source_hash = hashlib.sha256(source).hexdigest()
+
+    old_templates: list[str] = []
+    if index_file.is_file():
+        with index_file.open(encoding="UTF-8") as f:
+            index: dict[str, Any] = json.load(f)
+        if (
+            index.get("version") == _index_version
+            and index.get("source_hash") == source_hash
+        ):
+            return None
+        old_templates = index.get("templates", [])
+    elif unique_file.is_file():
+        old_templates = unique_file.read_text(encoding="UTF-8").splitlines()
+
+    unique_types = parse_unique_types(source.decode("UTF-8"))
+    templates = unique_templates(unique_types)
+
+    unique_file.write_text("\n".join(templates) + "\n", encoding="UTF-8")
+    index_file.write_text(
+        json.dumps(
+            {
+                "version": _index_version,
+                "source_hash": source_hash,
+                "templates": templates,
+                "unique_types": unique_types,
+            },
+            indent="\t",
+            ensure_ascii=False,
+        ),
+        encoding="UTF-8",
+    )
+
+    old_set = set(old_templates)
+    new_set = set(templates)
+    return (
+        [x for x in templates if x not in old_set],
+        [x for x in old_templates if x not in new_set],
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parent_dir = Path(__file__).parent
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "source",
+        nargs="?",
+        type=Path,
+        default=parent_dir / "uniques" / "UniqueType.kt",
+        help="local copy of UniqueType.kt",
+    )
+    parser.add_argument(
+        "--fetch",
+        action="store_true",
+        help="download the latest UniqueType.kt to SOURCE first",
+    )
+    args = parser.parse_args(argv)
+
+    if args.fetch:
+        fetch_source(args.source)
+    elif not args.source.is_file():
+        parser.error(f"{args.source} not found, download it with --fetch")
+
+    changes = update(
+        args.source,
+        parent_dir / "uniques" / "uniques.txt",
+        parent_dir / "uniques" / "uniques.json",
+    )
+    if changes is None:
+        print(f"{args.source} unchanged, uniques are up to date")
+        return
+
+    added, removed = changes
+    for template in added:
+        print(f"+ {template}")
+    for template in removed:
+        print(f"- {template}")
+    print(f"{len(added)} added, {len(removed)} removed")
 
 
 if __name__ == "__main__":
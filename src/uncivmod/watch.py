@@ -0,0 +1,279 @@
+"""Rebuild the combined mods whenever their sources change.
+
+The input, uniques and default folders are polled, and a burst of changes is
+debounced into one rebuild. Only changed mods are cleaned again, the cached
+partials of unchanged mods are reused, and only files that differ are deployed.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import shutil
+import time
+from typing import TYPE_CHECKING
+
+from attrs import evolve
+
+from uncivmod.combine import (
+    SourceCache,
+    clean_mod,
+    clean_tech,
+    combine_targets,
+    copy_images,
+    default_context,
+    known_names,
+    load_targets,
+    load_templates,
+    sync_tree,
+    uniques_paramless,
+)
+from uncivmod.strings import StringPool
+
+if TYPE_CHECKING:
+    import threading
+    from pathlib import Path
+    from typing import Iterable
+
+    from uncivmod.combine import CombineContext
+
+type Snapshot = dict[Path, tuple[int, int]]
+
+
+def snapshot(paths: Iterable[Path]) -> Snapshot:
+    """Size and modification time of every file under the paths."""
+    files: Snapshot = {}
+    for path in paths:
+        if path.is_file():
+            candidates = [path]
+        elif path.is_dir():
+            candidates = path.rglob("*")
+        else:
+            continue
+        for file in candidates:
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            if not file.is_dir():
+                files[file] = stat.st_size, stat.st_mtime_ns
+    return files
+
+
+def changed_files(old: Snapshot, new: Snapshot) -> set[Path]:
+    """Files added, removed or modified between two snapshots."""
+    return {x for x in old.keys() | new.keys() if old.get(x) != new.get(x)}
+
+
+class Watcher:
+    """Keep the combined targets of a context up to date with its sources.
+
+    Parsed JSON, decoded images and the unique matcher live for as long as
+    the watcher, so a rebuild only pays for what changed. The JSON has a
+    string pool of its own, compacted before a rebuild once more than
+    ``compact_after`` files were replaced or removed. A watcher can not stop
+    to ask about unknown uniques, so it keeps and logs them.
+    """
+
+    def __init__(
+        self,
+        context: CombineContext,
+        target_file: Path | None = None,
+        interval: float = 0.2,
+        debounce: float = 0.3,
+        compact_after: int = 20,
+    ) -> None:
+        if context.unknown_uniques == "ask":
+            context = evolve(context, unknown_uniques="keep")
+        self.context = context
+        self.target_file = target_file
+        self.interval = interval
+        self.debounce = debounce
+        self.compact_after = compact_after
+        self.cache = SourceCache(StringPool())
+        self._files: Snapshot = snapshot(self.watched())
+        self._targets: dict[Path, CombineContext] = {}
+
+    def watched(self) -> list[Path]:
+        return [
+            x
+            for x in (
+                self.context.input_dir,
+                self.context.unique_dir,
+                self.context.default_dir,
+                self.target_file,
+            )
+            if x is not None
+        ]
+
+    def poll(self) -> set[Path]:
+        """Return the files changed since the last poll."""
+        files = snapshot(self.watched())
+        changed = changed_files(self._files, files)
+        self._files = files
+        return changed
+
+    def wait(self, stop: threading.Event | None = None) -> set[Path]:
+        """Block until changes have settled for ``debounce`` seconds."""
+        changed: set[Path] = set()
+        last_change = 0.0
+        while stop is None or not stop.is_set():
+            new_changes = self.poll()
+            if new_changes:
+                changed |= new_changes
+                last_change = time.monotonic()
+            elif changed and time.monotonic() - last_change >= self.debounce:
+                break
+            time.sleep(self.interval)
+        return changed
+
+    def rebuild(self, changed: Iterable[Path]) -> list[str]:
+        """Clean the changed mods and recombine and deploy every target.
+
+        Returns the names of the mods that were cleaned again.
+        """
+        input_dir, output_dir = self.context.require_dirs(
+            "input_dir", "output_dir"
+        )
+        changed = set(changed)
+        self.cache.compact(self.compact_after)
+        mods = sorted(
+            {
+                x.relative_to(input_dir).parts[0]
+                for x in changed
+                if x.is_relative_to(input_dir) and x != input_dir
+            }
+        )
+        unique_dir = self.context.unique_dir
+        if unique_dir is not None and any(
+            x.is_relative_to(unique_dir) for x in changed
+        ):
+            self.context = evolve(
+                self.context,
+                templates=load_templates(unique_dir),
+                avoid=uniques_paramless(unique_dir / "unwanted.txt"),
+            )
+
+        # Removed mods and images can only be removed from the targets by
+        # copying every image again.
+        pruned = {
+            x
+            for x in mods
+            if not (input_dir / x).is_dir()
+            or any(
+                y.is_relative_to(input_dir / x / "Images") and not y.exists()
+                for y in changed
+            )
+        }
+        for mod in mods:
+            if mod in pruned:
+                shutil.rmtree(output_dir / mod / "Images", ignore_errors=True)
+            if (input_dir / mod).is_dir():
+                clean_mod(input_dir / mod, output_dir)
+            else:
+                shutil.rmtree(output_dir / mod, ignore_errors=True)
+
+        techs_file = (
+            output_dir / "Civ V - Gods & Kings" / "jsons" / "Techs.json"
+        )
+        known = known_names(output_dir, self.cache)
+        tech = clean_tech(self.cache.load_json(techs_file))
+        definitions = (
+            [self.context]
+            if self.target_file is None
+            else load_targets(self.target_file, self.context)
+        )
+        targets = [evolve(x, known=known, tech=tech) for x in definitions]
+
+        # New or redefined targets get every image, as do targets of pruned
+        # mods, the others only those of the mods that changed.
+        for target, definition in zip(targets, definitions):
+            (combined_dir,) = target.require_dirs("combined_dir")
+            if self._targets.get(combined_dir) != definition or any(
+                map(target.includes_mod, pruned)
+            ):
+                copy_images(target)
+                continue
+            for mod in filter(target.includes_mod, mods):
+                if (output_dir / mod / "Images").is_dir():
+                    shutil.copytree(
+                        output_dir / mod / "Images",
+                        combined_dir / "Images",
+                        dirs_exist_ok=True,
+                    )
+        self._targets = {
+            x.require_dirs("combined_dir")[0]: x for x in definitions
+        }
+
+        for combined in combine_targets(targets, self.cache):
+            (combined_dir,) = combined.context.require_dirs("combined_dir")
+            if combined.context.game_dir is not None:
+                copied, removed = sync_tree(
+                    combined_dir,
+                    combined.context.game_dir / combined_dir.name,
+                )
+                logging.info(
+                    "deployed %s: %d copied, %d removed",
+                    combined_dir.name,
+                    copied,
+                    removed,
+                )
+        return mods
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Rebuild everything once, then after every settled change.
+
+        A failed rebuild, e.g. of a half saved file, is logged and its
+        changes are rebuilt again with the next ones.
+        """
+        changed = set(self._files)
+        while stop is None or not stop.is_set():
+            start = time.perf_counter()
+            try:
+                mods = self.rebuild(changed)
+            except Exception as e:
+                logging.exception("rebuild failed")
+                print(f"rebuild failed: {e!r}")
+            else:
+                print(
+                    f"rebuilt {len(mods)} mods in "
+                    f"{time.perf_counter() - start:.3f}s"
+                )
+                changed = set()
+            changed |= self.wait(stop)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="seconds between polls",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        help="seconds without changes before rebuilding",
+    )
+    args = parser.parse_args(argv)
+
+    context = default_context()
+    (combined_dir,) = context.require_dirs("combined_dir")
+    logging.basicConfig(
+        filename=combined_dir.parent / "debug.log", level=logging.DEBUG
+    )
+    watcher = Watcher(
+        context,
+        combined_dir.parent / "Targets.json",
+        args.interval,
+        args.debounce,
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
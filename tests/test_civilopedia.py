@@ -0,0 +1,24 @@
+"""Tests for the sparse civilopedia text."""
+from __future__ import annotations
+
+import pickle
+
+from uncivmod.typing.base import CivilopediaText
+
+
+def test_only_set_fields_are_stored() -> None:
+    line = CivilopediaText("Farms", indent=1)
+    assert line.text == "Farms"
+    assert line.link is None
+    assert line.to_json() == {"text": "Farms", "indent": 1}
+
+    line.colour = "#fa0"
+    line.text = None
+    assert line == CivilopediaText(indent=1, colour="#fa0")
+    assert line.to_json() == {"indent": 1, "color": "#fa0"}
+    assert repr(line) == "CivilopediaText(indent=1, colour='#fa0')"
+    assert pickle.loads(pickle.dumps(line)) == line  # noqa: S301
+
+    parsed = CivilopediaText.from_json({"separator": True, "color": "red"})
+    assert parsed == CivilopediaText(colour="red", separator=True)
+    assert parsed != CivilopediaText(colour="red")
@@ -0,0 +1,49 @@
+"""Tests for collections stored column by column."""
+from __future__ import annotations
+
+import numpy as np
+
+from uncivmod.typing.base import Resource, ResourceEnum
+from uncivmod.typing.columnar import Columns
+
+_resources = [
+    {"name": "Wheat", "food": 1, "terrainsCanBeFoundOn": ["Plains"]},
+    {"name": "Iron", "resourceType": "Strategic", "production": 1},
+    {"name": "Gold Ore", "resourceType": "Luxury", "gold": 2},
+    {"name": "Coal", "resourceType": "Strategic", "production": 2},
+]
+
+
+def test_round_trip_models() -> None:
+    resources = [
+        Resource("Wheat", food=1, improved_by=["Farm"]),
+        Resource("Iron", ResourceEnum.Strategic, production=1),
+    ]
+    columns = Columns.from_models(Resource, resources)
+    assert len(columns) == 2
+    assert "Iron" in columns
+    assert columns["food"].tolist() == [1, 0]
+    assert columns.to_models() == resources
+    assert columns.row("Wheat") == resources[0]
+    assert columns.to_dict() == {x.name: x for x in resources}
+
+
+def test_filter_and_aggregate_json() -> None:
+    columns = Columns.from_json(Resource, _resources)
+    assert columns.row("Wheat").terrains_can_be_found_on == ["Plains"]
+    assert columns.row("Iron").resource_type is ResourceEnum.Strategic
+
+    strategic = columns.filter(columns["resource_type"] == "Strategic")
+    assert list(strategic.index) == ["Iron", "Coal"]
+    assert strategic["production"].sum() == 3
+
+    assert columns.aggregate("resource_type", "production") == {
+        ResourceEnum.Bonus: 0,
+        ResourceEnum.Luxury: 0,
+        ResourceEnum.Strategic: 3,
+    }
+    assert columns.aggregate("resource_type", "gold", np.maximum) == {
+        ResourceEnum.Bonus: 0,
+        ResourceEnum.Luxury: 2,
+        ResourceEnum.Strategic: 0,
+    }
@@ -0,0 +1,438 @@
+"""Tests for combining mods into one nation."""
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import random
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from attrs import evolve
+from PIL import Image
+
+from uncivmod import combine
+
+if TYPE_CHECKING:
+    import pytest
+
+_techs = [
+    {"columnNumber": 0, "techs": [{"name": "Agriculture"}]},
+    {"columnNumber": 1, "techs": [{"name": "Pottery"}, {"name": "Mining"}]},
+    {"columnNumber": 2, "techs": [{"name": "Bronze Working"}]},
+]
+
+_mods = {
+    "Civ V - Gods & Kings": {
+        "Buildings": [
+            {"name": "Monument", "culture": 2, "cost": 40, "maintenance": 1},
+        ],
+        "Units": [
+            {
+                "name": "Warrior",
+                "unitType": "Melee",
+                "strength": 8,
+                "cost": 40,
+                "upgradesTo": "Swordsman",
+            },
+        ],
+    },
+    "Mod A": {
+        "Buildings": [
+            {
+                "name": "Stele",
+                "replaces": "Monument",
+                "culture": 2,
+                "faith": 2,
+                "requiredTech": "Pottery",
+                "uniques": ["[+1 Faith] [in all cities]"],
+            },
+        ],
+        "Nations": [
+            {
+                "name": "Mod A",
+                "cities": ["Alpha", "Beta"],
+                "spyNames": ["Gamma"],
+                "uniques": [
+                    "[+10]% Strength <for [Mounted] units>",
+                    "Rough terrain penalty",
+                ],
+            },
+        ],
+        "Units": [
+            {
+                "name": "Jaguar",
+                "replaces": "Warrior",
+                "unitType": "Melee",
+                "strength": 9,
+                "promotions": ["Jungle", "Shock I", "Drill I"],
+                "uniques": ["[+15]% Strength", "[+1 Gold] [in all cities]"],
+            },
+        ],
+    },
+    "Mod B": {
+        "Buildings": [
+            {
+                "name": "Ger",
+                "replaces": "Monument",
+                "culture": 3,
+                "requiredTech": "Mining",
+                "uniques": ["[+1 Food] [in all cities]"],
+            },
+        ],
+        "Nations": [
+            {
+                "name": "Mod B",
+                "cities": ["Delta"],
+                "spyNames": ["Epsilon", "Zeta"],
+                "uniques": ["[+10]% Strength <for [Mounted] units>"],
+            },
+        ],
+        "Units": [
+            {
+                "name": "Brute",
+                "replaces": "Warrior",
+                "unitType": "Mounted",
+                "upgradesTo": "Knight",
+                "strength": 10,
+                "promotions": ["Cover I", "Shock I", "March"],
+                "uniques": ["[+20]% Strength", "[+2 Gold] [in all cities]"],
+            },
+        ],
+    },
+}
+
+_combine_script = """
+import json
+import sys
+from pathlib import Path
+
+from uncivmod import combine
+
+output_dir, combined_dir = map(Path, sys.argv[1:])
+context = combine.CombineContext(
+    templates=(
+        "[stats] [cityFilter]",
+        "[relativeAmount]% Strength",
+        "Rough terrain penalty",
+    ),
+    avoid=frozenset(("Rough terrain penalty",)),
+    unknown_uniques="drop",
+    output_dir=output_dir,
+    combined_dir=combined_dir,
+)
+
+combined = combine.Combined(context)
+combined.set_tech(json.loads((combined_dir / "Techs.json").read_text()))
+combine.aggregate_mods(combined)
+combined.to_json()
+"""
+
+
+def _make_input(root: Path) -> tuple[Path, Path]:
+    output_dir = root / "Output"
+    for mod_name, files in _mods.items():
+        json_dir = output_dir / mod_name / "jsons"
+        json_dir.mkdir(parents=True)
+        for string, json_object in files.items():
+            (json_dir / f"{string}.json").write_text(
+                json.dumps(json_object), encoding="UTF-8"
+            )
+
+    combined_dir = root / "Combined"
+    (combined_dir / "jsons").mkdir(parents=True)
+    (combined_dir / "Techs.json").write_text(json.dumps(_techs))
+    for folder, name in (
+        ("BuildingIcons", "Monument"),
+        ("UnitIcons", "Warrior"),
+    ):
+        (combined_dir / "Images" / folder).mkdir(parents=True)
+        Image.new("RGB", (2, 2)).save(
+            combined_dir / "Images" / folder / f"{name}.png"
+        )
+
+    return output_dir, combined_dir
+
+
+def _run_combine(root: Path, hash_seed: str) -> dict[str, bytes]:
+    output_dir, combined_dir = _make_input(root)
+    subprocess.run(
+        [sys.executable, "-c", _combine_script, output_dir, combined_dir],
+        check=True,
+        env=os.environ | {"PYTHONHASHSEED": hash_seed},
+    )
+    json_dir = combined_dir / "jsons"
+    return {x.name: x.read_bytes() for x in sorted(json_dir.iterdir())}
+
+
+def test_combine_is_deterministic(tmp_path: Path) -> None:
+    first = _run_combine(tmp_path / "first", "1")
+    second = _run_combine(tmp_path / "second", "2")
+
+    assert set(first) == {
+        "Buildings.json",
+        "GlobalUniques.json",
+        "Nations.json",
+        "Units.json",
+    }
+    assert first == second
+
+    (nation,) = (
+        x for x in json.loads(first["Nations.json"]) if x["name"] == "Upside-Down"
+    )
+    assert nation["cities"] == ["Ahpla", "Atled"]
+    assert nation["uniques"] == ["[+10]% Strength <for [Mounted] units>"]
+
+
+def _reduce_buildings(
+    buildings: list[combine.JSONDict],
+    executor: ProcessPoolExecutor | None = None,
+    partials: int = 1,
+) -> dict[str, combine.JSONDict]:
+    combined = combine.Combined(
+        combine.CombineContext(
+            templates=("[stats] [cityFilter]", "Rough terrain penalty"),
+            avoid=frozenset(("Rough terrain penalty",)),
+            unknown_uniques="drop",
+        )
+    )
+    combined.set_tech(_techs)
+    for i in range(partials):
+        for building in buildings[i::partials]:
+            combined.add_building(building)
+        combined.reduce(executor)
+    return combined.buildings
+
+
+def test_merge_is_order_independent() -> None:
+    buildings = [
+        {
+            "name": f"Shrine {i}",
+            "replaces": "Shrine" if i % 3 else "Monument",
+            "culture": i % 4,
+            "faith": 3 - i % 5,
+            "cost": 40 + i % 7 * 5,
+            "maintenance": i % 2,
+            "requiredTech": _techs[i % 3]["techs"][0]["name"],
+            "greatPersonPoints": {"Great Prophet": i % 3, "Great Artist": 1},
+            "uniques": [
+                f"[+{i % 4} Faith] [in all cities]",
+                *(["Rough terrain penalty"] if i % 2 else []),
+            ],
+        }
+        for i in range(12)
+    ]
+
+    expected = _reduce_buildings(buildings)
+    assert set(expected) == {"Shrine", "Monument"}
+    for seed in range(4):
+        shuffled = random.Random(seed).sample(buildings, len(buildings))
+        assert _reduce_buildings(shuffled, partials=seed + 1) == expected
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        assert _reduce_buildings(buildings[::-1], executor) == expected
+
+
+def test_context_pickles_without_matcher() -> None:
+    context = combine.CombineContext(
+        templates=("[stats] [cityFilter]",), unknown_uniques="drop"
+    )
+    assert context.matcher.match("[+1 Food] [in all cities]") is not None
+
+    restored = pickle.loads(pickle.dumps(context))
+    assert restored == context
+    assert restored._matcher is None
+    assert combine.check_uniques(
+        ["[+1 Food] [in all cities]", "Unknown unique"], restored
+    ) == ["[+1 Food] [in all cities]"]
+
+
+def test_targets_share_one_parse(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    output_dir, combined_dir = _make_input(tmp_path)
+    ancient_dir = tmp_path / "Ancient"
+    (ancient_dir / "jsons").mkdir(parents=True)
+    shutil.copytree(combined_dir / "Images", ancient_dir / "Images")
+
+    opened: list[Path] = []
+    image_open = Image.open
+    monkeypatch.setattr(
+        Image, "open", lambda x: opened.append(x) or image_open(x)
+    )
+
+    context = combine.CombineContext(
+        templates=(
+            "[stats] [cityFilter]",
+            "[relativeAmount]% Strength",
+            "Rough terrain penalty",
+        ),
+        tech=combine.clean_tech(_techs),
+        unknown_uniques="drop",
+        output_dir=output_dir,
+        combined_dir=combined_dir,
+    )
+    combine.combine_targets(
+        [
+            context,
+            evolve(
+                context,
+                combined_dir=ancient_dir,
+                nation=context.nation | {"name": "Ancient"},
+                mods=("Civ V - Gods & Kings", "Mod B"),
+                max_tech_column=0,
+            ),
+        ]
+    )
+
+    assert sorted(x.name for x in opened) == ["Monument.png", "Warrior.png"]
+    ancient = [
+        x
+        for x in json.loads((ancient_dir / "jsons" / "Units.json").read_text())
+        if "uniqueTo" in x
+    ]
+    assert {x["uniqueTo"] for x in ancient} == {"Ancient"}
+    assert [x["name"] for x in ancient] == [
+        "Roirraw",
+        "Roirraw (Mounted, Knight)",
+    ]
+    buildings = json.loads(
+        (ancient_dir / "jsons" / "Buildings.json").read_text()
+    )
+    assert sorted(x["name"] for x in buildings) == ["Ger", "Monument"]
+    assert (ancient_dir / "Images" / "UnitIcons" / "Roirraw.png").is_file()
+    assert (combined_dir / "jsons" / "Buildings.json").is_file()
+
+
+def test_copy_images_of_included_mods(tmp_path: Path) -> None:
+    output_dir = tmp_path / "Output"
+    for mod_name in ("Civ V - Gods & Kings", "Mod A", "Mod B"):
+        icon_dir = output_dir / mod_name / "Images" / "BuildingIcons"
+        icon_dir.mkdir(parents=True)
+        Image.new("RGB", (2, 2)).save(icon_dir / f"{mod_name}.png")
+    combined_dir = tmp_path / "Ancient"
+    combine.copy_images(
+        combine.CombineContext(
+            output_dir=output_dir,
+            combined_dir=combined_dir,
+            mods=("Civ V - Gods & Kings", "Mod B"),
+        )
+    )
+    assert sorted(
+        x.name for x in (combined_dir / "Images" / "BuildingIcons").iterdir()
+    ) == ["Civ V - Gods & Kings.png", "Mod B.png"]
+
+
+def test_unwanted_nation_uniques_are_dropped() -> None:
+    context = combine.CombineContext(
+        templates=("[stats] [cityFilter]", "Rough terrain penalty"),
+        avoid=frozenset({"Rough terrain penalty"}),
+        unknown_uniques="drop",
+    )
+    for count in (1, 3):
+        combined = combine.Combined(context)
+        for i in range(count):
+            combined.add_nation(
+                {
+                    "name": f"Nation {i}",
+                    "uniques": [
+                        "Rough terrain penalty",
+                        f"[+{i} Food] [in all cities]",
+                    ],
+                }
+            )
+        (nation,) = combined.to_nation_json()
+        assert nation["uniques"] == [
+            f"[+{i} Food] [in all cities]" for i in range(count)
+        ]
+
+
+
+class _Refactored:
+    """Stands in for a class whose state changed since it was pickled."""
+
+    def __setstate__(self, state: object) -> None:
+        raise KeyError(state)
+
+
+def test_stale_partial_is_rebuilt(tmp_path: Path) -> None:
+    json_dir = tmp_path / "Mod A" / "jsons"
+    json_dir.mkdir(parents=True)
+    (json_dir / "Nations.json").write_text(
+        json.dumps([{"name": "Mod A", "cities": ["Alpha"]}])
+    )
+    context = combine.CombineContext(unknown_uniques="drop")
+    cache_dir = tmp_path / "Cache"
+    cache_file = cache_dir / f"{combine.partial_key(json_dir, context)}.pickle"
+    cache_dir.mkdir()
+    moved = pickle.dumps(combine.Combined(context)).replace(
+        b"uncivmod.combine", b"uncivmod.combinx"
+    )
+    refactored = _Refactored()
+    refactored.__dict__["state"] = 1
+    for payload in (moved, pickle.dumps(refactored)):
+        cache_file.write_bytes(payload)
+        partial, _ = combine.cached_partial(json_dir, context, cache_dir)
+        assert partial.to_nation_json()[0]["cities"] == ["Ahpla"]
+        with cache_file.open("rb") as f:
+            assert isinstance(pickle.load(f), combine.Combined)  # noqa: S301
+
+
+def test_tech_limit_keeps_later_bases(tmp_path: Path) -> None:
+    context = combine.CombineContext(
+        unknown_uniques="drop",
+        tech={"Early": 0, "Late": 5},
+        max_tech_column=2,
+    )
+    combined = combine.Combined(context)
+    for building in (
+        {"name": "Bank", "gold": 2, "requiredTech": "Late"},
+        {"name": "Satrap", "replaces": "Bank", "requiredTech": "Early"},
+        {"name": "Vault", "replaces": "Bank", "requiredTech": "Late"},
+    ):
+        combined.add_building(building)
+    combined.reduce()
+
+    icon_dir = tmp_path / "Images" / "BuildingIcons"
+    icon_dir.mkdir(parents=True)
+    Image.new("RGB", (2, 2)).save(icon_dir / "Bank.png")
+    (building,) = combined.to_building_json(tmp_path)
+    assert (building["name"], building["replaces"]) == ("Knab", "Bank")
+    assert (icon_dir / "Knab.png").is_file()
+
+
+def test_merged_units_check_promotions(tmp_path: Path) -> None:
+    json_dir = tmp_path / "Output" / "Base" / "jsons"
+    json_dir.mkdir(parents=True)
+    (json_dir / "UnitPromotions.json").write_text(
+        json.dumps(
+            [
+                {"name": "Shock I", "unitTypes": ["Melee"]},
+                {"name": "Boarding", "unitTypes": ["Naval"]},
+            ]
+        )
+    )
+    context = combine.CombineContext(
+        unknown_uniques="drop", output_dir=tmp_path / "Output"
+    )
+    combined = combine.Combined(context)
+    for unit in (
+        {"name": "Warrior", "unitType": "Melee", "promotions": ["Shock I"]},
+        {
+            "name": "Raider",
+            "replaces": "Warrior",
+            "unitType": "Naval",
+            "promotions": ["Boarding"],
+        },
+    ):
+        combined.add_unit(unit)
+    combined.reduce()
+    assert [
+        (x.entity, x.value, x.rule) for x in combined.promotion_violations()
+    ] == [
+        ("units/Warrior", "Boarding", "is not available to Melee"),
+        ("units/Warrior", "Shock I", "is not available to Naval"),
+    ]
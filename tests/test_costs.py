@@ -0,0 +1,123 @@
+"""Tests for cost tables."""
+from __future__ import annotations
+
+import csv
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from uncivmod.typing.base import (
+    Building,
+    Difficulty,
+    Era,
+    Speed,
+    Tech,
+    TechColumn,
+    TechTree,
+    UncivMod,
+    Unit,
+)
+from uncivmod.typing.costs import (
+    cost_tables,
+    upgrade_costs,
+    upgrade_pairs,
+    write_cost_tables,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _mod() -> UncivMod:
+    units = {
+        "Warrior": Unit("Warrior", "Sword", 40, upgrades_to="Swordsman"),
+        "Swordsman": Unit("Swordsman", "Sword", 75, upgrades_to="Legion"),
+        "Legion": Unit("Legion", "Sword", 120, upgrades_to="Warrior"),
+        "Scout": Unit("Scout", "Scout", 25, upgrades_to="Missing"),
+    }
+    return UncivMod(
+        units=units,
+        eras={x: Era(x) for x in ("Ancient era", "Classical era")},
+        speeds={
+            "Quick": Speed("Quick", [], modifier=0.67),
+            "Standard": Speed("Standard", []),
+        },
+    )
+
+
+def test_upgrade_pairs_follow_chains() -> None:
+    assert upgrade_pairs(_mod().units) == [
+        ("Warrior", "Swordsman"),
+        ("Warrior", "Legion"),
+        ("Swordsman", "Legion"),
+        ("Swordsman", "Warrior"),
+        ("Legion", "Warrior"),
+        ("Legion", "Swordsman"),
+    ]
+
+
+def test_upgrade_costs(tmp_path: Path) -> None:
+    mod = _mod()
+    mod.mod_constants.unit_upgrade_cost.era_multiplier = 0.5
+    costs = upgrade_costs(mod)
+    assert costs.gold.shape == (2, 2, 6)
+    # (10 + 2 * (75 - 40)) * (1 + 0.5) rounded down to a multiple of 5
+    assert costs.gold[1, :, 0].tolist() == [80, 120]
+    # floor(0.67 * cost) differ by 24, and gold is scaled by 0.67 again
+    assert costs.gold[0, 0, 0] == 35  # noqa: PLR2004
+    # the difference can make the cost nothing
+    assert costs.gold[1, 0, 3] == 0
+
+    units, matrix = costs.matrix("Standard", "Ancient era")
+    assert units == ["Legion", "Swordsman", "Warrior"]
+    assert matrix[2, 1] == 80  # noqa: PLR2004
+    assert np.isnan(np.diag(matrix)).all()
+
+    costs.write_csv(tmp_path / "upgrades.csv")
+    with (tmp_path / "upgrades.csv").open(encoding="UTF-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][:3] == ["from", "to", "Quick / Ancient era"]
+    assert rows[1] == ["Warrior", "Swordsman", "35", "55", "80", "120"]
+
+
+def test_cost_tables(tmp_path: Path) -> None:
+    mod = _mod()
+    mod.difficulties = {
+        "Settler": Difficulty("Settler", unit_cost_modifier=0.5),
+        "Prince": Difficulty("Prince"),
+    }
+    mod.techs = TechTree(
+        [
+            TechColumn(
+                0,
+                "Ancient era",
+                20,
+                40,
+                185,
+                [Tech("Pottery"), Tech("Mining", cost=35)],
+            )
+        ]
+    )
+    mod.buildings = {
+        "Granary": Building("Granary", required_tech="Pottery"),
+        "Pyramids": Building(
+            "Pyramids", is_wonder=True, required_tech="Pottery"
+        ),
+        "Palace": Building("Palace", cost=1),
+    }
+    tables = cost_tables(mod)
+    assert tables["buildings"].costs[1, 1].tolist() == [40, 185, 1]
+    assert tables["techs"].costs[1, 0].tolist() == [20, 35]
+    assert tables["units"].costs[:, :, 0].tolist() == [[13, 26], [20, 40]]
+
+    write_cost_tables(mod, tmp_path)
+    with (tmp_path / "units.csv").open(encoding="UTF-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == [
+        "name",
+        "Quick / Settler",
+        "Quick / Prince",
+        "Standard / Settler",
+        "Standard / Prince",
+    ]
+    assert rows[1] == ["Warrior", "13", "26", "20", "40"]
@@ -0,0 +1,126 @@
+"""Tests for reading mod folders."""
+from __future__ import annotations
+
+import json
+import os
+import pickle
+from typing import TYPE_CHECKING
+
+from uncivmod.typing.base import PolicyFinisher, PolicyMember, TechTree
+from uncivmod.typing.filehandler import LazyUncivMod, json_name, load_mod
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+_techs = [
+    {
+        "columnNumber": 0,
+        "era": "Ancient era",
+        "techCost": 20,
+        "buildingCost": 40,
+        "wonderCost": 185,
+        "techs": [
+            {"name": "Agriculture", "civilopediaText": [{"text": "Farms"}]},
+        ],
+    },
+]
+_policies = [
+    {
+        "name": "Tradition",
+        "era": "Ancient era",
+        "policies": [
+            {"name": "Aristocracy", "row": 1, "column": 1},
+            {"name": "Tradition Complete", "uniques": ["[+15]% Growth"]},
+        ],
+    },
+]
+
+
+def _write(mod_dir: Path, name: str, json_object: object) -> Path:
+    json_file = mod_dir / "jsons" / name
+    json_file.parent.mkdir(parents=True, exist_ok=True)
+    json_file.write_text(json.dumps(json_object), encoding="UTF-8")
+    return json_file
+
+
+def test_json_name() -> None:
+    assert json_name("required_tech") == "requiredTech"
+    assert json_name("outer_colour") == "outerColor"
+    assert json_name("start_intro_part1") == "startIntroPart1"
+    assert json_name("icon_rgb") == "iconRGB"
+
+
+def test_collections_parse_lazily(tmp_path: Path) -> None:
+    techs_file = _write(tmp_path, "Techs.json", _techs)
+    _write(tmp_path, "Policies.json", _policies)
+    _write(tmp_path, "Units.json", "not parsed")
+    mod = LazyUncivMod(tmp_path)
+
+    techs = mod.techs
+    assert isinstance(techs, TechTree)
+    (column,) = techs
+    assert column.techs[0].name == "Agriculture"
+    assert column.techs[0].civilopedia_text[0].text == "Farms"
+    assert column.techs[0].civilopedia_text[0].link is None
+    assert mod.techs is techs
+    assert mod.buildings == {}
+
+    policies = mod.policies["Tradition"].policies
+    assert isinstance(policies["Aristocracy"], PolicyMember)
+    assert isinstance(policies["Tradition Complete"], PolicyFinisher)
+
+    _write(tmp_path, "Techs.json", [_techs[0] | {"techCost": 25}])
+    stat = techs_file.stat()
+    os.utime(techs_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert mod.techs[0].tech_cost == 25
+
+    techs = mod.techs
+    mod.invalidate("techs")
+    assert mod.techs is not techs
+    assert mod.techs == techs
+
+
+def test_snapshot_is_reused_until_sources_change(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mod_dir = tmp_path / "mod"
+    snapshot_file = tmp_path / "snapshots" / "mod.pickle"
+    _write(mod_dir, "Techs.json", _techs)
+
+    mod = load_mod(mod_dir, snapshot_file)
+    assert snapshot_file.is_file()
+    assert mod.techs[0].tech_cost == 20
+
+    with monkeypatch.context() as patch:
+        patch.setattr(LazyUncivMod, "to_mod", None)
+        assert load_mod(mod_dir, snapshot_file) == mod
+
+    _write(mod_dir, "Techs.json", [_techs[0] | {"techCost": 25}])
+    assert load_mod(mod_dir, snapshot_file).techs[0].tech_cost == 25
+
+    snapshot_file.write_bytes(b"garbage")
+    assert load_mod(mod_dir, snapshot_file).techs[0].tech_cost == 25
+
+
+class _Stale:
+    def __reduce__(self) -> tuple[type, tuple[str]]:
+        return int, ("not a number",)
+
+
+def test_unreadable_snapshot_is_replaced(tmp_path: Path) -> None:
+    mod_dir = tmp_path / "mod"
+    snapshot_file = tmp_path / "mod.pickle"
+    _write(mod_dir, "Techs.json", _techs)
+    mod = load_mod(mod_dir, snapshot_file)
+    with snapshot_file.open("rb") as f:
+        stamp = pickle.load(f)  # noqa: S301
+
+    with snapshot_file.open("wb") as f:
+        pickle.dump(stamp, f)
+        pickle.dump(_Stale(), f)
+    assert load_mod(mod_dir, snapshot_file) == mod
+    with snapshot_file.open("rb") as f:
+        assert pickle.load(f) == stamp  # noqa: S301
+        assert pickle.load(f) == mod  # noqa: S301
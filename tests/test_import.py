@@ -0,0 +1,42 @@
+"""Tests for the import cost of the package."""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+_budget_us = 50_000
+
+
+def _run(code: str, *options: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+        env=os.environ | {"PYTHONDONTWRITEBYTECODE": "1"},
+    )
+
+
+def test_import_time_within_budget() -> None:
+    _run("import uncivmod")
+    stderr = _run("import uncivmod", "-X", "importtime").stderr
+    cumulative = {
+        fields[2].strip(): int(fields[1])
+        for fields in (x.split("|") for x in stderr.splitlines()[1:])
+    }
+    assert cumulative["uncivmod"] < _budget_us
+
+
+def test_heavy_modules_load_lazily() -> None:
+    code = (
+        "import sys, uncivmod, uncivmod.combine, uncivmod.typing\n"
+        "print(*sorted(sys.modules))"
+    )
+    modules = set(_run(code).stdout.split())
+    assert "PIL.Image" not in modules
+    assert "urllib.request" not in modules
+    assert "uncivmod.typing.base" not in modules
+
+    code = "import uncivmod\nprint(uncivmod.typing.Tech, uncivmod.unique)"
+    assert "Tech" in _run(code).stdout
@@ -0,0 +1,75 @@
+"""Tests for running stages in dependency order."""
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+import pytest
+
+from uncivmod.pipeline import Pipeline, Stage
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _copy(source: Path, destination: Path, runs: list[str]) -> None:
+    runs.append(destination.name)
+    destination.write_text(source.read_text())
+
+
+def test_stages_run_in_order_and_skip_unchanged(tmp_path: Path) -> None:
+    (tmp_path / "a.txt").write_text("a")
+    runs: list[str] = []
+    pipeline = Pipeline(
+        [
+            Stage(
+                "second",
+                lambda: _copy(tmp_path / "b.txt", tmp_path / "c.txt", runs),
+                inputs=(tmp_path / "b.txt",),
+                outputs=(tmp_path / "c.txt",),
+            ),
+            Stage(
+                "first",
+                lambda: _copy(tmp_path / "a.txt", tmp_path / "b.txt", runs),
+                inputs=(tmp_path / "a.txt",),
+                outputs=(tmp_path / "b.txt",),
+            ),
+        ]
+    )
+    state_file = tmp_path / "state" / "stages.json"
+
+    timings = pipeline.run(state_file)
+    assert runs == ["b.txt", "c.txt"]
+    assert [x.name for x in timings] == ["first", "second"]
+    assert pipeline.critical_path(timings) == ["first", "second"]
+    assert "critical path: first -> second" in pipeline.report(timings)
+
+    assert all(x.skipped for x in pipeline.run(state_file))
+    assert runs == ["b.txt", "c.txt"]
+
+    (tmp_path / "c.txt").unlink()
+    pipeline.run(state_file)
+    assert runs == ["b.txt", "c.txt", "c.txt"]
+
+
+def test_independent_stages_run_concurrently() -> None:
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline(
+        [Stage(x, barrier.wait) for x in ("left", "right")]
+        + [Stage("join", lambda: None, after=("left", "right"))]
+    )
+
+    timings = pipeline.run(max_workers=2)
+    assert [x.name for x in timings] == ["left", "right", "join"]
+    assert timings[2].start >= max(timings[0].end, timings[1].end)
+
+
+def test_cycles_are_rejected(tmp_path: Path) -> None:
+    pipeline = Pipeline(
+        [
+            Stage("a", lambda: None, inputs=(tmp_path / "b",), after=()),
+            Stage("b", lambda: None, after=("a",), outputs=(tmp_path,)),
+        ]
+    )
+    with pytest.raises(ValueError, match="cycle"):
+        pipeline.run()
@@ -0,0 +1,74 @@
+"""Tests for the policy branch grids."""
+from __future__ import annotations
+
+from uncivmod.typing.base import Policy, PolicyFinisher, PolicyMember
+from uncivmod.typing.policies import PolicyGrid, PolicyIndex
+
+
+def _branch(name: str, *members: PolicyMember | PolicyFinisher) -> Policy:
+    return Policy(name, "Ancient era", policies={x.name: x for x in members})
+
+
+_tradition = _branch(
+    "Tradition",
+    PolicyMember("Aristocracy", 1, 1),
+    PolicyMember("Legalism", 1, 3),
+    PolicyMember("Oligarchy", 2, 2, ["Aristocracy", "Legalism"]),
+    PolicyMember("Monarchy", 2, 3, ["Legalism"]),
+    PolicyFinisher("Tradition Complete"),
+)
+
+
+def test_unlocks() -> None:
+    grid = PolicyGrid(_tradition)
+    assert grid.names_of(grid.requires[2]) == ["Aristocracy", "Legalism"]
+    assert grid.names_of(grid.required_by[1]) == ["Oligarchy", "Monarchy"]
+    assert grid.names_of(grid.available(grid.mask(["Legalism"]))) == [
+        "Aristocracy",
+        "Monarchy",
+    ]
+
+    index = PolicyIndex({"Tradition": _tradition})
+    assert index.unlocks("Tradition") == ["Aristocracy", "Legalism"]
+    assert index.unlocks("Legalism") == ["Monarchy"]
+    assert index.unlocks("Legalism", ["Aristocracy"]) == [
+        "Oligarchy",
+        "Monarchy",
+    ]
+    assert index.violations() == []
+
+
+def test_layout_violations() -> None:
+    broken = _branch(
+        "Broken",
+        PolicyMember("First", 1, 1),
+        PolicyMember("Overlap", 1, 1),
+        PolicyMember("Sideways", 1, 2, ["First"]),
+        PolicyMember("Loop A", 2, 1, ["Loop B"]),
+        PolicyMember("Loop B", 3, 1, ["Loop A"]),
+        PolicyMember("Lost", 2, 2, ["Nowhere"]),
+    )
+    assert [
+        (x.entity, x.value, x.rule) for x in PolicyGrid(broken).violations()
+    ] == [
+        ("policies/Broken", ["First", "Overlap"], "share row 1 and column 1"),
+        (
+            "policies/Broken/Lost",
+            ["Nowhere"],
+            "requires a policy not in the branch",
+        ),
+        (
+            "policies/Broken/Sideways",
+            "First",
+            "requires a policy that is not in an earlier row",
+        ),
+        ("policies/Broken/Loop A", ["Loop B"], "can never be adopted"),
+        (
+            "policies/Broken/Loop A",
+            "Loop B",
+            "requires a policy that is not in an earlier row",
+        ),
+        ("policies/Broken/Loop B", ["Loop A"], "can never be adopted"),
+        ("policies/Broken/Lost", ["Nowhere"], "can never be adopted"),
+        ("policies/Broken", [], "has no finisher"),
+    ]
@@ -0,0 +1,67 @@
+"""Tests for the promotion index."""
+from __future__ import annotations
+
+from uncivmod.typing.base import Promotion, Unit
+from uncivmod.typing.promotions import PromotionIndex
+
+_promotions = {
+    "Shock I": Promotion("Shock I", unit_types=["Sword", "Mounted"]),
+    "Shock II": Promotion(
+        "Shock II", ["Shock I"], unit_types=["Sword", "Mounted"]
+    ),
+    "Cover I": Promotion("Cover I", unit_types=["Sword"]),
+    "March": Promotion(
+        "March", ["Shock II", "Cover I"], unit_types=["Sword", "Mounted"]
+    ),
+    "Amphibious": Promotion("Amphibious", ["Cover I"], unit_types=["Ship"]),
+}
+
+
+def test_index_by_unit_type() -> None:
+    index = PromotionIndex(_promotions)
+    assert index.available("Mounted") == {"Shock I", "Shock II", "March"}
+    assert index.available("Archer") == set()
+    assert index.closures["March"] == {"Shock I", "Shock II", "Cover I"}
+    assert index.reachable["Ship"] == set()
+    assert index.is_legal("Sword", "Cover I")
+    assert not index.is_legal("Mounted", "Cover I")
+
+
+def test_unit_violations_and_summary() -> None:
+    index = PromotionIndex(_promotions)
+    units = {
+        "Legion": Unit("Legion", "Sword", promotions=["Shock II"]),
+        "Cavalry": Unit("Cavalry", "Mounted", promotions=["Cover I", "Ace"]),
+    }
+    assert [
+        (x.entity, x.value, x.rule)
+        for x in index.unit_violations(units, ["Sword", "Mounted"])
+    ] == [
+        ("units/Cavalry", "Cover I", "is not available to Mounted"),
+        ("units/Cavalry", "Ace", "is not a promotion"),
+        ("promotions/Amphibious", "Ship", "is not a unit type"),
+        ("promotions/Amphibious", ["Cover I"], "can never be reached by Ship"),
+    ]
+    assert index.summaries(units)["Legion"] == {
+        "unitType": "Sword",
+        "starting": ["Shock II"],
+        "leadingTo": ["Shock I"],
+        "reachable": ["Cover I", "March", "Shock I"],
+    }
+
+
+def test_merged_violations_check_every_type() -> None:
+    index = PromotionIndex(_promotions)
+    units = {
+        "Legion": {
+            "unitType": [("Sword", ""), ("Mounted", "Knight")],
+            "promotions": ["Shock I", "Cover I", "Ace"],
+        },
+        "Cavalry": {"unitType": "Mounted", "promotions": ["Shock II"]},
+    }
+    assert [
+        (x.entity, x.value, x.rule) for x in index.merged_violations(units)
+    ] == [
+        ("units/Legion", "Cover I", "is not available to Mounted"),
+        ("units/Legion", "Ace", "is not a promotion"),
+    ]
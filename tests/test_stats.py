@@ -0,0 +1,68 @@
+"""Tests for stats vectors."""
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from uncivmod.combine import update_gain
+from uncivmod.typing.base import Resource, Stats, UncivMod
+from uncivmod.typing.stats import (
+    StatsVector,
+    merge_gains,
+    ruleset_yields,
+    stat_names,
+)
+
+
+def test_stats_truth() -> None:
+    assert not Stats()
+    assert Stats(faith=1)
+    assert Stats(food=-1)
+
+
+def test_vector_arithmetic() -> None:
+    stats = StatsVector.from_stats(Stats(production=2, food=1))
+    bonus = StatsVector.from_stats(Stats(production=50))
+    assert stats.with_percent_bonus(bonus).to_stats() == Stats(3, 1)
+    assert (stats * 2 + stats).to_json() == {"production": 6, "food": 3}
+    assert stats.maximum(bonus).to_json() == {"production": 50, "food": 1}
+
+    matrix = StatsVector.from_models(
+        [Resource("Wheat", food=1), Resource("Iron", production=1, gold=1)]
+    )
+    assert len(matrix) == 2
+    assert matrix.scale_rows([1, 3]).to_json() == [
+        {"food": 1},
+        {"production": 3, "gold": 3},
+    ]
+    assert (matrix * [[1], [3]]) == matrix.scale_rows([1, 3])
+    with pytest.raises(ValueError, match="expected 2 factors"):
+        matrix.scale_rows([1, 2, 3])
+    assert matrix.sum().to_stats() == Stats(production=1, food=1, gold=1)
+
+    # Seven rows, as many as there are stats, still scale per row.
+    seven = StatsVector.from_json([{"food": 1}] * len(stat_names))
+    factors = range(len(stat_names))
+    assert seven.scale_rows(factors)["food"].tolist() == list(factors)
+    food = stat_names.index("food")
+    assert (seven * list(factors))["food"].tolist() == [food] * len(factors)
+    assert matrix["gold"].tolist() == [0, 1]
+
+    yields = ruleset_yields(UncivMod(resources={"Wheat": Resource("Wheat")}))
+    assert yields["resources"] == StatsVector.zeros(1)
+    assert yields["buildings"].values.shape == (0, 7)
+
+
+def test_merge_gains_matches_update_gain() -> None:
+    originals = [{"food": 2, "gold": -1}, {"culture": 0}, {}]
+    replaces = [{"food": 1, "faith": 2}, {"culture": 3, "gold": -2}, {}]
+    merged = merge_gains(
+        StatsVector.from_json(originals, missing=np.nan),
+        StatsVector.from_json(replaces, missing=np.nan),
+    )
+    expected = []
+    for original, replace in zip(originals, replaces):
+        for key in stat_names:
+            original = update_gain(key, original, replace)
+        expected.append(original)
+    assert merged.to_json() == expected
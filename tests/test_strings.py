@@ -0,0 +1,156 @@
+"""Tests for the string pool used while loading rulesets."""
+from __future__ import annotations
+
+import json
+import pickle
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+from uncivmod.combine import CombineContext, SourceCache, cached_partial
+from uncivmod.strings import StringPool, strings
+from uncivmod.typing.filehandler import LazyUncivMod
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_repeated_strings_are_shared(tmp_path: Path) -> None:
+    pool = StringPool()
+    unique = "".join(["[+1 Production]", " [in all cities]"])
+    (tmp_path / "a.json").write_text(
+        json.dumps([{"name": "Warrior", "uniques": [unique]}])
+    )
+    (tmp_path / "b.json").write_text(
+        json.dumps([{"upgradesTo": "Warrior", "uniques": [unique]}, "x"])
+    )
+    a = pool.load_json(tmp_path / "a.json")
+    b = pool.load_json(tmp_path / "b.json")
+    assert a[0]["name"] is b[0]["upgradesTo"]
+    assert a[0]["uniques"][0] is b[0]["uniques"][0]
+    assert "Warrior" in pool
+    assert pool.intern("x") is b[1]
+
+    cache = SourceCache(pool)
+    assert cache.load_json(tmp_path / "a.json")[0]["name"] is a[0]["name"]
+
+
+def test_long_strings_and_clear() -> None:
+    pool = StringPool(max_length=4)
+    long = "".join(["Lo", "ng string"])
+    assert pool.intern(long) is long
+    assert long not in pool
+    assert pool.intern("".join(["ab", "c"])) is pool.intern("abc")
+    assert len(pool) == 1
+    pool.clear()
+    assert len(pool) == 0
+
+
+def test_intern_json_of_unpickled_state() -> None:
+    pool = StringPool()
+    state = {"units": [{"name": "Scout"}], "pairs": (("Scout", "Scout"),)}
+    state = pool.intern_json(pickle.loads(pickle.dumps(state)))  # noqa: S301
+    assert state["units"][0]["name"] is pool.intern("Scout")
+    assert state["pairs"][0][1] is pool.intern("Scout")
+
+
+def test_lazy_mod_uses_its_pool(tmp_path: Path) -> None:
+    json_dir = tmp_path / "jsons"
+    json_dir.mkdir()
+    (json_dir / "Units.json").write_text(
+        json.dumps([{"name": "Scout", "unitType": "Civilian", "cost": 10}])
+    )
+    (json_dir / "UnitTypes.json").write_text(
+        json.dumps([{"name": "Civilian", "movementType": "Land"}])
+    )
+    pool = StringPool()
+    mod = LazyUncivMod(tmp_path, pool)
+    assert mod.units["Scout"].unit_type is mod.unit_types["Civilian"].name
+    assert "Civilian" in pool
+
+
+def test_cache_keeps_latest_versions(tmp_path: Path) -> None:
+    pool = StringPool()
+    cache = SourceCache(pool)
+    old_file = tmp_path / "a.json"
+    kept_file = tmp_path / "b.json"
+    old_file.write_text(json.dumps([{"name": "Old name"}]))
+    kept_file.write_text(json.dumps([{"name": "Kept"}]))
+    cache.load_json(old_file)
+    cache.load_json(kept_file)
+
+    old_file.write_text(json.dumps([{"name": "New name!"}]))
+    assert cache.load_json(old_file) == [{"name": "New name!"}]
+    cache.compact()
+    assert "Old name" not in pool
+    assert "Kept" in pool
+
+    kept_file.unlink()
+    cache.compact()
+    assert "Kept" not in pool
+    assert cache.load_json(old_file)[0]["name"] is pool.intern("New name!")
+
+
+def test_cache_saves_changed_images(tmp_path: Path) -> None:
+    cache = SourceCache()
+    transposed: list[Path] = []
+    transpose = cache.transpose
+
+    def counted(image_file: Path, root: Path, method: int) -> Image.Image:
+        transposed.append(image_file)
+        return transpose(image_file, root, method)
+
+    cache.transpose = counted  # type: ignore[method-assign]
+    icon, output = tmp_path / "icon.png", tmp_path / "out.png"
+    Image.new("RGB", (2, 3)).save(icon)
+    for _ in range(2):
+        cache.save_transposed(icon, tmp_path, Image.ROTATE_90, output)
+    assert transposed == [icon]
+
+    Image.new("RGB", (2, 4)).save(icon)
+    cache.save_transposed(icon, tmp_path, Image.ROTATE_90, output)
+    output.unlink()
+    cache.save_transposed(icon, tmp_path, Image.ROTATE_90, output)
+    assert transposed == [icon] * 3
+    assert Image.open(output).size == (4, 2)
+
+
+def test_unpickled_partial_uses_the_cache_pool(tmp_path: Path) -> None:
+    json_dir = tmp_path / "Mod A" / "jsons"
+    json_dir.mkdir(parents=True)
+    (json_dir / "Buildings.json").write_text(
+        json.dumps([{"name": "Partial hall", "culture": 1}])
+    )
+    context = CombineContext(unknown_uniques="drop")
+    for pool in (StringPool(), StringPool()):
+        cache = SourceCache(pool)
+        partial, _ = cached_partial(
+            json_dir, context, tmp_path / "Cache", cache
+        )
+    assert partial.cache is cache
+    assert "Partial hall" in pool
+    assert "Partial hall" not in strings
+
+
+def test_cache_compacts_past_threshold(tmp_path: Path) -> None:
+    pool = StringPool()
+    cache = SourceCache(pool)
+    json_files = [tmp_path / f"{x}.json" for x in range(3)]
+    for json_file in json_files:
+        json_file.write_text(json.dumps([{"name": f"Old {json_file.stem}"}]))
+        cache.load_json(json_file)
+
+    json_files[0].write_text(json.dumps([{"name": "New 0"}]))
+    cache.load_json(json_files[0])
+    json_files[1].unlink()
+    cache.compact(2)
+    assert "Old 0" in pool
+
+    json_files[2].write_text(json.dumps([{"name": "New 2"}]))
+    cache.load_json(json_files[2])
+    cache.compact(2)
+    assert "Old 0" not in pool
+    assert "Old 1" not in pool
+    assert "New 2" in pool
+    cache.compact(0)
+    assert "New 0" in pool
@@ -0,0 +1,145 @@
+"""Tests for parsing, deduplicating and matching uniques."""
+from __future__ import annotations
+
+import pickle
+
+from uncivmod.unique import (
+    OrderedUniques,
+    UniqueMatcher,
+    clear_caches,
+    parse_unique,
+    template_id,
+)
+
+
+def test_parse_unique() -> None:
+    unique = parse_unique(
+        "[+1 Food] from [Farm] tiles <in [Friendly Land] tiles>"
+        " <for [Mounted] units>"
+    )
+    assert unique.template == "[] from [] tiles"
+    assert unique.params == ("+1 Food", "Farm")
+    assert [x.template for x in unique.conditionals] == [
+        "in [] tiles",
+        "for [] units",
+    ]
+    assert unique.conditionals[0].params == ("Friendly Land",)
+    assert unique.template_id == template_id("[] from [] tiles")
+
+    paramless = parse_unique("Rough terrain penalty")
+    assert (paramless.template, paramless.params) == (
+        "Rough terrain penalty",
+        (),
+    )
+    assert parse_unique("Rough terrain penalty") is paramless
+
+
+def test_key_ignores_conditional_order() -> None:
+    first = parse_unique("[+1 Food] [in all cities] <when at war> <[50]%>")
+    second = parse_unique("[+1 Food] [in all cities] <[50]%> <when at war>")
+    assert first != second
+    assert first.key == second.key
+    assert first.key != parse_unique("[+1 Food] [in all cities]").key
+    assert first.key != parse_unique("[+2 Food] [in all cities]").key
+
+
+def test_ordered_uniques_deduplicate() -> None:
+    uniques = OrderedUniques(
+        [
+            "[+1 Food] [in all cities] <when at war> <[50]%>",
+            "No defensive terrain bonus",
+            "[+1 Food] [in all cities] <[50]%> <when at war>",
+            "No defensive terrain bonus",
+        ]
+    )
+    assert len(uniques) == 2
+    # The smallest spelling of equal uniques is kept, in first-seen order.
+    assert uniques.to_list() == [
+        "[+1 Food] [in all cities] <[50]%> <when at war>",
+        "No defensive terrain bonus",
+    ]
+
+
+def test_unwanted_templates_need_both_sides() -> None:
+    avoid = {"Rough terrain penalty", "[] Movement"}
+
+    uniques = OrderedUniques(["Rough terrain penalty", "[+1] Movement"])
+    uniques.update(["Rough terrain penalty", "[+1] Sight"], avoid)
+    assert uniques.to_list() == ["Rough terrain penalty", "[+1] Sight"]
+
+    uniques = OrderedUniques(["[+1] Sight"])
+    uniques.update(["Rough terrain penalty", "[+2] Movement"], avoid)
+    assert uniques.to_list() == ["[+1] Sight"]
+
+    # Wanted uniques are kept from either side.
+    uniques = OrderedUniques(["[+1] Sight"])
+    uniques.update(["[+2] Sight"])
+    assert uniques.to_list() == ["[+1] Sight", "[+2] Sight"]
+
+
+_matcher = UniqueMatcher(
+    [
+        "[relativeAmount]% Strength",
+        "[+amount] Movement",
+        "[stats] from [buildingName]",
+        "[stats] from [tileFilter] tiles",
+        "[stats] [cityFilter]",
+        "Gain [amount] [stat/'Golden Age points']",
+    ],
+    known={
+        "buildingName": {"Monument"},
+        "tileFilter": {"Farm", "Friendly Land"},
+    },
+)
+
+
+def test_matcher_checks_typed_params() -> None:
+    assert _matcher.match("[+15]% Strength") == "[relativeAmount]% Strength"
+    assert _matcher.match("[-15]% Strength <when attacking>") == (
+        "[relativeAmount]% Strength"
+    )
+    assert _matcher.match("[abc]% Strength") is None
+    assert "[+1] Movement" in _matcher
+    assert "[one] Movement" not in _matcher
+    assert "[+1 Food, +2 Gold] [in all cities]" in _matcher
+    assert "[+1 Foood] [in all cities]" not in _matcher
+    assert "[+1 Food] Movement" not in _matcher
+
+
+def test_matcher_checks_known_names() -> None:
+    assert _matcher.match("[+1 Food] from [Monument]") == (
+        "[stats] from [buildingName]"
+    )
+    assert _matcher.match("[+1 Food] from [Monumnt]") is None
+    assert _matcher.match("[+1 Food] from [{Farm} {Friendly Land}] tiles") == (
+        "[stats] from [tileFilter] tiles"
+    )
+    assert "[+1 Food] from [{Farm} {Enemy Land}] tiles" not in _matcher
+    # Placeholders without known names take any value.
+    assert _matcher.match("[+1 Food] [in all cities]") == (
+        "[stats] [cityFilter]"
+    )
+
+
+def test_matcher_alternatives() -> None:
+    assert "Gain [5] [Golden Age points]" in _matcher
+    assert "Gain [5] [Faith]" in _matcher
+    assert "Gain [5] [Great Person points]" not in _matcher
+    assert _matcher.valid_param("stat/'Golden Age points'", "Culture")
+    assert not _matcher.valid_param("amount/'all'", "some")
+    assert _matcher.valid_param("amount/'all'", "all")
+
+
+def test_ordered_uniques_survive_cleared_caches() -> None:
+    uniques = OrderedUniques(["[+1 Food] [in all cities]", "Can embark"])
+    data = pickle.dumps(uniques)
+    clear_caches()
+    parse_unique("Unrelated [1] template")
+    restored = pickle.loads(data)  # noqa: S301
+    restored.update(["Can embark <when at war>", "[+1 Food] [in all cities]"])
+    assert restored.to_list() == [
+        "[+1 Food] [in all cities]",
+        "Can embark",
+        "Can embark <when at war>",
+    ]
+    assert parse_unique.cache_info().maxsize is not None
@@ -0,0 +1,139 @@
+"""Tests for regenerating the uniques list from UniqueType.kt."""
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from uncivmod.combine import load_templates
+from uncivmod.update_uniques import (
+    load_index,
+    main,
+    parse_unique_types,
+    unique_templates,
+    update,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_source = r"""
+package com.unciv.models.ruleset.unique
+
+enum class UniqueType(
+    val text: String,
+    vararg targets: UniqueTarget,
+    val flags: Set<UniqueFlag> = UniqueFlag.none,
+    val docDescription: String? = null
+) {
+    Stats("[stats]", UniqueTarget.Global, UniqueTarget.FollowerBelief),
+    StatsPerCity("[stats] [cityFilter]", UniqueTarget.Global),
+    // OldStats("[stats] from every [buildingFilter]", UniqueTarget.Global),
+    Quoted("Display \"[comment]\" (in [cityFilter])", UniqueTarget.Global,
+        docDescription = "Shown (as is) in the \"Civilopedia\""),
+
+    @Deprecated("as of 4.8.0", ReplaceWith("Stats"))
+    StatsFromCities("[stats] from every city (old)", UniqueTarget.Global,
+        flags = setOf(UniqueFlag.HiddenToUsers)),
+    StatsPerCityDuplicate("[stats] [cityFilter]", UniqueTarget.Building),
+
+    ConditionalWar("when at war", UniqueTarget.Conditional),
+    TriggerOnTurn("upon turn start", UniqueTarget.TriggerCondition,
+        UniqueTarget.UnitTriggerCondition),
+    ;
+
+    val placeholderText = text.getPlaceholderText()
+    fun example() = Stats("[+1 Food]", UniqueTarget.Global)
+}
+"""
+
+
+def test_parse_unique_types() -> None:
+    unique_types = parse_unique_types(_source)
+    assert [x["name"] for x in unique_types] == [
+        "Stats",
+        "StatsPerCity",
+        "Quoted",
+        "StatsFromCities",
+        "StatsPerCityDuplicate",
+        "ConditionalWar",
+        "TriggerOnTurn",
+    ]
+    by_name = {x["name"]: x for x in unique_types}
+    assert by_name["Stats"]["targets"] == ["Global", "FollowerBelief"]
+    assert by_name["Quoted"]["text"] == (
+        r"Display \"[comment]\" (in [cityFilter])"
+    )
+    assert by_name["StatsFromCities"]["deprecated"] == "as of 4.8.0"
+    assert by_name["StatsFromCities"]["flags"] == ["HiddenToUsers"]
+    assert by_name["StatsPerCityDuplicate"]["deprecated"] is None
+
+    # Modifier-only types are not usable as uniques, duplicates count once.
+    assert unique_templates(unique_types) == [
+        "[stats]",
+        "[stats] [cityFilter]",
+        r"Display \"[comment]\" (in [cityFilter])",
+        "[stats] from every city (old)",
+    ]
+
+    with pytest.raises(ValueError, match="not found"):
+        parse_unique_types("enum class OtherType(val text: String) {}")
+
+
+def test_update_diffs_and_skips_unchanged(tmp_path: Path) -> None:
+    source_file = tmp_path / "UniqueType.kt"
+    unique_file = tmp_path / "uniques.txt"
+    index_file = tmp_path / "uniques.json"
+    source_file.write_text(_source)
+    unique_file.write_text("[stats]\nRemoved unique\n")
+
+    assert update(source_file, unique_file, index_file) == (
+        [
+            "[stats] [cityFilter]",
+            r"Display \"[comment]\" (in [cityFilter])",
+            "[stats] from every city (old)",
+        ],
+        ["Removed unique"],
+    )
+    templates = load_index(index_file)
+    assert unique_file.read_text().splitlines() == templates
+    index = json.loads(index_file.read_text())
+    assert len(index["unique_types"]) == 7
+
+    assert update(source_file, unique_file, index_file) is None
+    assert load_index(index_file) == templates
+
+    source_file.write_text(
+        _source.replace(
+            '    ConditionalWar("when at war"',
+            '    NewUnique("[+amount] Sight", UniqueTarget.Unit),\n'
+            '    ConditionalWar("when at war"',
+        ).replace('    Stats("[stats]", ', '    Stats("[stats] (new)", ')
+    )
+    assert update(source_file, unique_file, index_file) == (
+        ["[stats] (new)", "[+amount] Sight"],
+        ["[stats]"],
+    )
+
+
+def test_stale_index_falls_back_to_uniques_txt(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    (tmp_path / "uniques.txt").write_text("[stats]\n")
+    index_file = tmp_path / "uniques.json"
+    index_file.write_text(json.dumps({"version": 0, "templates": ["old"]}))
+    assert load_index(index_file) is None
+    assert "version 0" in caplog.text
+    assert load_templates(tmp_path) == ("[stats]",)
+
+    index_file.write_text("{")
+    assert load_templates(tmp_path) == ("[stats]",)
+
+
+def test_missing_source_is_an_error(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / "UniqueType.kt")])
+    assert "--fetch" in capsys.readouterr().err
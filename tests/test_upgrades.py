@@ -0,0 +1,105 @@
+"""Tests for the unit upgrade graph."""
+from __future__ import annotations
+
+from uncivmod.typing.base import Tech, TechColumn, TechTree, UncivMod, Unit
+from uncivmod.typing.upgrades import (
+    UpgradeGraph,
+    unit_eras,
+    upgrade_violations,
+)
+
+
+def test_closure_and_order() -> None:
+    graph = UpgradeGraph(
+        {
+            "Warrior": ["Swordsman"],
+            "Brute": ["Swordsman", "Spearman"],
+            "Swordsman": ["Longswordsman"],
+            "Spearman": [],
+            "Longswordsman": ["Musketman"],
+            "Ship": ["Boat"],
+            "Boat": ["Ship"],
+        },
+        {"Brute": 0, "Warrior": 0, "Spearman": 0, "Swordsman": 1},
+    )
+    assert graph.missing == {"Longswordsman": ("Musketman",)}
+    assert graph.cycles == [("Boat", "Ship")]
+    assert graph.ancestors("Longswordsman") == {
+        "Warrior",
+        "Brute",
+        "Swordsman",
+    }
+    assert graph.descendants("Brute") == {
+        "Swordsman",
+        "Spearman",
+        "Longswordsman",
+    }
+    assert graph.upgrades_into("Ship", "Ship")
+    assert not graph.upgrades_into("Spearman", "Warrior")
+    assert graph.order() == [
+        "Brute",
+        "Spearman",
+        "Warrior",
+        "Swordsman",
+        "Longswordsman",
+    ]
+
+    grouped = UpgradeGraph.from_json(
+        [
+            {"name": "Brute", "unitType": [("Melee", "Spearman")]},
+            {"name": "Spearman", "unitType": "Melee"},
+        ]
+    )
+    assert grouped.descendants("Brute") == {"Spearman"}
+
+
+def test_upgrade_violations() -> None:
+    units = {
+        "Warrior": Unit(
+            "Warrior",
+            "Melee",
+            required_tech="Bronze Working",
+            upgrades_to="Swordsman",
+        ),
+        "Swordsman": Unit(
+            "Swordsman",
+            "Melee",
+            required_tech="Iron Working",
+            obsolete_tech="Bronze Working",
+            upgrades_to="Longswordsman",
+        ),
+        "Legion": Unit(
+            "Legion",
+            "Melee",
+            required_tech="Iron Working",
+            replaces="Swordsman",
+            upgrades_to="Warrior",
+        ),
+        "Impi": Unit("Impi", "Melee", replaces="Pikeman"),
+        "Ship": Unit("Ship", "Naval", upgrades_to="Ship"),
+    }
+    mod = UncivMod(
+        units=units,
+        techs=TechTree(
+            [
+                TechColumn(0, "Ancient", 20, 40, 0, [Tech("Bronze Working")]),
+                TechColumn(1, "Classical", 30, 60, 0, [Tech("Iron Working")]),
+            ]
+        ),
+    )
+    assert unit_eras(mod)["Legion"] == 0
+    assert [(x.entity, x.field, x.rule) for x in upgrade_violations(mod)] == [
+        ("units/Ship", "upgrades_to", "upgrade cycle through Ship"),
+        ("units/Swordsman", "upgrades_to", "upgrades to a missing unit"),
+        (
+            "units/Warrior",
+            "upgrades_to",
+            "upgrades to a unit obsolete with Bronze Working",
+        ),
+        (
+            "units/Legion",
+            "upgrades_to",
+            "not reachable from the replaced Swordsman",
+        ),
+        ("units/Impi", "replaces", "replaces a missing unit"),
+    ]
@@ -0,0 +1,90 @@
+"""Tests for validating whole rulesets."""
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import attrs
+import pytest
+
+from uncivmod.typing.base import Era, Promotion, UncivMod
+from uncivmod.typing.validation import (
+    Violation,
+    report_violations,
+    validate,
+    validate_mod,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _write(mod_dir: Path, name: str, json_object: object) -> None:
+    json_file = mod_dir / "jsons" / name
+    json_file.parent.mkdir(parents=True, exist_ok=True)
+    json_file.write_text(json.dumps(json_object), encoding="UTF-8")
+
+
+def test_validate_model() -> None:
+    mod = UncivMod(promotions={"Shock I": Promotion("Shock I", column=1)})
+    assert validate(mod) == []
+    object.__setattr__(mod.promotions["Shock I"], "column", -1)
+    assert validate(mod) == [
+        Violation(
+            "promotions/Shock I",
+            "column",
+            -1,
+            "column must not be negative",
+        )
+    ]
+
+
+def test_every_violation_is_reported(tmp_path: Path) -> None:
+    _write(
+        tmp_path,
+        "Eras.json",
+        [
+            {"name": "Ancient era", "iconRGB": [300, 0, -1]},
+            {"name": "Classical era", "startingGold": -5},
+        ],
+    )
+    _write(tmp_path, "Beliefs.json", [{"type": "Pantheon"}])
+    violations = validate_mod(tmp_path)
+    assert [(x.entity, x.field, x.value) for x in violations] == [
+        ("Beliefs.json", "", None),
+        ("eras/Ancient era/icon_rgb", "r", 300),
+        ("eras/Ancient era/icon_rgb", "b", -1),
+        ("eras/Classical era", "starting_gold", -5),
+    ]
+
+    report_file = tmp_path / "report" / "mod.json"
+    report_violations(tmp_path, report_file)
+    report = json.loads(report_file.read_text())
+    assert report[3] == {
+        "entity": "eras/Classical era",
+        "field": "starting_gold",
+        "value": -5,
+        "rule": "starting_gold must not be negative",
+    }
+
+
+def test_concurrent_validation(tmp_path: Path) -> None:
+    mod_dirs = [tmp_path / f"Mod {x}" for x in range(8)]
+    for mod_dir in mod_dirs:
+        _write(
+            mod_dir,
+            "Eras.json",
+            [{"name": f"Era {x}", "startingGold": -1} for x in range(300)],
+        )
+
+    def build_validated(_: int) -> None:
+        with pytest.raises(ValueError, match="starting_gold"):
+            Era("Era", starting_gold=-1)
+
+    with ThreadPoolExecutor(8) as executor:
+        checks = executor.map(build_validated, range(200))
+        reports = list(executor.map(validate_mod, mod_dirs))
+        list(checks)
+    assert [len(x) for x in reports] == [300] * 8
+    assert not attrs.validators.get_disabled()
@@ -0,0 +1,64 @@
+"""Tests for the attribute validators."""
+from __future__ import annotations
+
+import pytest
+from attrs import define, field
+
+from uncivmod.typing._validator import (
+    _Interval,
+    _ge0,
+    _le0,
+    _interval_of,
+    _neg,
+    _pos,
+    _validate_none,
+    _validate_or,
+    _validate_or_var,
+)
+from uncivmod.typing.base import Era, Promotion, RGBColour
+
+
+def _text_validator(self: object, attribute: object, value: object) -> None:
+    if not isinstance(value, str):
+        msg = "not text"
+        raise ValueError(msg)  # noqa: TRY004
+
+
+def test_fused_validators() -> None:
+    assert _interval_of(_ge0) == _Interval(0, low_closed=True)
+    assert _interval_of(_le0) == _Interval(high=0, high_closed=True)
+    assert _Interval(0, 255, True, False).condition() == "0 <= value < 255"
+    assert RGBColour(r=0, g=128, b=255).to_json() == [0, 128, 255]
+    with pytest.raises(ValueError, match="g is not between 0 and 255"):
+        RGBColour(r=0, g=256, b=0)
+    with pytest.raises(ValueError, match="starting_gold must not be negative"):
+        Era("Ancient era", starting_gold=-1)
+    assert Promotion("Shock I", row=None).row is None
+    with pytest.raises(ValueError, match="row must be None"):
+        Promotion("Shock I", row=-1)
+
+
+def test_combinators_accept_any_passing_validator() -> None:
+    @define
+    class Example:
+        nonzero: int = field(validator=_validate_or(_pos, _neg, msg="x\n"))
+        loose: object = field(
+            default=0,
+            validator=_validate_or_var(
+                _text_validator, _ge0, msg_after=" is wrong"
+            ),
+        )
+        text: object = field(
+            default=None, validator=_validate_none(_text_validator)
+        )
+
+    Example(1, "text", "text")
+    Example(-1, 3)
+    with pytest.raises(ValueError, match="x\nnonzero must be positive."):
+        Example(0)
+    with pytest.raises(ValueError, match="loose is wrong"):
+        Example(1, -1)
+    with pytest.raises(ValueError, match="not text or text must be None"):
+        Example(1, text=1)
+    with pytest.raises(TypeError):
+        _validate_or_var(_pos)
@@ -0,0 +1,185 @@
+"""Tests for rebuilding combined mods on changes."""
+from __future__ import annotations
+
+import json
+import shutil
+import threading
+from typing import TYPE_CHECKING
+
+from PIL import Image
+
+from uncivmod.combine import CombineContext, check_uniques
+from uncivmod.watch import Watcher
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+
+_techs = [
+    {"columnNumber": 0, "techs": [{"name": "Agriculture"}]},
+    {"columnNumber": 1, "techs": [{"name": "Pottery"}]},
+]
+
+
+def _write_mod(input_dir: Path, name: str, files: dict[str, list]) -> None:
+    (input_dir / name / "jsons").mkdir(parents=True, exist_ok=True)
+    (input_dir / name / "Images" / "BuildingIcons").mkdir(
+        parents=True, exist_ok=True
+    )
+    (input_dir / name / "credits.md").write_text(name)
+    for string, json_object in files.items():
+        (input_dir / name / "jsons" / f"{string}.json").write_text(
+            json.dumps(json_object), encoding="UTF-8"
+        )
+
+
+def test_rebuild_only_changed_mod(tmp_path: Path) -> None:
+    input_dir = tmp_path / "Input"
+    _write_mod(
+        input_dir,
+        "Civ V - Gods & Kings",
+        {
+            "Techs": _techs,
+            "Buildings": [{"name": "Monument", "culture": 2, "cost": 40}],
+        },
+    )
+    Image.new("RGB", (2, 2)).save(
+        input_dir
+        / "Civ V - Gods & Kings"
+        / "Images"
+        / "BuildingIcons"
+        / "Monument.png"
+    )
+    stele = {"name": "Stele", "replaces": "Monument", "culture": 3}
+    _write_mod(input_dir, "Mod A", {"Buildings": [stele]})
+    watcher = Watcher(
+        CombineContext(
+            unknown_uniques="drop",
+            input_dir=input_dir,
+            output_dir=tmp_path / "Output",
+            combined_dir=tmp_path / "Combined",
+            cache_dir=tmp_path / "Cache",
+            game_dir=tmp_path / "game",
+        )
+    )
+    assert watcher.rebuild(set(watcher._files)) == [
+        "Civ V - Gods & Kings",
+        "Mod A",
+    ]
+    deployed = tmp_path / "game" / "Combined" / "jsons" / "Buildings.json"
+    assert (tmp_path / "game" / "Combined" / "Images").is_dir()
+    assert {x["name"]: x["culture"] for x in json.loads(deployed.read_text())}[
+        "Tnemunom"
+    ] == 3
+    report = tmp_path / "Cache" / "violations" / "Combined promotions.json"
+    assert json.loads(report.read_text()) == []
+
+    assert watcher.poll() == set()
+    buildings_file = input_dir / "Mod A" / "jsons" / "Buildings.json"
+    buildings_file.write_text(json.dumps([stele | {"culture": 5}]))
+    changed = watcher.poll()
+    assert changed == {buildings_file}
+    cached = len(watcher.cache._json)
+    assert watcher.rebuild(changed) == ["Mod A"]
+    assert len(watcher.cache._json) == cached
+    assert {x["name"]: x["culture"] for x in json.loads(deployed.read_text())}[
+        "Tnemunom"
+    ] == 5
+
+
+def _watcher(tmp_path: Path) -> Watcher:
+    input_dir = tmp_path / "Input"
+    _write_mod(
+        input_dir,
+        "Civ V - Gods & Kings",
+        {
+            "Techs": _techs,
+            "Buildings": [{"name": "Monument", "culture": 2, "cost": 40}],
+        },
+    )
+    Image.new("RGB", (2, 2)).save(
+        input_dir
+        / "Civ V - Gods & Kings"
+        / "Images"
+        / "BuildingIcons"
+        / "Monument.png"
+    )
+    return Watcher(
+        CombineContext(
+            unknown_uniques="drop",
+            input_dir=input_dir,
+            output_dir=tmp_path / "Output",
+            combined_dir=tmp_path / "Combined",
+        ),
+        tmp_path / "Targets.json",
+    )
+
+
+def test_new_target_gets_images(tmp_path: Path) -> None:
+    watcher = _watcher(tmp_path)
+    watcher.rebuild(set(watcher._files))
+    (tmp_path / "Targets.json").write_text(
+        json.dumps([{"folder": "Combined"}, {"folder": "Ancient"}])
+    )
+    assert watcher.rebuild(watcher.poll()) == []
+    assert (
+        tmp_path / "Ancient" / "Images" / "BuildingIcons" / "Monument.png"
+    ).is_file()
+    assert (tmp_path / "Ancient" / "jsons" / "Buildings.json").is_file()
+
+
+def test_failed_rebuild_keeps_watching(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    watcher = _watcher(tmp_path)
+    base_dir = tmp_path / "Input" / "Civ V - Gods & Kings"
+    buildings_file = base_dir / "jsons" / "Buildings.json"
+    buildings_file.write_text('[{"name": "Monu')
+    stop = threading.Event()
+    waited: list[set[Path]] = []
+
+    def wait(_: threading.Event | None) -> set[Path]:
+        buildings_file.write_text(json.dumps([{"name": "Monument"}]))
+        waited.append(watcher.poll())
+        stop.set()
+        return waited[-1]
+
+    watcher.wait = wait  # type: ignore[method-assign]
+    watcher.run(stop)
+    assert "rebuild failed" in caplog.text
+    assert waited == [{buildings_file}]
+
+
+def test_removed_images_leave_targets(tmp_path: Path) -> None:
+    watcher = _watcher(tmp_path)
+    _write_mod(tmp_path / "Input", "Mod B", {})
+    icon_dir = tmp_path / "Input" / "Mod B" / "Images" / "BuildingIcons"
+    for name in ("Stele", "Shrine"):
+        Image.new("RGB", (2, 2)).save(icon_dir / f"{name}.png")
+    watcher.rebuild(watcher.poll() | set(watcher._files))
+    combined_icons = tmp_path / "Combined" / "Images" / "BuildingIcons"
+    assert (combined_icons / "Shrine.png").is_file()
+
+    (icon_dir / "Shrine.png").unlink()
+    assert watcher.rebuild(watcher.poll()) == ["Mod B"]
+    assert not (combined_icons / "Shrine.png").exists()
+    assert (combined_icons / "Stele.png").is_file()
+    assert (combined_icons / "Monument.png").is_file()
+
+    shutil.rmtree(tmp_path / "Input" / "Mod B")
+    assert watcher.rebuild(watcher.poll()) == ["Mod B"]
+    assert not (combined_icons / "Stele.png").exists()
+    assert (combined_icons / "Monument.png").is_file()
+
+
+def test_unknown_uniques_are_not_asked(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setattr("builtins.input", None)
+    watcher = Watcher(CombineContext(input_dir=tmp_path))
+    assert watcher.context.unknown_uniques == "keep"
+    assert check_uniques(["Made up"], watcher.context) == ["Made up"]
+    assert 'keeping unknown unique "Made up"' in caplog.text